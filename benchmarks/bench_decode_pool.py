@@ -0,0 +1,79 @@
+"""
+Books messages per second decoded and built on the event loop vs in a DecodePool of 1, 2, 4 and 8 processes.
+
+`parent_cpu_us` is the CPU time the event loop process spends per message, what is left for the handlers; the
+wall clock rate only scales with the workers on a machine with that many free cores.
+
+    python -m benchmarks.bench_decode_pool [--json results.json]
+"""
+import asyncio
+import json
+import time
+from typing import Dict, List
+
+from benchmarks.harness import books_message, main, throughput
+from easybov.common.decoding import DecodePool
+from easybov.data.enums import BookFormat
+from easybov.data.models.compact_order_book import CompactOrderbook
+from easybov.data.models.order_book import Orderbook
+
+MESSAGES = 20000
+LEVELS = 20
+SYMBOLS = ["PETR4", "VALE3", "ITUB4", "BBDC4", "ABEV3", "B3SA3", "WEGE3", "BBAS3"]
+
+
+def frames() -> List[str]:
+    return [json.dumps(books_message(SYMBOLS[i % len(SYMBOLS)], LEVELS)) for i in range(MESSAGES)]
+
+
+def inline(name: str, data: List[str], book_format: BookFormat) -> Dict:
+    build = CompactOrderbook.from_raw if book_format == BookFormat.COMPACT else Orderbook
+    started, cpu = time.perf_counter(), time.process_time()
+    for frame in data:
+        msg = json.loads(frame)
+        build(msg["arg"]["symbol"], msg)
+    result = throughput(name, len(data), time.perf_counter() - started)
+    result["parent_cpu_us"] = (time.process_time() - cpu) / len(data) * 1e6
+    return result
+
+
+async def pooled(name: str, data: List[str], workers: int, book_format: BookFormat) -> Dict:
+    received = 0
+
+    async def deliver(msg: Dict) -> None:
+        nonlocal received
+        received += 1
+        if book_format == BookFormat.MODEL:
+            Orderbook(msg["arg"]["symbol"], msg)
+
+    pool = DecodePool(deliver, workers, codec="json", compact=book_format == BookFormat.COMPACT)
+    # start the processes, and import the SDK in them, before timing
+    await pool.put(data[0])
+    await pool.drain()
+
+    started, cpu = time.perf_counter(), time.process_time()
+    for i, frame in enumerate(data):
+        await pool.put(frame)
+        if i % 64 == 0:
+            # let the loop run like it does between two websocket reads
+            await asyncio.sleep(0)
+    await pool.drain()
+    result = throughput(name, len(data), time.perf_counter() - started)
+    result["parent_cpu_us"] = (time.process_time() - cpu) / len(data) * 1e6
+
+    await pool.stop()
+    return result
+
+
+def run() -> List[Dict]:
+    data = frames()
+    results = []
+    for book_format in (BookFormat.COMPACT, BookFormat.MODEL):
+        results.append(inline(f"{book_format.value} inline", data, book_format))
+        for workers in (1, 2, 4, 8):
+            results.append(asyncio.run(pooled(f"{book_format.value} {workers} workers", data, workers, book_format)))
+    return results
+
+
+if __name__ == "__main__":
+    main(run, __doc__)
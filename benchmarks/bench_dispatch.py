@@ -0,0 +1,68 @@
+"""
+Messages per second through BaseStream._dispatch, the handler lookup and model building every message goes through,
+for each books format, and through _on_frame, which decodes the frame and routes it first.
+
+    python -m benchmarks.bench_dispatch [--json results.json]
+"""
+import asyncio
+import json
+import time
+from typing import Dict, List
+
+from benchmarks.harness import books_message, main, orders_message, throughput
+from easybov.data.enums import BookFormat
+from easybov.data.live.b3 import B3DataStream
+
+MESSAGES = 20000
+LEVELS = 20
+SYMBOLS = ["PETR4", "VALE3", "ITUB4", "BBDC4"]
+
+
+async def _handler(data) -> None:
+    pass
+
+
+def stream(**kwargs) -> B3DataStream:
+    # never connected: messages are fed straight into the dispatch path
+    s = B3DataStream("key", "secret", **kwargs)
+    s.subscribe_books(_handler, *SYMBOLS)
+    s.subscribe_orders(_handler)
+    return s
+
+
+async def dispatch(name: str, s: B3DataStream, messages: List[Dict]) -> Dict:
+    started = time.perf_counter()
+    for msg in messages:
+        await s._dispatch(msg)
+    return throughput(name, len(messages), time.perf_counter() - started)
+
+
+async def on_frame(name: str, s: B3DataStream, frames: List[str]) -> Dict:
+    started = time.perf_counter()
+    for frame in frames:
+        await s._on_frame(frame)
+    return throughput(name, len(frames), time.perf_counter() - started)
+
+
+async def _run() -> List[Dict]:
+    books = [books_message(SYMBOLS[i % len(SYMBOLS)], LEVELS) for i in range(MESSAGES)]
+    orders = [orders_message(cl_ord_id=f"b{i}") for i in range(MESSAGES)]
+    frames = [json.dumps(msg) for msg in books]
+
+    return [
+        await dispatch("_dispatch books raw", stream(raw_data=True), books),
+        await dispatch("_dispatch books model", stream(), books),
+        await dispatch("_dispatch books lazy", stream(lazy_models=True), books),
+        await dispatch("_dispatch books compact", stream(book_format=BookFormat.COMPACT), books),
+        await dispatch("_dispatch orders model", stream(), orders),
+        await on_frame("_on_frame books model", stream(), frames),
+        await on_frame("_on_frame books compact", stream(book_format=BookFormat.COMPACT), frames),
+    ]
+
+
+def run() -> List[Dict]:
+    return asyncio.run(_run())
+
+
+if __name__ == "__main__":
+    main(run, __doc__)
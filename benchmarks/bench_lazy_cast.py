@@ -0,0 +1,43 @@
+"""
+Eager pydantic models vs the lazy wrappers built by BaseStream._cast when `lazy_models=True`.
+
+    python -m benchmarks.bench_lazy_cast [--json results.json]
+"""
+from typing import Dict, List
+
+from benchmarks.harness import books_message, orders_message, measure, main
+from easybov.data.models.lazy import LazyOrderbook, LazyOrderUpdate
+from easybov.data.models.order_book import Orderbook
+from easybov.data.models.order_update import OrderUpdate
+
+
+def run() -> List[Dict]:
+    results = []
+
+    for levels in (5, 20):
+        msg = books_message(levels=levels)
+        results.append(measure(f"books[{levels}] eager", lambda: Orderbook("PETR4", msg)))
+        results.append(measure(f"books[{levels}] lazy, symbol only", lambda: LazyOrderbook("PETR4", msg).symbol))
+        results.append(measure(f"books[{levels}] lazy, best bid", lambda: LazyOrderbook("PETR4", msg).best_bid))
+        results.append(
+            measure(f"books[{levels}] lazy, all fields", lambda: _touch_book(LazyOrderbook("PETR4", msg)))
+        )
+
+    msg = orders_message()
+    results.append(measure("orders eager", lambda: OrderUpdate("PETR4", msg)))
+    results.append(measure("orders lazy, cl_ord_id only", lambda: LazyOrderUpdate("PETR4", msg).cl_ord_id))
+    results.append(measure("orders lazy, status and qty", lambda: _touch_order(LazyOrderUpdate("PETR4", msg))))
+
+    return results
+
+
+def _touch_book(book: LazyOrderbook) -> None:
+    book.ts, book.bids, book.asks
+
+
+def _touch_order(order: LazyOrderUpdate) -> None:
+    order.ord_status, order.cum_qty, order.order_qty
+
+
+if __name__ == "__main__":
+    main(run, __doc__)
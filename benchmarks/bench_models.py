@@ -0,0 +1,32 @@
+"""
+Building the handler models from decoded messages: Orderbook at 5, 20 and 100 levels per side next to the compact
+and lazy alternatives, and OrderUpdate.
+
+    python -m benchmarks.bench_models [--json results.json]
+"""
+from typing import Dict, List
+
+from benchmarks.harness import books_message, main, measure, orders_message
+from easybov.data.models.compact_order_book import CompactOrderbook
+from easybov.data.models.lazy import LazyOrderbook
+from easybov.data.models.order_book import Orderbook
+from easybov.data.models.order_update import OrderUpdate
+
+
+def run() -> List[Dict]:
+    results = []
+
+    for levels in (5, 20, 100):
+        msg = books_message(levels=levels)
+        results.append(measure(f"Orderbook[{levels}]", lambda: Orderbook("PETR4", msg)))
+        results.append(measure(f"CompactOrderbook[{levels}]", lambda: CompactOrderbook.from_raw("PETR4", msg)))
+        results.append(measure(f"LazyOrderbook[{levels}] best bid", lambda: LazyOrderbook("PETR4", msg).best_bid))
+
+    msg = orders_message()
+    results.append(measure("OrderUpdate", lambda: OrderUpdate("PETR4", msg)))
+
+    return results
+
+
+if __name__ == "__main__":
+    main(run, __doc__)
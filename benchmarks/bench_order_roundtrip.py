@@ -0,0 +1,113 @@
+"""
+Order entry latency against the local simulator: `submit_order` round trips of the blocking and asyncio clients,
+and the time from submitting a market order to receiving its fill on the orders stream.
+
+The simulator runs in the same process, so the numbers are the SDK's own overhead plus loopback networking, not
+exchange latency.
+
+    python -m benchmarks.bench_order_roundtrip [--json results.json]
+"""
+import asyncio
+import itertools
+import time
+from typing import Dict, List
+
+from benchmarks.harness import latencies, main
+from easybov.data.live.b3 import B3DataStream
+from easybov.simulator import Simulator
+from easybov.trading.client import AsyncTradingClient, TradingClient
+from easybov.trading.enums import OrderSide, OrderStatus
+from easybov.trading.requests import MarketOrderRequest
+
+ORDERS = 500
+WARMUP = 20
+API_KEY = "key"
+SECRET_KEY = "secret"
+
+_ids = itertools.count()
+
+
+def order() -> MarketOrderRequest:
+    return MarketOrderRequest(symbol="PETR4", cl_ord_id=f"o{next(_ids)}", order_qty="100", side=OrderSide.BUY)
+
+
+def blocking(rest_url: str) -> Dict:
+    client = TradingClient(API_KEY, SECRET_KEY, url_override=rest_url)
+    for _ in range(WARMUP):
+        client.submit_order(order())
+
+    samples = []
+    for _ in range(ORDERS):
+        request = order()
+        started = time.perf_counter()
+        client.submit_order(request)
+        samples.append(time.perf_counter() - started)
+    return latencies("submit_order blocking", samples)
+
+
+async def asynchronous(rest_url: str) -> Dict:
+    async with AsyncTradingClient(API_KEY, SECRET_KEY, url_override=rest_url) as client:
+        for _ in range(WARMUP):
+            await client.submit_order(order())
+
+        samples = []
+        for _ in range(ORDERS):
+            request = order()
+            started = time.perf_counter()
+            await client.submit_order(request)
+            samples.append(time.perf_counter() - started)
+    return latencies("submit_order asyncio", samples)
+
+
+async def to_fill(ws_url: str, rest_url: str) -> Dict:
+    fills: Dict[str, asyncio.Future] = {}
+
+    async def on_order(update) -> None:
+        future = fills.get(update.cl_ord_id)
+        if update.ord_status == OrderStatus.FILLED and future is not None and not future.done():
+            future.set_result(time.perf_counter())
+
+    stream = B3DataStream(API_KEY, SECRET_KEY, url_override=ws_url)
+    stream.subscribe_orders(on_order)
+    runner = asyncio.ensure_future(stream._run_forever())
+
+    async def submit_and_wait(timeout: float) -> float:
+        request = order()
+        fills[request.cl_ord_id] = asyncio.get_running_loop().create_future()
+        started = time.perf_counter()
+        await client.submit_order(request)
+        try:
+            return await asyncio.wait_for(fills[request.cl_ord_id], timeout) - started
+        finally:
+            del fills[request.cl_ord_id]
+
+    async with AsyncTradingClient(API_KEY, SECRET_KEY, url_override=rest_url) as client:
+        # fills are only seen once the stream has logged in and subscribed
+        while True:
+            try:
+                await submit_and_wait(0.5)
+                break
+            except asyncio.TimeoutError:
+                pass
+        for _ in range(WARMUP):
+            await submit_and_wait(10)
+        samples = [await submit_and_wait(10) for _ in range(ORDERS)]
+
+    await stream.stop_ws()
+    runner.cancel()
+    await asyncio.gather(runner, return_exceptions=True)
+    await stream.close()
+    return latencies("submit_order to fill update", samples)
+
+
+def run() -> List[Dict]:
+    with Simulator(credentials={API_KEY: SECRET_KEY}, rate=0.001) as simulator:
+        return [
+            blocking(simulator.rest_url),
+            asyncio.run(asynchronous(simulator.rest_url)),
+            asyncio.run(to_fill(simulator.ws_url, simulator.rest_url)),
+        ]
+
+
+if __name__ == "__main__":
+    main(run, __doc__)
@@ -0,0 +1,60 @@
+"""
+The CPU spent on a REST request before it reaches the wire: building the request, serialising it, either through
+the fields dict and the client codec or straight to bytes, and signing the payload.
+
+    python -m benchmarks.bench_signing [--json results.json]
+"""
+from typing import Dict, List
+
+from benchmarks.harness import main, measure
+from easybov.trading.client import TradingClient
+from easybov.trading.enums import OrderSide, TimeInForce
+from easybov.trading.requests import CancelOrderRequest, GetOrdersRequest, LimitOrderRequest
+
+API_KEY = "B1r6B8EDEe6or5YAAvUP1A"
+SECRET_KEY = "00b7b5ecd4f2cfba0515ca3167fb9d68d0d8c38ae3df074e04704c1b1ef52c97"
+
+
+def limit_order() -> LimitOrderRequest:
+    return LimitOrderRequest(
+        cl_ord_id="b12",
+        symbol="PETR4",
+        price="35.01",
+        order_qty="100",
+        side=OrderSide.BUY,
+        tif=TimeInForce.DAY,
+    )
+
+
+def run() -> List[Dict]:
+    client = TradingClient(API_KEY, SECRET_KEY)
+    order = limit_order()
+    cancel = CancelOrderRequest(symbol="PETR4", cl_ord_id="c12", orig_cl_ord_id="b12", order_qty="100", side="1")
+    query = GetOrdersRequest(cl_ord_id="b12")
+    payload = client._codec.dumps(order.to_request_fields())
+
+    return [
+        measure("LimitOrderRequest()", limit_order),
+        measure("to_request_fields limit", order.to_request_fields),
+        measure("to_request_fields cancel", cancel.to_request_fields),
+        measure("to_request_fields get", query.to_request_fields),
+        measure("dumps limit", lambda: client._codec.dumps(order.to_request_fields())),
+        measure("to_request_body limit", order.to_request_body),
+        measure("copy_with limit template", lambda: order.copy_with(cl_ord_id="b13", price="35.02")),
+        measure(
+            "_generate_signature",
+            lambda: client._generate_signature("1700000000000", "POST", "/api/v1/trade/order", None, payload),
+        ),
+        measure(
+            "_prepare_request limit",
+            lambda: client._prepare_request("POST", "/trade/order", order.to_request_fields()),
+        ),
+        measure(
+            "_prepare_request limit body",
+            lambda: client._prepare_request("POST", "/trade/order", order.to_request_body()),
+        ),
+    ]
+
+
+if __name__ == "__main__":
+    main(run, __doc__)
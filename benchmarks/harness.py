@@ -0,0 +1,138 @@
+"""
+Small timing harness shared by the benchmark scripts.
+
+Every benchmark produces a result dict ({"name", "ops_per_sec", "mean_us", "min_us", "number", "repeat"}) so the
+scripts can print a table and dump machine-readable JSON with `--json`.
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+import timeit
+from typing import Callable, Dict, List, Optional
+
+
+def books_message(symbol: str = "PETR4", levels: int = 5, ts: Optional[float] = None) -> Dict:
+    """A decoded `books` message with `levels` levels on each side."""
+    return {
+        "arg": {"channel": "books", "symbol": symbol},
+        "data": [
+            {
+                "ts": str(ts if ts is not None else time.time()),
+                "bids": [[f"{35.0 - i * 0.01:.2f}", str(100 * (i + 1))] for i in range(levels)],
+                "asks": [[f"{35.01 + i * 0.01:.2f}", str(100 * (i + 1))] for i in range(levels)],
+            }
+        ],
+    }
+
+
+def orders_message(symbol: str = "PETR4", cl_ord_id: str = "b1") -> Dict:
+    """A decoded `orders` message for a partially filled limit order."""
+    return {
+        "arg": {"channel": "orders", "symbol": "*"},
+        "data": [
+            {
+                "symbol": symbol,
+                "cl_ord_id": cl_ord_id,
+                "side": "1",
+                "price": "35.01",
+                "last_px": "35.01",
+                "last_qty": "100",
+                "cum_qty": "100",
+                "order_qty": "200",
+                "ord_type": "limit",
+                "ord_status": "1",
+                "transact_time": "20240101-10:00:00.000",
+            }
+        ],
+    }
+
+
+def measure(name: str, func: Callable[[], object], repeat: int = 5, number: Optional[int] = None) -> Dict:
+    """
+    Times `func` like `timeit`: `repeat` rounds of `number` calls, auto-ranged to ~0.2 s per round when omitted.
+    """
+    timer = timeit.Timer(func)
+    if number is None:
+        number, _ = timer.autorange()
+    rounds = timer.repeat(repeat=repeat, number=number)
+    best = min(rounds) / number
+    mean = sum(rounds) / len(rounds) / number
+    return {
+        "name": name,
+        "ops_per_sec": 1 / best if best else float("inf"),
+        "mean_us": mean * 1e6,
+        "min_us": best * 1e6,
+        "number": number,
+        "repeat": repeat,
+    }
+
+
+def throughput(name: str, count: int, seconds: float) -> Dict:
+    """A result in the same shape as `measure` for `count` operations that took `seconds` in total."""
+    per_op = seconds / count
+    return {
+        "name": name,
+        "ops_per_sec": count / seconds,
+        "mean_us": per_op * 1e6,
+        "min_us": per_op * 1e6,
+        "number": count,
+        "repeat": 1,
+    }
+
+
+def latencies(name: str, samples: List[float]) -> Dict:
+    """A result in the same shape as `measure` for individually timed operations, with their percentiles."""
+    ordered = sorted(samples)
+    mean = sum(ordered) / len(ordered)
+    return {
+        "name": name,
+        "ops_per_sec": 1 / mean if mean else float("inf"),
+        "mean_us": mean * 1e6,
+        "min_us": ordered[0] * 1e6,
+        "number": len(ordered),
+        "repeat": 1,
+        "p50_us": ordered[len(ordered) // 2] * 1e6,
+        "p99_us": ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1e6,
+    }
+
+
+_COLUMNS = {"name", "ops_per_sec", "mean_us", "min_us", "number", "repeat"}
+
+
+def print_table(results: List[Dict]) -> None:
+    width = max(len(r["name"]) for r in results)
+    extra = sorted({key for r in results for key in r} - _COLUMNS)
+    header = f"{'benchmark':<{width}}  {'min us':>10}  {'mean us':>10}  {'ops/s':>12}"
+    print(header + "".join(f"  {key:>14}" for key in extra))
+    for r in results:
+        line = f"{r['name']:<{width}}  {r['min_us']:>10.2f}  {r['mean_us']:>10.2f}  {r['ops_per_sec']:>12.0f}"
+        print(line + "".join(f"  {r.get(key, float('nan')):>14.2f}" for key in extra))
+
+
+def environment() -> Dict:
+    return {
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "platform": platform.platform(),
+    }
+
+
+def write_json(results: List[Dict], path: str) -> None:
+    with open(path, "w") as f:
+        json.dump({"environment": environment(), "timestamp": time.time(), "results": results}, f, indent=2)
+
+
+def main(run: Callable[[], List[Dict]], description: str, argv: Optional[List[str]] = None) -> List[Dict]:
+    """Command line entry point of a benchmark script: runs it, prints the table and optionally writes JSON."""
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--json", metavar="PATH", help="write the results as JSON to PATH")
+    args = parser.parse_args(argv)
+
+    results = run()
+    print_table(results)
+    if args.json:
+        write_json(results, args.json)
+    return results
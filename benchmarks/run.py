@@ -0,0 +1,81 @@
+"""
+Runs every benchmark module, or those named, and writes one JSON document with all the results so runs before and
+after an SDK upgrade can be compared:
+
+    python -m benchmarks.run --json before.json
+    python -m benchmarks.run --json after.json --compare before.json
+
+With `--compare`, benchmarks whose best time got worse by more than `--tolerance` are listed and the exit status is
+1, so the comparison can gate a CI job.
+"""
+import argparse
+import importlib
+import json
+import sys
+from typing import Dict, List, Optional
+
+from benchmarks.harness import print_table, write_json
+
+MODULES = [
+    "bench_signing",
+    "bench_models",
+    "bench_dispatch",
+    "bench_lazy_cast",
+    "bench_decode_pool",
+    "bench_order_roundtrip",
+]
+
+
+def run(modules: List[str]) -> List[Dict]:
+    results = []
+    for name in modules:
+        module = importlib.import_module(f"benchmarks.{name}")
+        print(f"running {name}", file=sys.stderr)
+        for result in module.run():
+            result["name"] = f"{name}: {result['name']}"
+            results.append(result)
+    return results
+
+
+def regressions(results: List[Dict], baseline: List[Dict], tolerance: float) -> List[Dict]:
+    """The results whose `min_us` exceeds the baseline's by more than `tolerance` (0.2 is 20%)."""
+    before = {r["name"]: r for r in baseline}
+    slower = []
+    for result in results:
+        previous = before.get(result["name"])
+        if previous is not None and result["min_us"] > previous["min_us"] * (1 + tolerance):
+            slower.append(dict(result, baseline_us=previous["min_us"], ratio=result["min_us"] / previous["min_us"]))
+    return slower
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        "modules", nargs="*", metavar="MODULE", help=f"benchmarks to run, all by default: {', '.join(MODULES)}"
+    )
+    parser.add_argument("--json", metavar="PATH", help="write the results as JSON to PATH")
+    parser.add_argument("--compare", metavar="PATH", help="a previous --json output to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="slowdown reported as a regression")
+    args = parser.parse_args(argv)
+    unknown = sorted(set(args.modules) - set(MODULES))
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(unknown)}")
+
+    results = run(args.modules or MODULES)
+    print_table(results)
+    if args.json:
+        write_json(results, args.json)
+
+    if args.compare:
+        with open(args.compare) as f:
+            slower = regressions(results, json.load(f)["results"], args.tolerance)
+        if slower:
+            print(f"\n{len(slower)} regressions over {args.tolerance:.0%}:")
+            print_table(slower)
+            return 1
+        print(f"\nno regressions over {args.tolerance:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
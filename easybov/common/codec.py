@@ -0,0 +1,105 @@
+import json
+from abc import ABC, abstractmethod
+from typing import Any, Optional, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+
+class JSONCodec(ABC):
+    """
+    Encodes request payloads and decodes responses and websocket frames.
+
+    `dumps` returns compact UTF-8 bytes so the REST clients can sign and send the very same buffer.
+    """
+
+    name: str = ""
+
+    @abstractmethod
+    def dumps(self, obj: Any) -> bytes:
+        pass
+
+    @abstractmethod
+    def loads(self, data: Union[str, bytes]) -> Any:
+        pass
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}()"
+
+
+class StdlibJSONCodec(JSONCodec):
+    name = "json"
+
+    def dumps(self, obj: Any) -> bytes:
+        return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        return json.loads(data)
+
+
+class UJSONCodec(JSONCodec):
+    name = "ujson"
+
+    def __init__(self) -> None:
+        if ujson is None:
+            raise ImportError("ujson is not installed, install it with `pip install ujson`")
+
+    def dumps(self, obj: Any) -> bytes:
+        return ujson.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        return ujson.loads(data)
+
+
+class OrjsonCodec(JSONCodec):
+    name = "orjson"
+
+    def __init__(self) -> None:
+        if orjson is None:
+            raise ImportError("orjson is not installed, install it with `pip install orjson`")
+
+    def dumps(self, obj: Any) -> bytes:
+        return orjson.dumps(obj)
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        return orjson.loads(data)
+
+
+_CODECS = {
+    OrjsonCodec.name: OrjsonCodec,
+    UJSONCodec.name: UJSONCodec,
+    StdlibJSONCodec.name: StdlibJSONCodec,
+}
+
+
+def get_codec(codec: Optional[Union[JSONCodec, str]] = None) -> JSONCodec:
+    """
+    Resolves the codec argument accepted by the clients and streams.
+
+    Args:
+        codec (Optional[Union[JSONCodec, str]]): A codec instance, one of "orjson", "ujson" or "json", or None to
+          pick the fastest installed library, falling back to the standard library.
+
+    Returns:
+        JSONCodec: the codec to use
+    """
+    if isinstance(codec, JSONCodec):
+        return codec
+
+    if codec is not None:
+        if codec not in _CODECS:
+            raise ValueError(f"Unknown codec {codec!r}, expected one of {', '.join(_CODECS)}")
+        return _CODECS[codec]()
+
+    if orjson is not None:
+        return OrjsonCodec()
+    if ujson is not None:
+        return UJSONCodec()
+    return StdlibJSONCodec()
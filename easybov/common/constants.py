@@ -9,5 +9,31 @@ BROKER_DOCUMENT_UPLOAD_LIMIT = 10
 PageItem = TypeVar("PageItem")  # Generic type for an item from a paginated request.
 
 DEFAULT_RETRY_ATTEMPTS = 3
-DEFAULT_RETRY_WAIT_SECONDS = 3
 DEFAULT_RETRY_EXCEPTION_CODES = [429, 504]
+DEFAULT_RETRY_BACKOFF_BASE_SECONDS = 0.05
+DEFAULT_RETRY_BACKOFF_MAX_SECONDS = 1
+
+DEFAULT_POOL_SIZE = 100
+DEFAULT_KEEPALIVE_TIMEOUT_SECONDS = 30
+DEFAULT_MAX_IN_FLIGHT = 256
+DEFAULT_BATCH_MAX_WORKERS = 16
+
+DEFAULT_ORDER_RATE_LIMIT = 30  # requests per second
+DEFAULT_CANCEL_RATE_LIMIT = 30
+DEFAULT_QUERY_RATE_LIMIT = 10
+
+DEFAULT_CONNECT_TIMEOUT_SECONDS = 3.05
+DEFAULT_READ_TIMEOUT_SECONDS = 10
+
+DEFAULT_DISPATCH_QUEUE_SIZE = 1024
+DEFAULT_DECODE_BATCH_SIZE = 64
+
+DEFAULT_RECONNECT_BACKOFF_BASE_SECONDS = 0.1
+DEFAULT_RECONNECT_BACKOFF_MAX_SECONDS = 30
+DEFAULT_LOGIN_PAYLOAD_MAX_AGE_SECONDS = 5
+DEFAULT_SUBSCRIBE_BATCH_SIZE = 100
+
+DEFAULT_ARCHIVE_BATCH_ROWS = 10000
+DEFAULT_ARCHIVE_MAX_PENDING_BATCHES = 16
+DEFAULT_ARCHIVE_FLUSH_INTERVAL_SECONDS = 1
+DEFAULT_ARCHIVE_ROTATE_SECONDS = 3600
@@ -0,0 +1,202 @@
+import asyncio
+import logging
+import multiprocessing
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple, Union
+
+from easybov.common.codec import get_codec
+from easybov.common.constants import DEFAULT_DECODE_BATCH_SIZE
+from easybov.data.models.compact_order_book import CompactOrderbook
+
+log = logging.getLogger(__name__)
+
+# ProcessPoolExecutor.shutdown(cancel_futures=...) is only available from Python 3.9
+_CAN_CANCEL = "cancel_futures" in ProcessPoolExecutor.shutdown.__code__.co_varnames
+
+# a message built by a decode worker carries its final handler argument under this key, BaseStream._cast returns
+# it as is. Its `action`, `seqId` and `prevSeqId` are kept beside it for the sequence tracking of the stream.
+DECODED_KEY = "_decoded"
+
+_worker_codec = None
+_compact = False
+
+
+def is_books_frame(frame: Union[str, bytes]) -> bool:
+    """A cheap test, without decoding, for frames of the `books` channel."""
+    return (b'"books"' if isinstance(frame, bytes) else '"books"') in frame
+
+
+def _init_worker(codec: str, compact: bool) -> None:
+    global _worker_codec, _compact
+    _worker_codec = get_codec(codec)
+    _compact = compact
+
+
+def _decode_batch(frames: List[Union[str, bytes]]) -> List[Dict]:
+    """Runs in a worker process: decodes a batch of frames and builds their compact books."""
+    results = []
+    for frame in frames:
+        msg = _worker_codec.loads(frame)
+        arg = msg.get("arg")
+        if _compact and "event" not in msg and arg is not None and arg.get("channel") == "books":
+            data = msg["data"][0] if msg.get("data") else {}
+            results.append({
+                "arg": arg,
+                "action": msg.get("action"),
+                "seqId": data.get("seqId"),
+                "prevSeqId": data.get("prevSeqId"),
+                DECODED_KEY: CompactOrderbook.from_raw(arg["symbol"], msg),
+            })
+        else:
+            results.append(msg)
+    return results
+
+
+class DecodePool:
+    """
+    Decodes websocket frames, and builds their books, in a pool of worker processes.
+
+    Frames are batched, a batch being whatever arrived since the event loop last ran (up to `batch_size`), so the
+    pickling cost is shared by many messages. Results are delivered in the order the frames were received. With
+    `compact` the books come back as `CompactOrderbook`s ready for the handlers, which pickle as two small arrays;
+    otherwise the decoded dicts are returned and models are built in the parent process, since pickling a pydantic
+    `Orderbook` costs more than building it.
+
+    Args:
+        deliver (Callable[[Dict], Awaitable[None]]): Called on the event loop with each decoded message
+        workers (int): The number of worker processes
+        codec (str): The name of the JSON codec used by the workers
+        compact (bool): Whether the workers build `CompactOrderbook`s for books frames
+        batch_size (int): The maximum number of frames sent to a worker at once
+        max_pending (Optional[int]): The maximum number of batches in flight, after which `put` waits. Defaults to
+          twice the number of workers.
+    """
+
+    def __init__(
+        self,
+        deliver: Callable[[Dict], Awaitable[None]],
+        workers: int,
+        codec: str = "json",
+        compact: bool = False,
+        batch_size: int = DEFAULT_DECODE_BATCH_SIZE,
+        max_pending: Optional[int] = None,
+    ) -> None:
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+
+        self._deliver = deliver
+        self._workers = workers
+        self._codec = codec
+        self._compact = compact
+        self._batch_size = batch_size
+        self._max_pending = max_pending or 2 * workers
+
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._batch: List[Union[str, bytes]] = []
+        self._flush_scheduled = False
+        self._pending: Deque[Tuple[asyncio.Future, int]] = deque()
+        self._has_pending: Optional[asyncio.Event] = None
+        self._room: Optional[asyncio.Event] = None
+        self._delivery: Optional[asyncio.Task] = None
+
+        self.frames = 0
+        self.batches = 0
+        self.delivered = 0
+
+    def _start(self) -> None:
+        self._executor = ProcessPoolExecutor(
+            max_workers=self._workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self._codec, self._compact),
+        )
+        self._has_pending = asyncio.Event()
+        self._room = asyncio.Event()
+        self._delivery = asyncio.ensure_future(self._deliver_results())
+
+    async def put(self, frame: Union[str, bytes]) -> None:
+        """Queues a raw frame for decoding, waiting if too many batches are already in flight."""
+        if self._executor is None:
+            self._start()
+
+        while len(self._pending) >= self._max_pending:
+            self._room.clear()
+            await self._room.wait()
+
+        self.frames += 1
+        self._batch.append(frame)
+        if len(self._batch) >= self._batch_size:
+            self._flush()
+        elif not self._flush_scheduled:
+            self._flush_scheduled = True
+            asyncio.get_running_loop().call_soon(self._flush)
+
+    def _flush(self) -> None:
+        self._flush_scheduled = False
+        if not self._batch:
+            return
+        batch, self._batch = self._batch, []
+        future: Future = self._executor.submit(_decode_batch, batch)
+        self._pending.append((asyncio.wrap_future(future), len(batch)))
+        self.batches += 1
+        self._has_pending.set()
+
+    async def _deliver_results(self) -> None:
+        while True:
+            while not self._pending:
+                self._has_pending.clear()
+                await self._has_pending.wait()
+
+            future, size = self._pending[0]
+            try:
+                results = await future
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.exception(f"error decoding a batch of frames: {e}")
+                results = []
+                self.delivered += size
+            self._pending.popleft()
+            self._room.set()
+
+            for msg in results:
+                try:
+                    await self._deliver(msg)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    log.exception(f"error handling a decoded message: {e}")
+                self.delivered += 1
+
+    async def drain(self) -> None:
+        """Waits until every frame queued so far has been delivered."""
+        if self._executor is None:
+            return
+        self._flush()
+        while self.delivered < self.frames:
+            await asyncio.sleep(0.001)
+
+    async def stop(self) -> None:
+        """Stops the workers, dropping the frames not delivered yet."""
+        if self._delivery is not None:
+            self._delivery.cancel()
+            await asyncio.gather(self._delivery, return_exceptions=True)
+            self._delivery = None
+        if self._executor is not None:
+            if _CAN_CANCEL:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+            else:
+                self._executor.shutdown()
+            self._executor = None
+        self._pending.clear()
+        self._batch = []
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self._workers,
+            "frames": self.frames,
+            "batches": self.batches,
+            "delivered": self.delivered,
+            "in_flight": len(self._pending),
+        }
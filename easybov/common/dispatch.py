@@ -0,0 +1,211 @@
+import asyncio
+import itertools
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Mapping, Optional, Tuple, Union
+
+from easybov.common.constants import DEFAULT_DISPATCH_QUEUE_SIZE
+from easybov.common.enums import LatencyMetric, OverflowPolicy
+from easybov.common.instrumentation import Observer
+
+log = logging.getLogger(__name__)
+
+
+class DispatchQueue:
+    """
+    A bounded asyncio queue with an overflow policy, consumed by a single worker task.
+
+    Items are queued under a key: with `OverflowPolicy.CONFLATE` the key is the symbol and a newer item replaces the
+    queued one for the same key without losing its place in line, with the other policies every item gets its own
+    key and the queue is plain FIFO.
+    """
+
+    def __init__(self, maxsize: int, policy: Union[OverflowPolicy, str]) -> None:
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+
+        self._maxsize = maxsize
+        self._policy = OverflowPolicy(policy)
+        self._items: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._counter = itertools.count()
+        self._not_empty = asyncio.Event()
+        self._not_full = asyncio.Event()
+
+        self.received = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.conflated = 0
+        self.high_water = 0
+
+    @property
+    def policy(self) -> OverflowPolicy:
+        return self._policy
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    async def put(self, key: Hashable, item: Any) -> None:
+        self.received += 1
+        enqueued = time.perf_counter()
+
+        if self._policy == OverflowPolicy.CONFLATE:
+            if key in self._items:
+                self._items[key] = (enqueued, item)
+                self.conflated += 1
+                return
+        else:
+            key = next(self._counter)
+
+        while len(self._items) >= self._maxsize:
+            if self._policy == OverflowPolicy.BLOCK:
+                self._not_full.clear()
+                await self._not_full.wait()
+            else:
+                self._items.popitem(last=False)
+                self.dropped += 1
+
+        self._items[key] = (enqueued, item)
+        self.high_water = max(self.high_water, len(self._items))
+        self._not_empty.set()
+
+    async def get(self) -> Tuple[float, Any]:
+        """The oldest item and the `time.perf_counter()` at which it was queued."""
+        while not self._items:
+            self._not_empty.clear()
+            await self._not_empty.wait()
+
+        _, entry = self._items.popitem(last=False)
+        self.delivered += 1
+        self._not_full.set()
+        return entry
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "queued": len(self._items),
+            "received": self.received,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "conflated": self.conflated,
+            "high_water": self.high_water,
+        }
+
+
+class DispatchConfig:
+    """
+    How a stream hands messages to its handlers when dispatching runs off the websocket reader.
+
+    Args:
+        queue_size (int): The capacity of each queue
+        policies (Optional[Mapping[str, OverflowPolicy]]): The overflow policy per channel. Channels not listed use
+          `default_policy`. By default `books` conflate to the latest book per symbol and `orders` block, so order
+          updates are never dropped.
+        default_policy (OverflowPolicy): The policy of channels missing from `policies`
+        per_symbol (bool): Whether to give every (channel, symbol) pair its own queue and worker, so a slow handler
+          for one symbol does not delay the others. Messages of a symbol are always handled in order.
+    """
+
+    def __init__(
+        self,
+        queue_size: int = DEFAULT_DISPATCH_QUEUE_SIZE,
+        policies: Optional[Mapping[str, Union[OverflowPolicy, str]]] = None,
+        default_policy: Union[OverflowPolicy, str] = OverflowPolicy.BLOCK,
+        per_symbol: bool = False,
+    ) -> None:
+        self.queue_size = queue_size
+        self.policies: Dict[str, OverflowPolicy] = {
+            "books": OverflowPolicy.CONFLATE,
+            "orders": OverflowPolicy.BLOCK,
+        }
+        if policies:
+            self.policies.update({channel: OverflowPolicy(policy) for channel, policy in policies.items()})
+        self.default_policy = OverflowPolicy(default_policy)
+        self.per_symbol = per_symbol
+
+    def policy(self, channel: str) -> OverflowPolicy:
+        return self.policies.get(channel, self.default_policy)
+
+    def __repr__(self) -> str:
+        return (
+            f"DispatchConfig(queue_size={self.queue_size}, policies={self.policies}, "
+            f"default_policy={self.default_policy}, per_symbol={self.per_symbol})"
+        )
+
+
+class DispatchEngine:
+    """
+    Fans decoded stream messages out to bounded per-channel (or per-symbol) queues, each drained by its own worker
+    task.
+
+    The websocket reader only decodes and queues, so a slow `books` handler no longer holds up the socket or the
+    `orders` handler. Queues and workers are created on first use and live until `stop`, across reconnects.
+
+    Args:
+        handle (Callable[[Dict], Awaitable[None]]): Called by the workers with each message
+        config (DispatchConfig): Queue sizes, overflow policies and queue granularity
+        observer (Optional[Observer]): Receives the time each message spent queued, as `LatencyMetric.QUEUE`
+    """
+
+    def __init__(
+        self,
+        handle: Callable[[Dict], Awaitable[None]],
+        config: Optional[DispatchConfig] = None,
+        observer: Optional[Observer] = None,
+    ) -> None:
+        self._handle = handle
+        self._config = config or DispatchConfig()
+        self._observer = observer
+        self._queues: Dict[Tuple[str, Optional[str]], DispatchQueue] = {}
+        self._workers: Dict[Tuple[str, Optional[str]], asyncio.Task] = {}
+        self._busy = 0
+
+    @property
+    def config(self) -> DispatchConfig:
+        return self._config
+
+    async def put(self, channel: str, symbol: str, msg: Dict) -> None:
+        """Queues `msg`, waiting only if its queue is full and blocks."""
+        name = (channel, symbol if self._config.per_symbol else None)
+        queue = self._queues.get(name)
+        if queue is None:
+            queue = self._queues[name] = DispatchQueue(self._config.queue_size, self._config.policy(channel))
+            self._workers[name] = asyncio.ensure_future(self._work(channel, queue))
+        await queue.put(symbol, msg)
+
+    async def _work(self, channel: str, queue: DispatchQueue) -> None:
+        while True:
+            enqueued, msg = await queue.get()
+            if self._observer is not None:
+                self._observer.observe(LatencyMetric.QUEUE, channel, time.perf_counter() - enqueued)
+            self._busy += 1
+            try:
+                await self._handle(msg)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.exception(f"error in {channel} handler: {e}")
+            finally:
+                self._busy -= 1
+
+    async def join(self) -> None:
+        """Waits until every message queued so far has been handled."""
+        while self._busy or any(len(queue) for queue in self._queues.values()):
+            await asyncio.sleep(0.001)
+
+    async def stop(self) -> None:
+        """Cancels the workers, discarding whatever is still queued."""
+        workers = list(self._workers.values())
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        self._workers = {}
+        self._queues = {}
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        Counters per queue, keyed by channel, or "channel:symbol" with `per_symbol`.
+        """
+        return {
+            channel if symbol is None else f"{channel}:{symbol}": queue.stats()
+            for (channel, symbol), queue in self._queues.items()
+        }
@@ -27,4 +27,45 @@ class PaginationType(str, Enum):
 
 class Sort(str, Enum):
     ASC = "asc"
-    DESC = "desc"
\ No newline at end of file
+    DESC = "desc"
+
+
+class LatencyMetric(str, Enum):
+    """
+    The measurements reported to an instrumentation Observer.
+
+    Attributes:
+        SIGN: Serialising the payload of a REST request and building its signed headers.
+        NETWORK: One REST round trip, from sending the request to having read the response body.
+        DECODE: Decoding a JSON REST response or websocket frame.
+        MODEL: Building the pydantic model handed back to the caller or handler.
+        HANDLER: Running a user stream handler.
+        MESSAGE_AGE: Time between the exchange timestamp of a stream message and its local receipt.
+        QUEUE: Time a stream message waited in its dispatch queue before its handler was called.
+        RECONNECT: Time a stream took to recover from a dropped connection, until resubscribed.
+    """
+
+    SIGN = "sign"
+    NETWORK = "network"
+    DECODE = "decode"
+    MODEL = "model"
+    HANDLER = "handler"
+    MESSAGE_AGE = "message_age"
+    QUEUE = "queue"
+    RECONNECT = "reconnect"
+
+
+class OverflowPolicy(str, Enum):
+    """
+    What a stream dispatch queue does with a new message when it is full.
+
+    Attributes:
+        BLOCK: Wait for room. The websocket reader stops reading until the handler catches up, nothing is lost.
+        DROP_OLDEST: Discard the oldest queued message to make room for the new one.
+        CONFLATE: Keep only the latest message per symbol: a new message replaces the queued one for the same symbol
+          in place, and when the queue is full of other symbols the oldest one is discarded.
+    """
+
+    BLOCK = "block"
+    DROP_OLDEST = "drop_oldest"
+    CONFLATE = "conflate"
@@ -22,6 +22,9 @@ class APIError(Exception):
         http_error = self._http_error
         if http_error is not None and hasattr(http_error, "response"):
             return http_error.response.status_code
+        # aiohttp.ClientResponseError carries the status directly
+        if http_error is not None and hasattr(http_error, "status"):
+            return http_error.status
 
     @property
     def request(self):
@@ -37,6 +40,20 @@ class APIError(Exception):
 class RetryException(Exception):
     """
     Thrown by RESTClient's internally to represent a request that should be retried.
+    error is what gets raised if the retry policy gives up, status_code is the HTTP status that triggered the
+    retry (None for transport errors) and retry_after the delay asked for by the server's Retry-After header.
+    """
+
+    def __init__(self, error=None, status_code=None, retry_after=None):
+        super().__init__(error)
+        self.error = error
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class RequestTimeoutError(TimeoutError):
+    """
+    Raised when a REST request times out or misses its overall deadline, retries included.
     """
 
     pass
@@ -0,0 +1,183 @@
+import math
+import threading
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, List, Optional, Tuple
+
+# values are recorded in whole microseconds, each power of two range is split in this many linear sub buckets
+# which keeps the relative error of a recorded value below 1/64 (~1.6%)
+_SUB_BUCKET_BITS = 7
+_SUB_BUCKET_COUNT = 1 << _SUB_BUCKET_BITS
+_SUB_BUCKET_HALF = _SUB_BUCKET_COUNT >> 1
+
+
+class Observer(ABC):
+    """
+    Receives latency measurements from the REST clients and the data streams.
+
+    `metric` is one of the `LatencyMetric` values, `key` names what was measured: "POST /trade/order" for REST
+    endpoints, the channel name ("books", "orders") for streams. Implementations are called on the hot path, so
+    they must be cheap and must not block.
+    """
+
+    @abstractmethod
+    def observe(self, metric: str, key: str, seconds: float) -> None:
+        pass
+
+
+class CallbackObserver(Observer):
+    """
+    Forwards every measurement to a plain callable taking (metric, key, seconds).
+    """
+
+    def __init__(self, callback: Callable[[str, str, float], None]) -> None:
+        self._callback = callback
+
+    def observe(self, metric: str, key: str, seconds: float) -> None:
+        self._callback(metric, key, seconds)
+
+
+class LatencyHistogram:
+    """
+    A thread safe, fixed precision histogram of durations in the spirit of HdrHistogram.
+
+    Recording is O(1) and memory grows with the logarithm of the largest value, so it can run for a whole session.
+    Percentiles are accurate to about 1.6%.
+    """
+
+    def __init__(self) -> None:
+        self._counts: List[int] = []
+        self._count = 0
+        self._total = 0.0
+        self._min = math.inf
+        self._max = 0.0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _index(micros: int) -> int:
+        if micros < _SUB_BUCKET_COUNT:
+            return micros
+        exponent = micros.bit_length() - _SUB_BUCKET_BITS
+        return exponent * _SUB_BUCKET_HALF + (micros >> exponent)
+
+    @staticmethod
+    def _bucket_value(index: int) -> float:
+        """The midpoint, in microseconds, of the values sharing a bucket."""
+        if index < _SUB_BUCKET_COUNT:
+            return float(index)
+        exponent = index // _SUB_BUCKET_HALF - 1
+        lower = (index - exponent * _SUB_BUCKET_HALF) << exponent
+        return lower + ((1 << exponent) - 1) / 2
+
+    def record(self, seconds: float) -> None:
+        micros = int(seconds * 1_000_000) if seconds > 0 else 0
+        index = self._index(micros)
+
+        with self._lock:
+            if index >= len(self._counts):
+                self._counts.extend([0] * (index + 1 - len(self._counts)))
+            self._counts[index] += 1
+            self._count += 1
+            self._total += seconds
+            if seconds < self._min:
+                self._min = seconds
+            if seconds > self._max:
+                self._max = seconds
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    @property
+    def min(self) -> float:
+        return self._min if self._count else 0.0
+
+    @property
+    def max(self) -> float:
+        return self._max
+
+    @property
+    def mean(self) -> float:
+        return self._total / self._count if self._count else 0.0
+
+    def percentile(self, percentile: float) -> float:
+        """
+        The value, in seconds, below which `percentile` percent of the recordings fall.
+
+        Args:
+            percentile (float): between 0 and 100, eg. 99.9
+
+        Returns:
+            float: the duration in seconds, 0 when nothing was recorded
+        """
+        with self._lock:
+            if not self._count:
+                return 0.0
+
+            target = max(1, math.ceil(self._count * percentile / 100))
+            seen = 0
+            for index, count in enumerate(self._counts):
+                seen += count
+                if seen >= target:
+                    value = self._bucket_value(index) / 1_000_000
+                    return min(max(value, self._min), self._max)
+
+        return self._max
+
+    def summary(self) -> Dict[str, float]:
+        """count, mean, min, p50, p99, p999 and max, durations in seconds."""
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "min": self.min,
+            "p50": self.percentile(50),
+            "p99": self.percentile(99),
+            "p999": self.percentile(99.9),
+            "max": self.max,
+        }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counts = []
+            self._count = 0
+            self._total = 0.0
+            self._min = math.inf
+            self._max = 0.0
+
+
+class HistogramCollector(Observer):
+    """
+    An in-memory Observer keeping one LatencyHistogram per (metric, key).
+
+    Example:
+        collector = HistogramCollector()
+        client = TradingClient(api_key, secret_key, observer=collector)
+        ...
+        collector.summary()["network"]["POST /trade/order"]["p99"]
+    """
+
+    def __init__(self) -> None:
+        self._histograms: Dict[Tuple[str, str], LatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, metric: str, key: str, seconds: float) -> None:
+        histogram = self._histograms.get((metric, key))
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault((metric, key), LatencyHistogram())
+        histogram.record(seconds)
+
+    def histogram(self, metric: str, key: str) -> Optional[LatencyHistogram]:
+        return self._histograms.get((metric, key))
+
+    def summary(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """
+        Percentiles of everything recorded so far, as {metric: {key: {"p50": ..., "p99": ..., ...}}}.
+        """
+        result: Dict[str, Dict[str, Dict[str, float]]] = {}
+        for (metric, key), histogram in list(self._histograms.items()):
+            result.setdefault(getattr(metric, "value", metric), {})[key] = histogram.summary()
+        return result
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms = {}
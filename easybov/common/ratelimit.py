@@ -0,0 +1,256 @@
+import asyncio
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Mapping, Optional, Tuple
+
+from easybov.common.constants import (
+    DEFAULT_ORDER_RATE_LIMIT,
+    DEFAULT_CANCEL_RATE_LIMIT,
+    DEFAULT_QUERY_RATE_LIMIT,
+)
+
+EndpointKey = Tuple[str, str]  # (HTTP method, API path) e.g. ("POST", "/trade/order")
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parses a Retry-After header, which is either a number of seconds or an HTTP date.
+
+    Args:
+        value (Optional[str]): The raw header value
+
+    Returns:
+        Optional[float]: Seconds to wait from now, or None if the header is missing or malformed
+    """
+    if not value:
+        return None
+
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+    return max(retry_at.timestamp() - time.time(), 0.0)
+
+
+class TokenBucket:
+    """
+    A token bucket that is safe to share between threads and asyncio tasks.
+
+    Callers reserve tokens up front: the bucket may go into debt, and the reservation returns how long the caller
+    has to wait for its tokens to exist. The lock is only held while reserving, never while waiting, so the same
+    bucket paces blocking threads (`acquire`) and coroutines (`acquire_async`) fairly in arrival order.
+
+    Args:
+        rate (float): Tokens added per second
+        capacity (Optional[float]): Maximum burst size. Defaults to `rate`, ie. one second worth of tokens.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+
+        self._rate = float(rate)
+        self._capacity = float(capacity) if capacity else float(rate)
+        self._tokens = self._capacity
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def rate(self) -> float:
+        return self._rate
+
+    @property
+    def capacity(self) -> float:
+        return self._capacity
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._updated
+        if elapsed > 0:
+            self._tokens = min(self._capacity, self._tokens + elapsed * self._rate)
+            self._updated = now
+
+    def reserve(self, tokens: float = 1.0, timeout: Optional[float] = None) -> Optional[float]:
+        """
+        Takes `tokens` from the bucket and returns how many seconds the caller must wait before using them, or
+        None, taking nothing, when that wait would be longer than `timeout` seconds.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            missing = tokens - self._tokens
+            wait = max(missing / self._rate if missing > 0 else 0.0, self._blocked_until - now)
+            if timeout is not None and wait > timeout:
+                return None
+            self._tokens -= tokens
+            return wait
+
+    def acquire(self, tokens: float = 1.0, timeout: Optional[float] = None) -> bool:
+        """
+        Blocks the calling thread until `tokens` are available.
+
+        Args:
+            tokens (float): The tokens to take
+            timeout (Optional[float]): The longest wait accepted, None to wait as long as needed
+
+        Returns:
+            bool: False, without waiting or taking any token, if the tokens would only be available after `timeout`
+        """
+        wait = self.reserve(tokens, timeout)
+        if wait is None:
+            return False
+        if wait > 0:
+            time.sleep(wait)
+        return True
+
+    async def acquire_async(self, tokens: float = 1.0) -> None:
+        """Suspends the calling coroutine until `tokens` are available."""
+        wait = self.reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def available(self) -> float:
+        """The number of tokens that can be taken right now without waiting. Negative while in debt."""
+        with self._lock:
+            now = time.monotonic()
+            if now < self._blocked_until:
+                return 0.0
+            self._refill(now)
+            return self._tokens
+
+    def block_for(self, seconds: float) -> None:
+        """Empties the bucket and refuses tokens for `seconds`, eg. after a 429 with Retry-After."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens = min(self._tokens, 0.0)
+            self._blocked_until = max(self._blocked_until, now + seconds)
+
+    def sync_remaining(self, remaining: float, reset_seconds: Optional[float] = None) -> None:
+        """
+        Aligns the local budget with what the server reports.
+
+        Args:
+            remaining (float): Requests the server still allows in the current window
+            reset_seconds (Optional[float]): Seconds until the server window resets
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens = min(self._tokens, float(remaining))
+            if remaining <= 0 and reset_seconds:
+                self._blocked_until = max(self._blocked_until, now + reset_seconds)
+
+
+class RateLimiter:
+    """
+    Paces REST requests per endpoint with one TokenBucket per (method, path).
+
+    Endpoints without a bucket, and no `default` bucket, are not limited. Every endpoint has its own budget so
+    cancels never queue behind new orders; strategies can inspect `budget` to decide what to send next.
+
+    Args:
+        limits (Optional[Mapping[EndpointKey, TokenBucket]]): Buckets keyed by (HTTP method, API path)
+        default (Optional[TokenBucket]): Bucket shared by every endpoint not listed in `limits`
+    """
+
+    def __init__(
+        self,
+        limits: Optional[Mapping[EndpointKey, TokenBucket]] = None,
+        default: Optional[TokenBucket] = None,
+    ) -> None:
+        self._limits: Dict[EndpointKey, TokenBucket] = {
+            (method.upper(), path): bucket for (method, path), bucket in (limits or {}).items()
+        }
+        self._default = default
+
+    @classmethod
+    def for_trading(
+        cls,
+        order_rate: float = DEFAULT_ORDER_RATE_LIMIT,
+        cancel_rate: float = DEFAULT_CANCEL_RATE_LIMIT,
+        query_rate: float = DEFAULT_QUERY_RATE_LIMIT,
+    ) -> "RateLimiter":
+        """
+        Builds a limiter with independent buckets for order entry, cancels and order queries.
+
+        Args:
+            order_rate (float): Requests per second for POST /trade/order
+            cancel_rate (float): Requests per second for POST /trade/cancel-order
+            query_rate (float): Requests per second for GET /trade/order
+
+        Returns:
+            RateLimiter: the configured limiter
+        """
+        return cls(
+            {
+                ("POST", "/trade/order"): TokenBucket(order_rate),
+                ("POST", "/trade/cancel-order"): TokenBucket(cancel_rate),
+                ("GET", "/trade/order"): TokenBucket(query_rate),
+            }
+        )
+
+    def bucket(self, method: str, path: str) -> Optional[TokenBucket]:
+        return self._limits.get((method.upper(), path), self._default)
+
+    def acquire(self, method: str, path: str, timeout: Optional[float] = None) -> bool:
+        """Waits for a token of the endpoint's bucket, False if it would come after `timeout` seconds."""
+        bucket = self.bucket(method, path)
+        if bucket is None:
+            return True
+        return bucket.acquire(timeout=timeout)
+
+    async def acquire_async(self, method: str, path: str) -> None:
+        bucket = self.bucket(method, path)
+        if bucket is not None:
+            await bucket.acquire_async()
+
+    def budget(self, method: str, path: str) -> Optional[float]:
+        """
+        The number of requests that can be sent to an endpoint right now without being paced.
+
+        Returns:
+            Optional[float]: the available tokens, or None if the endpoint is not limited
+        """
+        bucket = self.bucket(method, path)
+        if bucket is None:
+            return None
+        return bucket.available()
+
+    def update_from_headers(self, method: str, path: str, headers: Mapping[str, str]) -> Optional[float]:
+        """
+        Learns from the rate limit headers of a response.
+
+        Honours `Retry-After` and the `X-RateLimit-Remaining` / `X-RateLimit-Reset` pair. A reset larger than a
+        day is taken as an epoch timestamp, anything smaller as a number of seconds.
+
+        Returns:
+            Optional[float]: the Retry-After delay in seconds if the server sent one
+        """
+        retry_after = parse_retry_after(headers.get("Retry-After"))
+        bucket = self.bucket(method, path)
+        if bucket is None:
+            return retry_after
+
+        if retry_after is not None:
+            bucket.block_for(retry_after)
+
+        remaining = headers.get("X-RateLimit-Remaining")
+        if remaining is not None:
+            try:
+                reset = headers.get("X-RateLimit-Reset")
+                reset_seconds = float(reset) if reset is not None else None
+                if reset_seconds is not None and reset_seconds > 86400:
+                    reset_seconds = max(reset_seconds - time.time(), 0.0)
+                bucket.sync_remaining(float(remaining), reset_seconds)
+            except ValueError:
+                pass
+
+        return retry_after
@@ -0,0 +1,108 @@
+import random
+from typing import Dict, Optional, Union
+
+from easybov.common.constants import (
+    DEFAULT_RECONNECT_BACKOFF_BASE_SECONDS,
+    DEFAULT_RECONNECT_BACKOFF_MAX_SECONDS,
+    DEFAULT_LOGIN_PAYLOAD_MAX_AGE_SECONDS,
+    DEFAULT_SUBSCRIBE_BATCH_SIZE,
+)
+
+
+class ReconnectPolicy:
+    """
+    Decides when a dropped stream reconnects.
+
+    Delays grow exponentially from `backoff_base` by `backoff_factor` up to `backoff_max`, and `jitter` randomises
+    that fraction of each delay so many clients dropped together do not reconnect in lock step. The first reconnect
+    after a healthy session is immediate when `immediate_first` is set.
+
+    Args:
+        backoff_base (float): Delay in seconds before the first delayed attempt
+        backoff_factor (float): Multiplier applied to the delay after each failed attempt
+        backoff_max (float): Upper bound of a single delay in seconds
+        jitter (float): Fraction, between 0 and 1, of each delay that is randomised
+        immediate_first (bool): Whether to retry once without waiting after a drop
+        max_attempts (Optional[int]): Consecutive failed attempts after which the stream stops, None to never give up
+        login_payload_max_age (float): Seconds a precomputed login payload is reused for
+        subscribe_batch_size (int): The maximum number of channels per subscribe message
+    """
+
+    def __init__(
+        self,
+        backoff_base: float = DEFAULT_RECONNECT_BACKOFF_BASE_SECONDS,
+        backoff_factor: float = 2.0,
+        backoff_max: float = DEFAULT_RECONNECT_BACKOFF_MAX_SECONDS,
+        jitter: float = 0.5,
+        immediate_first: bool = True,
+        max_attempts: Optional[int] = None,
+        login_payload_max_age: float = DEFAULT_LOGIN_PAYLOAD_MAX_AGE_SECONDS,
+        subscribe_batch_size: int = DEFAULT_SUBSCRIBE_BATCH_SIZE,
+    ) -> None:
+        if not 0 <= jitter <= 1:
+            raise ValueError("jitter must be between 0 and 1")
+
+        if subscribe_batch_size < 1:
+            raise ValueError("subscribe_batch_size must be at least 1")
+
+        self.backoff_base = backoff_base
+        self.backoff_factor = backoff_factor
+        self.backoff_max = backoff_max
+        self.jitter = jitter
+        self.immediate_first = immediate_first
+        self.max_attempts = max_attempts
+        self.login_payload_max_age = login_payload_max_age
+        self.subscribe_batch_size = subscribe_batch_size
+
+    def backoff(self, attempt: int) -> float:
+        """
+        The delay before reconnect attempt number `attempt` (0 based) since the connection was lost.
+        """
+        if self.immediate_first:
+            if attempt == 0:
+                return 0.0
+            attempt -= 1
+
+        delay = min(self.backoff_max, self.backoff_base * (self.backoff_factor ** attempt))
+        return delay - delay * self.jitter * random.random()
+
+    def gives_up(self, attempt: int) -> bool:
+        return self.max_attempts is not None and attempt >= self.max_attempts
+
+
+class ReconnectStats:
+    """
+    Connection health of a stream: how often it dropped, how long it took to recover and what may have been missed.
+
+    Attributes:
+        connects (int): Successful connections, the first one included
+        disconnects (int): Connections lost, or attempts that failed
+        reconnects (int): Recoveries, from a drop to being logged in and resubscribed again
+        last_reconnect_seconds (Optional[float]): Duration of the last recovery
+        max_reconnect_seconds (float): Longest recovery so far
+        downtime_seconds (float): Total time spent disconnected after the first connection
+        sequence_gaps (int): Books updates whose `prevSeqId` did not follow the previous update of the symbol
+        last_error (Optional[str]): The error that caused the last drop
+    """
+
+    def __init__(self) -> None:
+        self.connects = 0
+        self.disconnects = 0
+        self.reconnects = 0
+        self.last_reconnect_seconds: Optional[float] = None
+        self.max_reconnect_seconds = 0.0
+        self.downtime_seconds = 0.0
+        self.sequence_gaps = 0
+        self.last_error: Optional[str] = None
+
+    def record_reconnect(self, seconds: float) -> None:
+        self.reconnects += 1
+        self.last_reconnect_seconds = seconds
+        self.max_reconnect_seconds = max(self.max_reconnect_seconds, seconds)
+        self.downtime_seconds += seconds
+
+    def as_dict(self) -> Dict[str, Union[int, float, str, None]]:
+        return dict(vars(self))
+
+    def __repr__(self) -> str:
+        return "ReconnectStats({})".format(", ".join(f"{k}={v!r}" for k, v in vars(self).items()))
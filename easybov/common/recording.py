@@ -0,0 +1,108 @@
+import struct
+import time
+from typing import BinaryIO, Iterator, Optional, Tuple, Union
+
+import msgpack
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# file layout: the magic, then one record per frame, each a little endian uint32 length followed by the msgpack
+# encoded [receive timestamp, frame]
+_MAGIC = b"EBOVREC1"
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+_LENGTH = struct.Struct("<I")
+_BUFFER_SIZE = 1 << 20
+
+Frame = Union[str, bytes]
+
+
+def _require_zstandard() -> None:
+    if zstandard is None:
+        raise ImportError("zstd compression needs zstandard, install it with `pip install zstandard`")
+
+
+class FrameRecorder:
+    """
+    Appends raw websocket frames, with the time they were received, to a compact length prefixed file.
+
+    Frames are stored exactly as received (before decoding) so a ReplayStream runs them through the very same
+    decoding and dispatch code. Writes are buffered: the cost on the websocket reader is a msgpack call and a
+    memory copy.
+
+    Example:
+        recorder = FrameRecorder("session.rec")
+        stream = B3DataStream(api_key, secret_key, recorder=recorder)
+
+    Args:
+        path (str): The file to create, overwritten if it exists
+        compress (bool): Whether to zstd compress the file. Requires the zstandard package.
+    """
+
+    def __init__(self, path: str, compress: bool = False) -> None:
+        self.path = path
+        self.frames = 0
+        if compress:
+            _require_zstandard()
+        self._file: BinaryIO = open(path, "wb", buffering=_BUFFER_SIZE)
+        if compress:
+            self._file = zstandard.ZstdCompressor().stream_writer(self._file)
+        self._file.write(_MAGIC)
+        self._packer = msgpack.Packer()
+
+    def write(self, frame: Frame, received: Optional[float] = None) -> None:
+        record = self._packer.pack([received if received is not None else time.time(), frame])
+        self._file.write(_LENGTH.pack(len(record)))
+        self._file.write(record)
+        self.frames += 1
+
+    def flush(self) -> None:
+        self._file.flush()
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self._file.close()
+
+    def __enter__(self) -> "FrameRecorder":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def read_frames(path: str) -> Iterator[Tuple[float, Frame]]:
+    """
+    Yields the (receive timestamp, frame) records of a file written by a FrameRecorder, compressed or not.
+    """
+    with open(path, "rb", buffering=_BUFFER_SIZE) as source:
+        if source.peek(len(_ZSTD_MAGIC))[:len(_ZSTD_MAGIC)] == _ZSTD_MAGIC:
+            _require_zstandard()
+            source = zstandard.ZstdDecompressor().stream_reader(source)
+
+        if _read_exactly(source, len(_MAGIC)) != _MAGIC:
+            raise ValueError(f"{path} is not a recording")
+
+        while True:
+            header = _read_exactly(source, _LENGTH.size)
+            if len(header) < _LENGTH.size:
+                return
+            (length,) = _LENGTH.unpack(header)
+            record = _read_exactly(source, length)
+            if len(record) < length:
+                # the recorder was killed mid write, the last frame is incomplete
+                return
+            received, frame = msgpack.unpackb(record)
+            yield received, frame
+
+
+def _read_exactly(source: BinaryIO, size: int) -> bytes:
+    # decompressing readers may return fewer bytes than asked before the end of the file
+    data = source.read(size)
+    while len(data) < size:
+        more = source.read(size - len(data))
+        if not more:
+            break
+        data += more
+    return data
@@ -1,13 +1,94 @@
+import json
 from datetime import datetime, timezone
-from typing import Any
+from enum import Enum
+from json.encoder import c_encode_basestring_ascii, py_encode_basestring_ascii
+from typing import Any, Callable, Dict, NamedTuple, Optional, Tuple, Union, get_args, get_origin
 from uuid import UUID
 
 from easybov.common.models import ValidateBaseModel as BaseModel
 
+# the C accelerated string encoder json.dumps uses internally, None when the _json extension is missing
+_encode_str = c_encode_basestring_ascii or py_encode_basestring_ascii
+
+
+def _rfc3339(val: datetime) -> str:
+    # if the datetime is naive, assume it's UTC
+    # https://docs.python.org/3/library/datetime.html#determining-if-an-object-is-aware-or-naive
+    if val.tzinfo is None or val.tzinfo.utcoffset(val) is None:
+        val = val.replace(tzinfo=timezone.utc)
+    return val.isoformat()
+
+
+def _enum_value(val: Any) -> Any:
+    # templates updated without validation may hold the raw value instead of the member
+    return val.value if isinstance(val, Enum) else val
+
+
+def _encode_json(val: Any) -> str:
+    return json.dumps(_enum_value(val))
+
+
+class _FieldPlan(NamedTuple):
+    name: str
+    key: str  # the JSON encoded key followed by the colon, eg. '"symbol":'
+    convert: Optional[Callable[[Any], Any]]  # to the JSON compatible value, None when already one
+    encode: Callable[[Any], str]  # to the JSON text of the value
+
+
+# request class -> its field plans, or None when a field needs the generic recursive conversion
+_PLANS: Dict[type, Optional[Tuple[_FieldPlan, ...]]] = {}
+
+
+def _field_plan(name: str, annotation: Any) -> Optional[_FieldPlan]:
+    """How to serialise a field of this type, None when the type is not flat."""
+    if get_origin(annotation) is Union:
+        args = [arg for arg in get_args(annotation) if arg is not type(None)]
+        if len(args) != 1:
+            return None
+        annotation = args[0]
+
+    key = _encode_str(name) + ":"
+    if not isinstance(annotation, type):
+        return None
+    if issubclass(annotation, str):
+        # str enums included: the encoder writes the value of str subclasses as is
+        convert = _enum_value if issubclass(annotation, Enum) else None
+        return _FieldPlan(name, key, convert, _encode_str)
+    if issubclass(annotation, Enum):
+        return _FieldPlan(name, key, _enum_value, _encode_json)
+    if issubclass(annotation, datetime):
+        return _FieldPlan(name, key, _rfc3339, lambda val: _encode_str(_rfc3339(val)))
+    if issubclass(annotation, UUID):
+        return _FieldPlan(name, key, str, lambda val: _encode_str(str(val)))
+    if issubclass(annotation, (int, float, bool)):
+        return _FieldPlan(name, key, None, json.dumps)
+    return None
+
+
+def _plan(cls: type) -> Optional[Tuple[_FieldPlan, ...]]:
+    try:
+        return _PLANS[cls]
+    except KeyError:
+        pass
+
+    plans = []
+    for name, field in cls.model_fields.items():
+        field_plan = _field_plan(name, field.annotation)
+        if field_plan is None:
+            plans = None
+            break
+        plans.append(field_plan)
+
+    plan = _PLANS[cls] = tuple(plans) if plans is not None else None
+    return plan
+
 
 class NonEmptyRequest(BaseModel):
     """
     Mixin for models that represent requests where we don't want to send nulls for optional fields.
+
+    Requests whose fields are all flat (strings, numbers, enums, datetimes and UUIDs), like the order requests, are
+    serialised through a plan of their fields computed once per class instead of `model_dump` and a recursive walk.
     """
 
     def to_request_fields(self) -> dict:
@@ -24,6 +105,15 @@ class NonEmptyRequest(BaseModel):
         Returns:
             dict: a dict containing any set fields
         """
+        plan = _plan(type(self))
+        if plan is not None:
+            values = self.__dict__
+            fields = {}
+            for name, _, convert, _ in plan:
+                val = values[name]
+                if val:
+                    fields[name] = val if convert is None else convert(val)
+            return fields
 
         def map_values(val: Any) -> Any:
             """
@@ -46,11 +136,7 @@ class NonEmptyRequest(BaseModel):
 
             # RFC 3339
             if isinstance(val, datetime):
-                # if the datetime is naive, assume it's UTC
-                # https://docs.python.org/3/library/datetime.html#determining-if-an-object-is-aware-or-naive
-                if val.tzinfo is None or val.tzinfo.utcoffset(val) is None:
-                    val = val.replace(tzinfo=timezone.utc)
-                return val.isoformat()
+                return _rfc3339(val)
 
             return val
 
@@ -62,3 +148,38 @@ class NonEmptyRequest(BaseModel):
             for key, val in self.model_dump(exclude_none=True).items()
             if val and len(str(val)) > 0
         }
+
+    def to_request_body(self) -> bytes:
+        """
+        The JSON payload of `to_request_fields`, written straight from the field plan for flat requests. The REST
+        clients sign and send these bytes as they are.
+
+        Returns:
+            bytes: compact UTF-8 JSON
+        """
+        plan = _plan(type(self))
+        if plan is None:
+            return json.dumps(self.to_request_fields(), separators=(",", ":")).encode("utf-8")
+
+        values = self.__dict__
+        try:
+            parts = [key + encode(values[name]) for name, key, _, encode in plan if values[name]]
+        except TypeError:
+            # a value of another type than the field's, set on a template through copy_with
+            return json.dumps(self.to_request_fields(), separators=(",", ":")).encode("utf-8")
+        return ("{" + ",".join(parts) + "}").encode("utf-8")
+
+    def copy_with(self, **changes: Any) -> "NonEmptyRequest":
+        """
+        A copy of this request with `changes` applied and NOT validated, for trusted templates: validate a request
+        once, then derive each order from it by changing only eg. `cl_ord_id`, `price` and `order_qty`.
+
+        The caller is responsible for the values having the field types, eg. strings for prices and quantities.
+
+        Args:
+            **changes: field -> new value
+
+        Returns:
+            NonEmptyRequest: a request of the same class
+        """
+        return self.model_copy(update=changes)
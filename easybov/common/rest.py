@@ -1,31 +1,45 @@
+import asyncio
 import time
 import base64
 import hashlib
 import hmac
-import json
 from abc import ABC
 from typing import Any, List, Optional, Type, Union, Tuple, Iterator
 from urllib.parse import urlencode
 
+import aiohttp
 from pydantic import BaseModel
 from requests import Session
-from requests.exceptions import HTTPError
+from requests.adapters import HTTPAdapter
+from requests.exceptions import HTTPError, RequestException, Timeout as RequestsTimeout
+from yarl import URL
 from itertools import chain
 
 from easybov.common.constants import (
-    DEFAULT_RETRY_ATTEMPTS,
-    DEFAULT_RETRY_WAIT_SECONDS,
-    DEFAULT_RETRY_EXCEPTION_CODES,
+    DEFAULT_POOL_SIZE,
+    DEFAULT_CONNECT_TIMEOUT_SECONDS,
+    DEFAULT_READ_TIMEOUT_SECONDS,
+    DEFAULT_KEEPALIVE_TIMEOUT_SECONDS,
+    DEFAULT_MAX_IN_FLIGHT,
 )
 
 from easybov import __version__
-from easybov.common.exceptions import APIError, RetryException
-from easybov.common.types import RawData, HTTPResult, Credentials
+from easybov.common.exceptions import APIError, RetryException, RequestTimeoutError
+from easybov.common.ratelimit import RateLimiter, parse_retry_after
+from easybov.common.retry import RetryPolicy
+from easybov.common.types import RawData, HTTPResult, Credentials, Timeout
 from .constants import PageItem
-from .enums import PaginationType, BaseURL
+from easybov.common.codec import JSONCodec, get_codec
+from easybov.common.instrumentation import Observer
+from .enums import PaginationType, BaseURL, LatencyMetric
 
 
-class RESTClient(ABC):
+class BaseRESTClient(ABC):
+    """
+    Holds everything shared by the blocking and the asyncio REST clients: credentials, retry configuration,
+    request signing and response parsing helpers. Subclasses only provide the transport.
+    """
+
     def __init__(
         self,
         base_url: Union[BaseURL, str],
@@ -36,6 +50,12 @@ class RESTClient(ABC):
         retry_attempts: Optional[int] = None,
         retry_wait_seconds: Optional[int] = None,
         retry_exception_codes: Optional[List[int]] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        timeout: Optional[Timeout] = None,
+        deadline: Optional[float] = None,
+        observer: Optional[Observer] = None,
+        codec: Optional[Union[JSONCodec, str]] = None,
     ) -> None:
 
         self._api_key, self._secret_key = self._validate_credentials(
@@ -44,43 +64,152 @@ class RESTClient(ABC):
         self._api_version: str = api_version
         self._base_url: Union[BaseURL, str] = base_url
         self._use_raw_data: bool = raw_data
-        self._session: Session = Session()
 
-        # setting up request retry configurations
-        self._retry: int = DEFAULT_RETRY_ATTEMPTS
-        self._retry_wait: int = DEFAULT_RETRY_WAIT_SECONDS
-        self._retry_codes: List[int] = DEFAULT_RETRY_EXCEPTION_CODES
+        # setting up request retry configurations, the legacy arguments tune the default policy
+        if retry_policy is None:
+            policy_args = {}
 
-        if retry_attempts and retry_attempts > 0:
-            self._retry = retry_attempts
+            if retry_attempts and retry_attempts > 0:
+                policy_args["max_retries"] = retry_attempts
 
-        if retry_wait_seconds and retry_wait_seconds > 0:
-            self._retry_wait = retry_wait_seconds
+            if retry_wait_seconds and retry_wait_seconds > 0:
+                # a fixed wait, as these arguments always meant: no growth and no jitter
+                policy_args["backoff_base"] = retry_wait_seconds
+                policy_args["backoff_max"] = retry_wait_seconds
+                policy_args["jitter"] = 0.0
 
-        if retry_exception_codes:
-            self._retry_codes = retry_exception_codes
+            if retry_exception_codes:
+                policy_args["retry_statuses"] = retry_exception_codes
 
-    def _request(
+            retry_policy = RetryPolicy(**policy_args)
+
+        self._retry_policy: RetryPolicy = retry_policy
+        self._rate_limiter: Optional[RateLimiter] = rate_limiter
+
+        self._timeout: Tuple[float, float] = self._resolve_timeout(
+            timeout, (DEFAULT_CONNECT_TIMEOUT_SECONDS, DEFAULT_READ_TIMEOUT_SECONDS)
+        )
+        self._deadline: Optional[float] = deadline
+        self._observer: Optional[Observer] = observer
+        self._codec: JSONCodec = get_codec(codec)
+
+    @property
+    def rate_limiter(self) -> Optional[RateLimiter]:
+        """The client side rate limiter pacing requests, if one was configured."""
+        return self._rate_limiter
+
+    @property
+    def retry_policy(self) -> RetryPolicy:
+        """The policy deciding whether and when failed requests are retried."""
+        return self._retry_policy
+
+    @property
+    def observer(self) -> Optional[Observer]:
+        """The instrumentation observer receiving latency measurements, if one was configured."""
+        return self._observer
+
+    @staticmethod
+    def _endpoint_key(method: str, path: str) -> str:
+        """The name an endpoint is reported under to the observer, eg. "POST /trade/order"."""
+        return method.upper() + " " + path
+
+    def _parse_model(self, model: Type[BaseModel], response: RawData, endpoint: str) -> Union[BaseModel, RawData]:
+        """
+        Builds `model` from a decoded response unless the client returns raw data, timing the construction when
+        an observer is set.
+
+        Args:
+            model (Type[BaseModel]): The model to build
+            response (RawData): The decoded response body
+            endpoint (str): The endpoint name reported to the observer, eg. "POST /trade/order"
+
+        Returns:
+            Union[BaseModel, RawData]: either raw or parsed data
+        """
+        if self._use_raw_data:
+            return response
+
+        if self._observer is None:
+            return model(**response)
+
+        started = time.perf_counter()
+        result = model(**response)
+        self._observer.observe(LatencyMetric.MODEL, endpoint, time.perf_counter() - started)
+        return result
+
+    @staticmethod
+    def _resolve_timeout(timeout: Optional[Timeout], default: Tuple[float, float]) -> Tuple[float, float]:
+        """Normalises a timeout argument into a (connect, read) pair."""
+        if timeout is None:
+            return default
+        if isinstance(timeout, (int, float)):
+            return float(timeout), float(timeout)
+        connect, read = timeout
+        return float(connect), float(read)
+
+    @staticmethod
+    def _attempt_timeout(timeout: Tuple[float, float], expires: Optional[float]) -> Tuple[float, float]:
+        """
+        Caps the (connect, read) timeout of one attempt by the time left before the request deadline.
+
+        Raises:
+            RequestTimeoutError: if the deadline has already passed
+        """
+        if expires is None:
+            return timeout
+
+        remaining = expires - time.monotonic()
+        if remaining <= 0:
+            raise RequestTimeoutError("request deadline exceeded")
+
+        return min(timeout[0], remaining), min(timeout[1], remaining)
+
+    @staticmethod
+    def _as_timeout(error: BaseException) -> BaseException:
+        """Maps transport level timeouts onto RequestTimeoutError, any other error is returned unchanged."""
+        if isinstance(error, (RequestsTimeout, asyncio.TimeoutError)) and not isinstance(error, RequestTimeoutError):
+            timeout_error = RequestTimeoutError(str(error) or "request timed out")
+            timeout_error.__cause__ = error
+            return timeout_error
+        return error
+
+    def _check_response_status(
+        self, status_code: int, text: str, http_error: Exception, idempotent: bool, retry_after: Optional[float]
+    ) -> None:
+        """Raises RetryException for statuses the retry policy accepts and APIError for every other error."""
+        error = APIError(text, http_error)
+
+        if self._retry_policy.should_retry_status(status_code, idempotent):
+            raise RetryException(error, status_code, retry_after)
+
+        raise error
+
+    def _update_rate_limit(self, method: str, path: str, headers) -> Optional[float]:
+        if self._rate_limiter is None:
+            return parse_retry_after(headers.get("Retry-After"))
+        return self._rate_limiter.update_from_headers(method, path, headers)
+
+    def _prepare_request(
         self,
         method: str,
         path: str,
         data: Optional[Union[dict, str]] = None,
         base_url: Optional[Union[BaseURL, str]] = None,
         api_version: Optional[str] = None,
-    ) -> HTTPResult:
-        """Prepares and submits HTTP requests to given API endpoint and returns response.
-        Handles retrying if 429 (Rate Limit) error arises.
+    ) -> Tuple[str, dict]:
+        """Builds the full URL and the transport options, including the signed headers, for a request.
 
         Args:
             method (str): The API endpoint HTTP method
             path (str): The API endpoint path
             data (Optional[Union[dict, str]]): Either the payload in json format, query params urlencoded, or a dict
-             of values to be converted to appropriate format based on `method`. Defaults to None.
+             of values to be converted to appropriate format based on `method`. Bytes are taken as an already
+             serialised JSON body. Defaults to None.
             base_url (Optional[Union[BaseURL, str]]): The base URL of the API. Defaults to None.
             api_version (Optional[str]): The API version. Defaults to None.
 
         Returns:
-            HTTPResult: The response from the API
+            Tuple[str, dict]: The request URL and the options to hand to the HTTP session
         """
         base_url = base_url or self._base_url
         version = api_version if api_version else self._api_version
@@ -91,26 +220,40 @@ class RESTClient(ABC):
             "allow_redirects": False,
         }
 
+        started = time.perf_counter()
+
+        query_string = None
         if method.upper() in ["GET", "DELETE"]:
-            opts["params"] = data
-        else:
-            opts["json"] = data
+            # encoded once and sent in the URL: the transports encode a params dict each their own way
+            query_string = self._query_string(data)
+            if query_string:
+                url += "?" + query_string
+        elif data is not None:
+            # serialise once: the signed bytes are exactly the bytes sent
+            opts["data"] = data if isinstance(data, bytes) else self._codec.dumps(data)
 
-        opts["headers"] = self._get_default_headers(method.upper(), api_path,
-                                                     urlencode(opts["params"]) if "params" in opts else None,
-                                                     json.dumps(opts["json"]) if "json" in opts else None)
+        opts["headers"] = self._get_default_headers(method.upper(), api_path, query_string, opts.get("data"))
 
-        retry = self._retry
+        if "data" in opts:
+            opts["headers"]["Content-Type"] = "application/json"
 
-        while retry >= 0:
-            try:
-                return self._one_request(method, url, opts, retry)
-            except RetryException:
-                time.sleep(self._retry_wait)
-                retry -= 1
-                continue
+        if self._observer is not None:
+            self._observer.observe(LatencyMetric.SIGN, self._endpoint_key(method, path), time.perf_counter() - started)
 
-    def _get_default_headers(self, method: str, url: str, query_string: str=None, payload_string: str=None) -> dict:       
+        return url, opts
+
+    @staticmethod
+    def _query_string(params: Optional[Union[dict, str]]) -> str:
+        """The urlencoded query of `params`, skipping None values like requests does. Strings are taken as encoded."""
+        if not params:
+            return ""
+        if isinstance(params, str):
+            return params
+        return urlencode([(key, val) for key, val in params.items() if val is not None], doseq=True)
+
+    def _get_default_headers(
+        self, method: str, url: str, query_string: str = None, payload_string: Union[str, bytes] = None
+    ) -> dict:
         headers = self._get_auth_headers(method, url, query_string, payload_string)
 
         headers["User-Agent"] = "EASYBOV/" + __version__
@@ -118,16 +261,23 @@ class RESTClient(ABC):
 
         return headers
 
-    def _generate_signature(self, ts: str, method: str, url: str, query_string: str=None, payload_string: str=None) -> str:
+    def _generate_signature(
+        self, ts: str, method: str, url: str, query_string: str = None, payload_string: Union[str, bytes] = None
+    ) -> str:
         m = hashlib.sha512()
-        m.update((payload_string or "").encode('utf-8'))
+        if isinstance(payload_string, bytes):
+            m.update(payload_string)
+        else:
+            m.update((payload_string or "").encode('utf-8'))
         hashed_payload = m.hexdigest()
         s = '%s\n%s\n%s\n%s\n%s' % (method, url, query_string or "", hashed_payload, ts)
         sign = hmac.new(self._secret_key.encode('utf-8'), s.encode('utf-8'), hashlib.sha512).hexdigest()
         return sign
 
 
-    def _get_auth_headers(self, method: str, url: str, query_string: str=None, payload_string: str=None) -> dict:
+    def _get_auth_headers(
+        self, method: str, url: str, query_string: str = None, payload_string: Union[str, bytes] = None
+    ) -> dict:
         headers = {}
         ts = str(time.time())
         sign = self._generate_signature(ts, method, url, query_string, payload_string)
@@ -138,57 +288,6 @@ class RESTClient(ABC):
 
         return headers
 
-    def _one_request(self, method: str, url: str, opts: dict, retry: int) -> dict:
-        """Perform one request, possibly raising RetryException in the case
-        the response is 429. Otherwise, if error text contain "code" string,
-        then it decodes to json object and returns APIError.
-        Returns the body json in the 200 status.
-
-        Args:
-            method (str): The HTTP method - GET, POST, etc
-            url (str): The API endpoint URL
-            opts (dict): Contains optional parameters including headers and parameters
-            retry (int): The number of times to retry in case of RetryException
-
-        Raises:
-            RetryException: Raised if request produces 429 error and retry limit has not been reached
-            APIError: Raised if API returns an error
-
-        Returns:
-            dict: The response data
-        """
-        response = self._session.request(method, url, **opts)
-
-        try:
-            response.raise_for_status()
-        except HTTPError as http_error:
-            # retry if we hit Rate Limit
-            if response.status_code in self._retry_codes and retry > 0:
-                raise RetryException()
-
-            # raise API error for all other errors
-            error = response.text
-
-            raise APIError(error, http_error)
-
-        if response.text != "":
-            return response.json()
-
-    def get(self, path: str, data: Union[dict, str] = None, **kwargs) -> HTTPResult:
-        return self._request("GET", path, data, **kwargs)
-
-    def post(self, path: str, data: Union[dict, List[dict], str] = None) -> HTTPResult:
-        return self._request("POST", path, data)
-
-    def put(self, path: str, data: Union[dict, str] = None) -> dict:
-        return self._request("PUT", path, data)
-
-    def patch(self, path: str, data: Union[dict, str] = None) -> dict:
-        return self._request("PATCH", path, data)
-
-    def delete(self, path, data: Union[dict, str] = None) -> dict:
-        return self._request("DELETE", path, data)
-
     # TODO: Refactor to be able to handle both parsing to types and parsing to collections of types (parse_as_obj)
     def response_wrapper(
         self, model: Type[BaseModel], raw_data: RawData, **kwargs
@@ -255,3 +354,421 @@ class RESTClient(ABC):
             raise ValueError("You must supply a api_key and secret_key pair")
 
         return api_key, secret_key
+
+
+class RESTClient(BaseRESTClient):
+    """
+    Blocking REST client backed by a `requests.Session`.
+    """
+
+    def __init__(
+        self,
+        base_url: Union[BaseURL, str],
+        api_key: Optional[str] = None,
+        secret_key: Optional[str] = None,
+        api_version: str = "v1",
+        raw_data: bool = False,
+        retry_attempts: Optional[int] = None,
+        retry_wait_seconds: Optional[int] = None,
+        retry_exception_codes: Optional[List[int]] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        timeout: Optional[Timeout] = None,
+        deadline: Optional[float] = None,
+        observer: Optional[Observer] = None,
+        codec: Optional[Union[JSONCodec, str]] = None,
+        pool_size: Optional[int] = None,
+    ) -> None:
+        super().__init__(
+            base_url=base_url,
+            api_key=api_key,
+            secret_key=secret_key,
+            api_version=api_version,
+            raw_data=raw_data,
+            retry_attempts=retry_attempts,
+            retry_wait_seconds=retry_wait_seconds,
+            retry_exception_codes=retry_exception_codes,
+            rate_limiter=rate_limiter,
+            retry_policy=retry_policy,
+            timeout=timeout,
+            deadline=deadline,
+            observer=observer,
+            codec=codec,
+        )
+        self._pool_size: int = pool_size if pool_size and pool_size > 0 else DEFAULT_POOL_SIZE
+        self._session: Session = Session()
+
+        # the default adapter keeps only 10 connections per host which throttles concurrent callers
+        adapter = HTTPAdapter(pool_connections=self._pool_size, pool_maxsize=self._pool_size)
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+
+    def _request(
+        self,
+        method: str,
+        path: str,
+        data: Optional[Union[dict, str]] = None,
+        base_url: Optional[Union[BaseURL, str]] = None,
+        api_version: Optional[str] = None,
+        idempotent: Optional[bool] = None,
+        timeout: Optional[Timeout] = None,
+        deadline: Optional[float] = None,
+    ) -> HTTPResult:
+        """Prepares and submits HTTP requests to given API endpoint and returns response.
+        Failed attempts are retried as allowed by the client's RetryPolicy.
+
+        Args:
+            method (str): The API endpoint HTTP method
+            path (str): The API endpoint path
+            data (Optional[Union[dict, str]]): Either the payload in json format, query params urlencoded, or a dict
+             of values to be converted to appropriate format based on `method`. Defaults to None.
+            base_url (Optional[Union[BaseURL, str]]): The base URL of the API. Defaults to None.
+            api_version (Optional[str]): The API version. Defaults to None.
+            idempotent (Optional[bool]): Whether the request is safe to repeat. Defaults to deciding by `method`.
+            timeout (Optional[Timeout]): Per attempt timeout, overriding the client's. Defaults to None.
+            deadline (Optional[float]): Seconds the whole request may take, retries included, overriding the
+             client's. Defaults to None.
+
+        Raises:
+            RequestTimeoutError: if an attempt times out and is not retried, or the deadline is exceeded
+
+        Returns:
+            HTTPResult: The response from the API
+        """
+        url, opts = self._prepare_request(method, path, data, base_url, api_version)
+
+        if idempotent is None:
+            idempotent = self._retry_policy.is_idempotent(method)
+
+        timeout = self._resolve_timeout(timeout, self._timeout)
+        deadline = deadline if deadline is not None else self._deadline
+
+        started = time.monotonic()
+        expires = started + deadline if deadline is not None else None
+        attempt = 0
+
+        while True:
+            if self._rate_limiter is not None:
+                # never wait for a token the deadline would not let us use
+                remaining = expires - time.monotonic() if expires is not None else None
+                if not self._rate_limiter.acquire(method, path, timeout=remaining):
+                    raise RequestTimeoutError("request deadline exceeded waiting for the rate limiter")
+            try:
+                attempt_opts = dict(opts, timeout=self._attempt_timeout(timeout, expires))
+                return self._one_request(method, url, attempt_opts, idempotent, path)
+            except RetryException as retry_exception:
+                delay = self._retry_policy.next_delay(
+                    attempt, started, retry_exception.status_code, retry_exception.retry_after
+                )
+                if delay is None:
+                    raise self._as_timeout(retry_exception.error)
+                if expires is not None and time.monotonic() + delay >= expires:
+                    raise RequestTimeoutError("request deadline exceeded") from retry_exception.error
+                time.sleep(delay)
+                attempt += 1
+
+    def _one_request(
+        self, method: str, url: str, opts: dict, idempotent: bool, path: Optional[str] = None
+    ) -> dict:
+        """Perform one request, possibly raising RetryException in the case
+        the response status or transport error is retryable. Otherwise, if error text contain "code" string,
+        then it decodes to json object and returns APIError.
+        Returns the body json in the 200 status.
+
+        Args:
+            method (str): The HTTP method - GET, POST, etc
+            url (str): The API endpoint URL
+            opts (dict): Contains optional parameters including headers and parameters
+            idempotent (bool): Whether the request is safe to repeat
+            path (Optional[str]): The API endpoint path, used to feed rate limit headers back to the limiter
+
+        Raises:
+            RetryException: Raised if the retry policy allows retrying this failure
+            APIError: Raised if API returns an error
+
+        Returns:
+            dict: The response data
+        """
+        started = time.perf_counter()
+
+        try:
+            response = self._session.request(method, url, **opts)
+        except RequestException as e:
+            if self._retry_policy.should_retry_exception(e, idempotent):
+                raise RetryException(e)
+            raise self._as_timeout(e)
+
+        if self._observer is not None:
+            self._observer.observe(
+                LatencyMetric.NETWORK, self._endpoint_key(method, path or url), time.perf_counter() - started
+            )
+
+        retry_after = self._update_rate_limit(method, path, response.headers) if path else None
+
+        try:
+            response.raise_for_status()
+        except HTTPError as http_error:
+            self._check_response_status(response.status_code, response.text, http_error, idempotent, retry_after)
+
+        body = response.content
+        if body:
+            if self._observer is None:
+                return self._codec.loads(body)
+
+            started = time.perf_counter()
+            result = self._codec.loads(body)
+            self._observer.observe(
+                LatencyMetric.DECODE, self._endpoint_key(method, path or url), time.perf_counter() - started
+            )
+            return result
+
+    def get(self, path: str, data: Union[dict, str] = None, **kwargs) -> HTTPResult:
+        return self._request("GET", path, data, **kwargs)
+
+    def post(self, path: str, data: Union[dict, List[dict], str] = None, **kwargs) -> HTTPResult:
+        return self._request("POST", path, data, **kwargs)
+
+    def put(self, path: str, data: Union[dict, str] = None, **kwargs) -> dict:
+        return self._request("PUT", path, data, **kwargs)
+
+    def patch(self, path: str, data: Union[dict, str] = None, **kwargs) -> dict:
+        return self._request("PATCH", path, data, **kwargs)
+
+    def delete(self, path, data: Union[dict, str] = None, **kwargs) -> dict:
+        return self._request("DELETE", path, data, **kwargs)
+
+
+class AsyncRESTClient(BaseRESTClient):
+    """
+    asyncio REST client backed by a pooled `aiohttp.ClientSession`.
+
+    The session, and therefore its keep-alive connection pool, is created lazily on first use so the client can be
+    built outside of a running event loop. At most `max_in_flight` requests are on the wire at any time, the rest
+    wait on a semaphore without blocking the loop.
+    """
+
+    def __init__(
+        self,
+        base_url: Union[BaseURL, str],
+        api_key: Optional[str] = None,
+        secret_key: Optional[str] = None,
+        api_version: str = "v1",
+        raw_data: bool = False,
+        retry_attempts: Optional[int] = None,
+        retry_wait_seconds: Optional[int] = None,
+        retry_exception_codes: Optional[List[int]] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        timeout: Optional[Timeout] = None,
+        deadline: Optional[float] = None,
+        observer: Optional[Observer] = None,
+        codec: Optional[Union[JSONCodec, str]] = None,
+        pool_size: Optional[int] = None,
+        keepalive_timeout: Optional[float] = None,
+        max_in_flight: Optional[int] = None,
+    ) -> None:
+        super().__init__(
+            base_url=base_url,
+            api_key=api_key,
+            secret_key=secret_key,
+            api_version=api_version,
+            raw_data=raw_data,
+            retry_attempts=retry_attempts,
+            retry_wait_seconds=retry_wait_seconds,
+            retry_exception_codes=retry_exception_codes,
+            rate_limiter=rate_limiter,
+            retry_policy=retry_policy,
+            timeout=timeout,
+            deadline=deadline,
+            observer=observer,
+            codec=codec,
+        )
+        self._pool_size: int = pool_size if pool_size and pool_size > 0 else DEFAULT_POOL_SIZE
+        self._keepalive_timeout: float = (
+            keepalive_timeout if keepalive_timeout and keepalive_timeout > 0 else DEFAULT_KEEPALIVE_TIMEOUT_SECONDS
+        )
+        self._max_in_flight: int = max_in_flight if max_in_flight and max_in_flight > 0 else DEFAULT_MAX_IN_FLIGHT
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._in_flight: Optional[asyncio.Semaphore] = None
+
+    async def __aenter__(self) -> "AsyncRESTClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self._pool_size,
+                keepalive_timeout=self._keepalive_timeout,
+            )
+            self._session = aiohttp.ClientSession(connector=connector)
+            self._in_flight = asyncio.Semaphore(self._max_in_flight)
+        return self._session
+
+    async def close(self) -> None:
+        """Closes the underlying HTTP session and its connection pool."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def _request(
+        self,
+        method: str,
+        path: str,
+        data: Optional[Union[dict, str]] = None,
+        base_url: Optional[Union[BaseURL, str]] = None,
+        api_version: Optional[str] = None,
+        idempotent: Optional[bool] = None,
+        timeout: Optional[Timeout] = None,
+        deadline: Optional[float] = None,
+    ) -> HTTPResult:
+        """Prepares and submits HTTP requests to given API endpoint and returns response without blocking the
+        event loop. Failed attempts are retried as allowed by the client's RetryPolicy.
+
+        Args:
+            method (str): The API endpoint HTTP method
+            path (str): The API endpoint path
+            data (Optional[Union[dict, str]]): Either the payload in json format, query params urlencoded, or a dict
+             of values to be converted to appropriate format based on `method`. Defaults to None.
+            base_url (Optional[Union[BaseURL, str]]): The base URL of the API. Defaults to None.
+            api_version (Optional[str]): The API version. Defaults to None.
+            idempotent (Optional[bool]): Whether the request is safe to repeat. Defaults to deciding by `method`.
+            timeout (Optional[Timeout]): Per attempt timeout, overriding the client's. Defaults to None.
+            deadline (Optional[float]): Seconds the whole request may take, retries included, overriding the
+             client's. Defaults to None.
+
+        Raises:
+            RequestTimeoutError: if an attempt times out and is not retried, or the deadline is exceeded
+
+        Returns:
+            HTTPResult: The response from the API
+        """
+        url, opts = self._prepare_request(method, path, data, base_url, api_version)
+
+        if idempotent is None:
+            idempotent = self._retry_policy.is_idempotent(method)
+
+        connect_timeout, read_timeout = self._resolve_timeout(timeout, self._timeout)
+        opts["timeout"] = aiohttp.ClientTimeout(sock_connect=connect_timeout, sock_read=read_timeout)
+        deadline = deadline if deadline is not None else self._deadline
+
+        if deadline is None:
+            return await self._request_with_retries(method, path, url, opts, idempotent)
+
+        # unlike the blocking client we can cancel the whole exchange, including time spent waiting on the rate
+        # limiter and the in-flight semaphore, once the deadline passes
+        try:
+            return await asyncio.wait_for(
+                self._request_with_retries(method, path, url, opts, idempotent), deadline
+            )
+        except RequestTimeoutError:
+            raise
+        except asyncio.TimeoutError as e:
+            raise RequestTimeoutError("request deadline exceeded") from e
+
+    async def _request_with_retries(
+        self, method: str, path: str, url: str, opts: dict, idempotent: bool
+    ) -> HTTPResult:
+        started = time.monotonic()
+        attempt = 0
+
+        while True:
+            if self._rate_limiter is not None:
+                await self._rate_limiter.acquire_async(method, path)
+            try:
+                return await self._one_request(method, url, opts, idempotent, path)
+            except RetryException as retry_exception:
+                delay = self._retry_policy.next_delay(
+                    attempt, started, retry_exception.status_code, retry_exception.retry_after
+                )
+                if delay is None:
+                    raise self._as_timeout(retry_exception.error)
+                await asyncio.sleep(delay)
+                attempt += 1
+
+    async def _one_request(
+        self, method: str, url: str, opts: dict, idempotent: bool, path: Optional[str] = None
+    ) -> dict:
+        """Perform one request, possibly raising RetryException in the case
+        the response status or transport error is retryable. Otherwise, if error text contain "code" string,
+        then it decodes to json object and returns APIError.
+        Returns the body json in the 200 status.
+
+        Args:
+            method (str): The HTTP method - GET, POST, etc
+            url (str): The API endpoint URL
+            opts (dict): Contains optional parameters including headers and parameters
+            idempotent (bool): Whether the request is safe to repeat
+            path (Optional[str]): The API endpoint path, used to feed rate limit headers back to the limiter
+
+        Raises:
+            RetryException: Raised if the retry policy allows retrying this failure
+            APIError: Raised if API returns an error
+
+        Returns:
+            dict: The response data
+        """
+        session = self._get_session()
+
+        async with self._in_flight:
+            started = time.perf_counter()
+            try:
+                # encoded=True: the query was encoded and signed by _prepare_request, yarl must not requote it
+                async with session.request(method, URL(url, encoded=True), **opts) as response:
+                    body = await response.read()
+                    status = response.status
+                    headers = response.headers
+                    request_info = response.request_info
+                    history = response.history
+                    reason = response.reason
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if self._retry_policy.should_retry_exception(e, idempotent):
+                    raise RetryException(e)
+                raise self._as_timeout(e)
+
+        if self._observer is not None:
+            self._observer.observe(
+                LatencyMetric.NETWORK, self._endpoint_key(method, path or url), time.perf_counter() - started
+            )
+
+        retry_after = self._update_rate_limit(method, path, headers) if path else None
+
+        if status >= 400:
+            http_error = aiohttp.ClientResponseError(
+                request_info,
+                history,
+                status=status,
+                message=reason or "",
+                headers=headers,
+            )
+            self._check_response_status(
+                status, body.decode("utf-8", "replace"), http_error, idempotent, retry_after
+            )
+
+        if body:
+            if self._observer is None:
+                return self._codec.loads(body)
+
+            started = time.perf_counter()
+            result = self._codec.loads(body)
+            self._observer.observe(
+                LatencyMetric.DECODE, self._endpoint_key(method, path or url), time.perf_counter() - started
+            )
+            return result
+
+    async def get(self, path: str, data: Union[dict, str] = None, **kwargs) -> HTTPResult:
+        return await self._request("GET", path, data, **kwargs)
+
+    async def post(self, path: str, data: Union[dict, List[dict], str] = None, **kwargs) -> HTTPResult:
+        return await self._request("POST", path, data, **kwargs)
+
+    async def put(self, path: str, data: Union[dict, str] = None, **kwargs) -> dict:
+        return await self._request("PUT", path, data, **kwargs)
+
+    async def patch(self, path: str, data: Union[dict, str] = None, **kwargs) -> dict:
+        return await self._request("PATCH", path, data, **kwargs)
+
+    async def delete(self, path, data: Union[dict, str] = None, **kwargs) -> dict:
+        return await self._request("DELETE", path, data, **kwargs)
@@ -0,0 +1,170 @@
+import asyncio
+import random
+import time
+from typing import Collection, Mapping, Optional, Tuple, Type
+
+import aiohttp
+import requests
+
+from easybov.common.constants import (
+    DEFAULT_RETRY_ATTEMPTS,
+    DEFAULT_RETRY_EXCEPTION_CODES,
+    DEFAULT_RETRY_BACKOFF_BASE_SECONDS,
+    DEFAULT_RETRY_BACKOFF_MAX_SECONDS,
+)
+
+# errors raised before the request could reach the server, retrying them never duplicates an order
+SAFE_RETRY_EXCEPTIONS: Tuple[Type[BaseException], ...] = (
+    requests.exceptions.ConnectTimeout,
+    aiohttp.ClientConnectorError,
+)
+
+# errors where the server may or may not have processed the request
+RETRY_EXCEPTIONS: Tuple[Type[BaseException], ...] = (
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+    aiohttp.ClientConnectionError,
+    aiohttp.ClientPayloadError,
+    asyncio.TimeoutError,
+)
+
+IDEMPOTENT_METHODS: Tuple[str, ...] = ("GET", "HEAD", "OPTIONS", "PUT", "DELETE")
+
+
+class RetryPolicy:
+    """
+    Decides whether and when a failed REST request is retried.
+
+    Delays grow exponentially from `backoff_base` by `backoff_factor` up to `backoff_max`, and `jitter` randomises
+    that fraction of each delay so concurrent clients do not retry in lock step. A server Retry-After always wins
+    over a shorter computed delay.
+
+    Requests are only retried when it is safe: idempotent requests (GET, DELETE, ... or calls flagged idempotent)
+    retry on every status in `retry_statuses` and every exception in `retry_exceptions`, while non idempotent ones
+    such as order submissions only retry on `unsafe_retry_statuses` and `unsafe_retry_exceptions`, which mean the
+    server never acted on the request.
+
+    Args:
+        max_retries (int): Maximum number of retries after the first attempt.
+        backoff_base (float): Delay in seconds before the first retry.
+        backoff_factor (float): Multiplier applied to the delay after each retry.
+        backoff_max (float): Upper bound of a single delay in seconds.
+        jitter (float): Fraction, between 0 and 1, of each delay that is randomised. 1 is "full jitter".
+        deadline (Optional[float]): Total seconds a logical request may take, retries included. A retry whose
+          delay would overshoot the deadline is not attempted.
+        retry_statuses (Optional[Collection[int]]): HTTP statuses retried for idempotent requests.
+        unsafe_retry_statuses (Collection[int]): HTTP statuses retried for any request.
+        status_backoff (Optional[Mapping[int, float]]): Per status override of `backoff_base`.
+        retry_exceptions (Tuple[Type[BaseException], ...]): Transport errors retried for idempotent requests.
+        unsafe_retry_exceptions (Tuple[Type[BaseException], ...]): Transport errors retried for any request.
+        idempotent_methods (Collection[str]): HTTP methods considered idempotent by default.
+    """
+
+    def __init__(
+        self,
+        max_retries: int = DEFAULT_RETRY_ATTEMPTS,
+        backoff_base: float = DEFAULT_RETRY_BACKOFF_BASE_SECONDS,
+        backoff_factor: float = 2.0,
+        backoff_max: float = DEFAULT_RETRY_BACKOFF_MAX_SECONDS,
+        jitter: float = 1.0,
+        deadline: Optional[float] = None,
+        retry_statuses: Optional[Collection[int]] = None,
+        unsafe_retry_statuses: Collection[int] = (429,),
+        status_backoff: Optional[Mapping[int, float]] = None,
+        retry_exceptions: Tuple[Type[BaseException], ...] = RETRY_EXCEPTIONS,
+        unsafe_retry_exceptions: Tuple[Type[BaseException], ...] = SAFE_RETRY_EXCEPTIONS,
+        idempotent_methods: Collection[str] = IDEMPOTENT_METHODS,
+    ) -> None:
+        if max_retries < 0:
+            raise ValueError("max_retries must not be negative")
+
+        if not 0 <= jitter <= 1:
+            raise ValueError("jitter must be between 0 and 1")
+
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_factor = backoff_factor
+        self.backoff_max = backoff_max
+        self.jitter = jitter
+        self.deadline = deadline
+        self.retry_statuses = frozenset(
+            retry_statuses if retry_statuses is not None else DEFAULT_RETRY_EXCEPTION_CODES
+        )
+        self.unsafe_retry_statuses = frozenset(unsafe_retry_statuses)
+        self.status_backoff = dict(status_backoff or {})
+        self.retry_exceptions = tuple(retry_exceptions)
+        self.unsafe_retry_exceptions = tuple(unsafe_retry_exceptions)
+        self.idempotent_methods = frozenset(m.upper() for m in idempotent_methods)
+
+    @classmethod
+    def no_retry(cls) -> "RetryPolicy":
+        """A policy that never retries."""
+        return cls(max_retries=0)
+
+    def is_idempotent(self, method: str) -> bool:
+        return method.upper() in self.idempotent_methods
+
+    def should_retry_status(self, status_code: int, idempotent: bool) -> bool:
+        if status_code in self.unsafe_retry_statuses:
+            return True
+        return idempotent and status_code in self.retry_statuses
+
+    def should_retry_exception(self, error: BaseException, idempotent: bool) -> bool:
+        if isinstance(error, self.unsafe_retry_exceptions):
+            return True
+        return idempotent and isinstance(error, self.retry_exceptions)
+
+    def backoff(
+        self,
+        attempt: int,
+        status_code: Optional[int] = None,
+        retry_after: Optional[float] = None,
+    ) -> float:
+        """
+        The delay before retry number `attempt` (0 based).
+
+        Args:
+            attempt (int): How many retries were already made
+            status_code (Optional[int]): The status that triggered the retry, if any
+            retry_after (Optional[float]): The server's Retry-After in seconds, if any
+
+        Returns:
+            float: seconds to wait
+        """
+        base = self.status_backoff.get(status_code, self.backoff_base)
+        delay = min(self.backoff_max, base * (self.backoff_factor ** attempt))
+        delay -= delay * self.jitter * random.random()
+
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+
+        return delay
+
+    def next_delay(
+        self,
+        attempt: int,
+        started: float,
+        status_code: Optional[int] = None,
+        retry_after: Optional[float] = None,
+    ) -> Optional[float]:
+        """
+        The delay before the next retry, or None when retries are exhausted or the deadline would be missed.
+
+        Args:
+            attempt (int): How many retries were already made
+            started (float): `time.monotonic()` at the start of the logical request
+            status_code (Optional[int]): The status that triggered the retry, if any
+            retry_after (Optional[float]): The server's Retry-After in seconds, if any
+
+        Returns:
+            Optional[float]: seconds to wait, or None to give up
+        """
+        if attempt >= self.max_retries:
+            return None
+
+        delay = self.backoff(attempt, status_code, retry_after)
+
+        if self.deadline is not None and time.monotonic() - started + delay > self.deadline:
+            return None
+
+        return delay
@@ -3,3 +3,4 @@ from typing import Dict, Any, List, Union, Tuple
 RawData = Dict[str, Any]
 HTTPResult = Union[dict, List[dict], Any]
 Credentials = Tuple[str, str]
+Timeout = Union[float, Tuple[float, float]]  # total seconds, or (connect, read) seconds
@@ -5,15 +5,26 @@ import hashlib
 import hmac
 import json
 import time
-from collections import defaultdict
-from typing import Callable, Dict, Optional, Union, Tuple
+from typing import Callable, Dict, List, Optional, Set, Union, Tuple
 import websockets
 from pydantic import BaseModel
 from easybov import __version__
 
+from easybov.common.codec import JSONCodec, get_codec
+from easybov.common.decoding import DECODED_KEY, DecodePool, is_books_frame
+from easybov.common.dispatch import DispatchConfig, DispatchEngine
+from easybov.common.enums import LatencyMetric, OverflowPolicy
+from easybov.common.instrumentation import Observer
+from easybov.common.reconnect import ReconnectPolicy, ReconnectStats
+from easybov.common.recording import FrameRecorder
 from easybov.common.types import RawData
+from easybov.data.enums import BookFormat
 from easybov.data.models.order_book import Orderbook
+from easybov.data.models.compact_order_book import CompactOrderbook
+from easybov.data.models.lazy import LazyOrderbook, LazyOrderUpdate
+from easybov.data.models.local_order_book import LocalOrderBook, OrderbookView
 from easybov.data.models.order_update import OrderUpdate
+from easybov.data.models.trade import Trade
 
 log = logging.getLogger(__name__)
 
@@ -26,6 +37,15 @@ class BaseStream:
         secret_key: str,
         raw_data: bool = False,
         websocket_params: Optional[Dict] = None,
+        observer: Optional[Observer] = None,
+        codec: Optional[Union[JSONCodec, str]] = None,
+        local_books: bool = False,
+        book_format: Union[BookFormat, str] = BookFormat.MODEL,
+        lazy_models: bool = False,
+        dispatch: Optional[DispatchConfig] = None,
+        decode_workers: int = 0,
+        reconnect_policy: Optional[ReconnectPolicy] = None,
+        recorder: Optional[FrameRecorder] = None,
     ) -> None:        
         self._endpoint = endpoint
         self._api_key = api_key
@@ -36,6 +56,7 @@ class BaseStream:
         self._raw_data = raw_data
         self._stop_stream_queue = queue.Queue()
         self._handlers = {
+            "trades": {},
             "books": {},
             "orders": {},            
         }
@@ -52,6 +73,51 @@ class BaseStream:
         if websocket_params:
             self._websocket_params = websocket_params
 
+        self._observer = observer
+        self._codec = get_codec(codec)
+
+        # symbol -> book maintained in place when local books are enabled
+        self._local_books: Optional[Dict[str, LocalOrderBook]] = {} if local_books else None
+        self._pending_snapshots: Set[str] = set()
+        self._book_format = BookFormat(book_format)
+        self._lazy_models = lazy_models
+
+        # handlers run inline on the reader unless a dispatch config moves them to queue workers
+        self._dispatcher: Optional[DispatchEngine] = None
+        if dispatch is not None:
+            if local_books and dispatch.policy("books") != OverflowPolicy.BLOCK:
+                raise ValueError("local books need every books message, use OverflowPolicy.BLOCK for books")
+            self._dispatcher = DispatchEngine(self._dispatch, dispatch, observer)
+
+        # symbols subscribed with conflate=True get a one slot queue each, always holding the latest book
+        self._conflated_symbols: Set[str] = set()
+        self._conflator = DispatchEngine(
+            self._dispatch,
+            DispatchConfig(queue_size=1, policies={"books": OverflowPolicy.CONFLATE}, per_symbol=True),
+            observer,
+        )
+
+        # books frames are decoded, and their compact books built, in worker processes when decode_workers is set
+        self._decoder: Optional[DecodePool] = None
+        if decode_workers:
+            if self._book_format != BookFormat.COMPACT or raw_data or local_books:
+                # unpickling dicts or pydantic models costs the event loop more than decoding the frame itself
+                raise ValueError("decode_workers needs book_format=BookFormat.COMPACT, without raw_data or local books")
+            self._decoder = DecodePool(self._route, decode_workers, codec=self._codec.name, compact=True)
+
+        self._reconnect_policy = reconnect_policy or ReconnectPolicy()
+        self._reconnect_stats = ReconnectStats()
+        self._login_payload: Optional[Tuple[float, str]] = None
+        self._disconnected_at: Optional[float] = None
+        self._reconnect_attempt = 0
+        # symbols whose books are cold: the connection dropped and no snapshot arrived since
+        self._stale_books: Set[str] = set()
+        self._book_seq_ids: Dict[str, int] = {}
+        self._reconnect_handlers: List[Callable] = []
+
+        # raw frames are appended to the recorder as they are received, for a ReplayStream
+        self._recorder = recorder
+
     async def _connect(self) -> None:
         extra_headers = {
             "Content-Type": "application/json",
@@ -78,10 +144,18 @@ class BaseStream:
         login_dict = {"op": "login", "args": [{"api_key": self._api_key, "timestamp": str(ts), "sign": sign}]}
         return json.dumps(login_dict)
 
+    def _prepare_login(self) -> str:
+        """The login payload, signed ahead of time while reconnecting and reused while it is recent enough."""
+        now = time.monotonic()
+        if self._login_payload is None or now - self._login_payload[0] > self._reconnect_policy.login_payload_max_age:
+            self._login_payload = (now, self._ws_login_request())
+        return self._login_payload[1]
+
     async def _auth(self) -> None:        
-        await self._ws.send(
-            self._ws_login_request()           
-        )
+        payload = self._prepare_login()
+        # a payload is good for one login only
+        self._login_payload = None
+        await self._ws.send(payload)
 
         r = await self._ws.recv()
 
@@ -115,44 +189,227 @@ class BaseStream:
             else:
                 try:
                     msg = await asyncio.wait_for(self._ws.recv(), 5)                                        
-                    await self._dispatch(json.loads(msg))
+                    if self._recorder is not None:
+                        self._recorder.write(msg)
+                    await self._on_frame(msg)
                 except asyncio.TimeoutError:
                     # ws.recv is hanging when no data is received. by using
                     # wait_for we break when no data is received, allowing us
                     # to break the loop when needed
                     pass
 
-    def _cast(self, msg_type: str, msg: Dict) -> Union[BaseModel, RawData]:
+    async def _on_frame(self, frame: Union[str, bytes]) -> None:
+        if self._decoder is not None and is_books_frame(frame):
+            await self._decoder.put(frame)
+        else:
+            await self._route(self._decode(frame))
+
+    async def _route(self, msg: Dict) -> None:
+        # subscribe acks and errors are only logged, no need to queue them
+        if "event" not in msg:
+            channel, symbol = msg["arg"]["channel"], msg["arg"]["symbol"]
+            if channel == "books":
+                self._track_book_sequence(symbol, msg)
+            if channel == "books" and self._is_conflated(symbol):
+                await self._conflator.put(channel, symbol, msg)
+                return
+            if self._dispatcher is not None:
+                await self._dispatcher.put(channel, symbol, msg)
+                return
+        await self._dispatch(msg)
+
+    def _track_book_sequence(self, symbol: str, msg: Dict) -> None:
+        is_snapshot = msg.get("action") != "update"
+        if is_snapshot and self._stale_books:
+            self._stale_books.discard(symbol)
+
+        if DECODED_KEY in msg:
+            # a decode worker already built the book, only the ids are left beside it
+            seq_id, prev_seq_id = msg.get("seqId"), msg.get("prevSeqId")
+        else:
+            data = msg.get("data")
+            if not data:
+                return
+            seq_id, prev_seq_id = data[0].get("seqId"), data[0].get("prevSeqId")
+        if seq_id is None:
+            return
+        if not is_snapshot:
+            last = self._book_seq_ids.get(symbol)
+            if prev_seq_id is not None and last is not None and int(prev_seq_id) != last:
+                self._reconnect_stats.sequence_gaps += 1
+        self._book_seq_ids[symbol] = int(seq_id)
+
+    def is_book_stale(self, symbol: str) -> bool:
+        """
+        Whether the book of `symbol` may be out of date: the connection dropped and no fresh snapshot arrived since.
+        Local books are also invalidated, see `OrderbookView.is_valid`.
+        """
+        return symbol in self._stale_books
+
+    @property
+    def stale_books(self) -> Set[str]:
+        return set(self._stale_books)
+
+    @property
+    def reconnect_stats(self) -> ReconnectStats:
+        """Connection drops, recovery times and sequence gaps since the stream started."""
+        return self._reconnect_stats
+
+    def _is_conflated(self, symbol: str) -> bool:
+        if not self._conflated_symbols:
+            return False
+        if symbol in self._handlers["books"]:
+            return symbol in self._conflated_symbols
+        return "*" in self._conflated_symbols
+
+    @property
+    def conflation_stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        Per symbol counters of the books subscriptions made with `conflate=True`: `received` frames, `delivered`
+        books and `conflated` frames that were replaced by a newer one before their handler saw them.
+        """
+        return {
+            key.split(":", 1)[1]: {name: stats[name] for name in ("received", "delivered", "conflated")}
+            for key, stats in self._conflator.stats().items()
+        }
+
+    @property
+    def dispatch_stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        Queue counters (queued, received, delivered, dropped, conflated, high_water) per dispatch queue, empty when
+        handlers run inline.
+        """
+        if self._dispatcher is None:
+            return {}
+        return self._dispatcher.stats()
+
+    @property
+    def decode_stats(self) -> Dict[str, int]:
+        """Counters of the decode worker pool, empty when frames are decoded on the event loop."""
+        if self._decoder is None:
+            return {}
+        return self._decoder.stats()
+
+    def _decode(self, frame: Union[str, bytes]) -> Dict:
+        if self._observer is None:
+            return self._codec.loads(frame)
+
+        received = time.time()
+        started = time.perf_counter()
+        msg = self._codec.loads(frame)
+        decoded = time.perf_counter()
+
+        arg = msg.get("arg") or {}
+        channel = arg.get("channel") or msg.get("event") or "unknown"
+        self._observer.observe(LatencyMetric.DECODE, channel, decoded - started)
+
+        ts = self._message_timestamp(msg)
+        if ts is not None:
+            self._observer.observe(LatencyMetric.MESSAGE_AGE, channel, received - ts)
+
+        return msg
+
+    @staticmethod
+    def _message_timestamp(msg: Dict) -> Optional[float]:
+        """The exchange timestamp of a data message in epoch seconds, if it carries one."""
+        try:
+            return float(msg["data"][0]["ts"])
+        except (KeyError, IndexError, TypeError, ValueError):
+            return None
+
+    async def _handle(self, handler: Callable, msg_type: str, msg: Dict) -> None:
+        if self._observer is None:
+            await handler(self._cast(msg_type, msg))
+            return
+
+        started = time.perf_counter()
+        data = self._cast(msg_type, msg)
+        cast = time.perf_counter()
+        await handler(data)
+        self._observer.observe(LatencyMetric.MODEL, msg_type, cast - started)
+        self._observer.observe(LatencyMetric.HANDLER, msg_type, time.perf_counter() - cast)
+
+    def get_book(self, symbol: str) -> Optional[OrderbookView]:
+        """
+        The read-only view of the local order book of `symbol`, if local books are enabled and it has data.
+        """
+        if self._local_books is None or symbol not in self._local_books:
+            return None
+        return self._local_books[symbol].view
+
+    def _apply_book(self, msg: Dict) -> OrderbookView:
+        symbol = msg["arg"]["symbol"]
+        book = self._local_books.get(symbol)
+        if book is None:
+            book = self._local_books[symbol] = LocalOrderBook(symbol)
+
+        if book.apply(msg):
+            self._pending_snapshots.discard(symbol)
+        elif symbol not in self._pending_snapshots and self._ws is not None:
+            self._pending_snapshots.add(symbol)
+            asyncio.ensure_future(self._request_snapshot(symbol))
+
+        return book.view
+
+    async def _request_snapshot(self, symbol: str) -> None:
+        # subscribing again makes the server send a fresh snapshot for the symbol
+        log.info(f"requesting a fresh books snapshot for {symbol}")
+        await self._ws.send(json.dumps({"op": "subscribe", "args": [{"channel": "books", "symbol": symbol}]}))
+
+    def _cast(
+        self, msg_type: str, msg: Dict
+    ) -> Union[BaseModel, RawData, OrderbookView, CompactOrderbook, LazyOrderbook, LazyOrderUpdate, Trade]:
+        if DECODED_KEY in msg:
+            return msg[DECODED_KEY]
+
+        if msg_type == "books" and self._local_books is not None:
+            return self._apply_book(msg)
+
         result = msg
         if not self._raw_data:
             if msg_type == "books":
-                result = Orderbook(msg["arg"]["symbol"], msg)
+                if self._book_format == BookFormat.COMPACT:
+                    result = CompactOrderbook.from_raw(msg["arg"]["symbol"], msg)
+                elif self._lazy_models:
+                    result = LazyOrderbook(msg["arg"]["symbol"], msg)
+                else:
+                    result = Orderbook(msg["arg"]["symbol"], msg)
             elif msg_type == "orders":
-                result = OrderUpdate(msg["arg"]["symbol"], msg)
+                if self._lazy_models:
+                    result = LazyOrderUpdate(msg["arg"]["symbol"], msg)
+                else:
+                    result = OrderUpdate(msg["arg"]["symbol"], msg)
+            elif msg_type == "trades":
+                result = Trade.from_raw(msg["arg"]["symbol"], msg)
 
         return result
 
     async def _dispatch(self, msg: Dict) -> None:
         msg_type = msg["event"] if "event" in msg.keys() else msg["arg"]["channel"]
         symbol = msg["arg"]["symbol"]
-        #if msg_type == "trades":
-            #handler = self._handlers["trades"].get(
-            #    symbol, self._handlers["trades"].get("*", None)
-            #)
-            #if handler:
-             #   await handler(self._cast(msg_type, msg))
-        if msg_type == "books":
+        if msg_type == "trades":
+            handler = self._handlers["trades"].get(
+                symbol, self._handlers["trades"].get("*", None)
+            )
+            if handler:
+                if self._raw_data or len(msg["data"]) == 1:
+                    await self._handle(handler, msg_type, msg)
+                else:
+                    # a message may carry several trades, the handler is called with each
+                    for data in msg["data"]:
+                        await self._handle(handler, msg_type, dict(msg, data=[data]))
+        elif msg_type == "books":
             handler = self._handlers["books"].get(
                 symbol, self._handlers["books"].get("*", None)
             )
             if handler:
-                await handler(self._cast(msg_type, msg))
+                await self._handle(handler, msg_type, msg)
         elif msg_type == "orders":
             handler = self._handlers["orders"].get(
                 symbol, self._handlers["orders"].get("*", None)
             )
             if handler:
-                await handler(self._cast(msg_type, msg))
+                await self._handle(handler, msg_type, msg)
         elif msg_type == "subscribe":
             log.info("subscribed to {}:{}".format(msg["arg"]["channel"], msg["arg"]["symbol"]))
         elif msg_type == "error":
@@ -168,25 +425,25 @@ class BaseStream:
             asyncio.run_coroutine_threadsafe(self._subscribe_all(), self._loop).result()
 
     async def _subscribe_all(self) -> None:
-        msg = defaultdict(list)
         channel_list = []
         for k, v in self._handlers.items():
             if k not in ("cancelErrors", "corrections") and v:
                 for s in v.keys():
                     channel_list.append({"channel": k, "symbol": s})
 
-        msg["op"] = "subscribe"
-        msg["args"] = channel_list
-        await self._ws.send(json.dumps(msg))
+        # sent back to back without waiting for the acks, in batches that keep each frame small
+        batch_size = self._reconnect_policy.subscribe_batch_size
+        for i in range(0, len(channel_list), batch_size):
+            await self._ws.send(json.dumps({"op": "subscribe", "args": channel_list[i:i + batch_size]}))
 
     async def _unsubscribe(self, trades=(), books=(), orders=()) -> None:
-        if trades or books or orders:
-            await self._ws.send(
-                    json.dumps({
-                        "action": "unsubscribe",
-                        "trades": trades,
-                    })
-            )
+        channel_list = [
+            {"channel": channel, "symbol": symbol}
+            for channel, symbols in (("trades", trades), ("books", books), ("orders", orders))
+            for symbol in symbols
+        ]
+        if channel_list:
+            await self._ws.send(json.dumps({"op": "unsubscribe", "args": channel_list}))
 
     async def _run_forever(self) -> None:
         self._loop = asyncio.get_running_loop()
@@ -209,29 +466,140 @@ class BaseStream:
             try:
                 if not self._should_run:
                     # when signaling to stop, this is how we break run_forever
+                    if self._dispatcher is not None:
+                        await self._dispatcher.stop()
+                    await self._conflator.stop()
+                    if self._decoder is not None:
+                        await self._decoder.stop()
+                    if self._recorder is not None:
+                        self._recorder.flush()
                     log.info("{} stream stopped".format(self._name))
                     return
                 if not self._running:
+                    if self._disconnected_at is not None and not await self._wait_to_reconnect():
+                        continue
                     log.info("starting {} websocket connection".format(self._name))
                     await self._start_ws()
                     await self._subscribe_all()
                     self._running = True
+                    self._on_connected()
                 await self._consume()
-            except websockets.WebSocketException as wse:
-                await self.close()
-                self._running = False
-                log.warning("data websocket error, restarting connection: " + str(wse))
+            except (websockets.WebSocketException, OSError) as e:
+                log.warning("data websocket error, restarting connection: " + str(e))
+                await self._on_disconnected(e)
             except Exception as e:
-                log.exception(
-                    "error during websocket " "communication: {}".format(str(e))
-                )
+                if not self._running:
+                    # connecting, logging in or subscribing failed: retried like a lost connection
+                    log.exception(
+                        "error during websocket " "communication: {}".format(str(e))
+                    )
+                    await self._on_disconnected(e)
+                else:
+                    # a handler or a message failed, the connection is fine: skip the message
+                    log.exception("error handling a message: {}".format(str(e)))
             finally:
                 await asyncio.sleep(0)
 
+    async def _on_disconnected(self, error: Exception) -> None:
+        try:
+            await self.close()
+        except Exception:
+            pass
+        self._ws = None
+        self._running = False
+
+        stats = self._reconnect_stats
+        stats.disconnects += 1
+        stats.last_error = f"{type(error).__name__}: {error}"
+        if self._disconnected_at is None:
+            self._disconnected_at = time.monotonic()
+            self._invalidate_books()
+        else:
+            self._reconnect_attempt += 1
+
+        if self._reconnect_policy.gives_up(self._reconnect_attempt):
+            log.error(f"{self._name} stream giving up after {self._reconnect_attempt} failed reconnect attempts")
+            self._should_run = False
+
+    def _invalidate_books(self) -> None:
+        """Marks every book cold until the server sends a new snapshot for it."""
+        self._stale_books.update(symbol for symbol in self._handlers["books"] if symbol != "*")
+        self._stale_books.update(self._book_seq_ids)
+        self._book_seq_ids.clear()
+        self._pending_snapshots.clear()
+        if self._local_books is not None:
+            self._stale_books.update(self._local_books)
+            for book in self._local_books.values():
+                book.invalidate()
+
+    async def _wait_to_reconnect(self) -> bool:
+        """Sleeps for the backoff delay, signing the login payload meanwhile. False if the stream was stopped."""
+        delay = self._reconnect_policy.backoff(self._reconnect_attempt)
+        if delay > self._reconnect_policy.login_payload_max_age:
+            await self._sleep_while_running(delay - self._reconnect_policy.login_payload_max_age / 2)
+            delay = self._reconnect_policy.login_payload_max_age / 2
+        self._prepare_login()
+        await self._sleep_while_running(delay)
+        return self._should_run
+
+    async def _sleep_while_running(self, seconds: float) -> None:
+        deadline = time.monotonic() + seconds
+        while self._should_run and self._stop_stream_queue.empty():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            await asyncio.sleep(min(remaining, 0.1))
+
+    def _on_connected(self) -> None:
+        self._reconnect_stats.connects += 1
+        # failures before the first connection are not a reconnect
+        if self._disconnected_at is not None and self._reconnect_stats.connects > 1:
+            seconds = time.monotonic() - self._disconnected_at
+            self._reconnect_stats.record_reconnect(seconds)
+            if self._observer is not None:
+                self._observer.observe(LatencyMetric.RECONNECT, self._name, seconds)
+            log.info(f"{self._name} stream reconnected in {seconds:.3f}s")
+            for handler in self._reconnect_handlers:
+                asyncio.ensure_future(handler())
+        self._disconnected_at = None
+        self._reconnect_attempt = 0
+
+    def add_reconnect_handler(self, handler: Callable) -> None:
+        """
+        Registers a coroutine function called without arguments after every reconnect, once the subscriptions are
+        restored, eg. to fetch what was missed while disconnected.
+        """
+        self._ensure_coroutine(handler)
+        self._reconnect_handlers.append(handler)
+
     def subscribe_trades(self, handler: Callable, *symbols) -> None:
+        """
+        Subscribes `handler` to the trades of `symbols`.
+
+        Args:
+            handler (Callable): The coroutine function called with each Trade, once per trade when a message
+              carries several, or with each decoded message when `raw_data` is set
+            *symbols: The symbols to subscribe to, "*" for every symbol without a handler of its own
+        """
         self._subscribe(handler, symbols, self._handlers["trades"])
 
-    def subscribe_books(self, handler: Callable, *symbols) -> None:
+    def subscribe_books(self, handler: Callable, *symbols, conflate: bool = False) -> None:
+        """
+        Subscribes `handler` to the books of `symbols`.
+
+        Args:
+            handler (Callable): The coroutine function called with each book
+            *symbols: The symbols to subscribe to, "*" for every symbol without a handler of its own
+            conflate (bool): Whether to coalesce the books of each symbol that arrive while the handler is busy, so
+              it is always called with the newest book and never falls behind. Skipped frames are counted in
+              `conflation_stats`. Not available with local books, which need every update.
+        """
+        if conflate and self._local_books is not None:
+            raise ValueError("conflate is not available with local books, which need every update")
+        if conflate:
+            self._conflated_symbols.update(symbols)
+        else:
+            self._conflated_symbols.difference_update(symbols)
         self._subscribe(handler, symbols, self._handlers["books"])
 
     def subscribe_orders(self, handler: Callable) -> None:
@@ -252,6 +620,7 @@ class BaseStream:
             ).result()
         for symbol in symbols:
             del self._handlers["books"][symbol]
+            self._conflated_symbols.discard(symbol)
 
     def unsubscribe_orders(self) -> None:
         if self._running:
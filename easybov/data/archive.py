@@ -0,0 +1,309 @@
+import asyncio
+import logging
+import os
+import queue
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+from easybov.common import RawData
+from easybov.common.constants import (
+    DEFAULT_ARCHIVE_BATCH_ROWS,
+    DEFAULT_ARCHIVE_FLUSH_INTERVAL_SECONDS,
+    DEFAULT_ARCHIVE_MAX_PENDING_BATCHES,
+    DEFAULT_ARCHIVE_ROTATE_SECONDS,
+)
+from easybov.data.columnar import BookRecorder, OrderRecorder
+from easybov.data.timestamps import NAT, TimePoint, to_ns
+
+try:
+    import pyarrow
+    import pyarrow.dataset
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+log = logging.getLogger(__name__)
+
+_FORMATS = {"parquet": ".parquet", "arrow": ".arrow"}
+_STATUS_NAMES = [status.name for status in OrderRecorder.statuses]
+# put on the queue by close() after the last batch
+_STOP = object()
+
+
+def _require_pyarrow() -> None:
+    if pyarrow is None:
+        raise ImportError("archiving needs pyarrow, install it with `pip install pyarrow`")
+
+
+class StreamArchiver:
+    """
+    Archives the `books` or `orders` of a stream to Parquet, or Arrow IPC, files without stalling the event loop.
+
+    `handler` only appends the message to a columnar batch (a BookRecorder or an OrderRecorder). Full batches, or
+    the current one every `flush_interval` seconds, are handed to a background thread that converts them to Arrow
+    and writes one row group per batch. Files are rotated every `rotate_seconds` of received time and named after
+    the start of their period, eg. `books-20240102T100000.parquet`.
+
+    Memory is bounded: at most `max_pending_batches` batches wait for the writer. When the disk cannot keep up the
+    newest batch is dropped rather than blocking the loop, and counted in `dropped_rows`.
+
+        archiver = StreamArchiver("archive/")
+        stream.subscribe_books(archiver.handler, "PETR4")
+        stream.run()
+        archiver.close()
+
+    Args:
+        directory (str): Where the files are written, created if missing
+        channel (str): "books" or "orders"
+        depth (int): The levels kept per side of the books
+        file_format (str): "parquet" or "arrow"
+        compression (Optional[str]): The Parquet compression codec
+        batch_rows (int): The rows per batch, and so per row group
+        flush_interval (float): Seconds after which a partial batch is written anyway
+        rotate_seconds (float): The time span of each file
+        max_pending_batches (int): How many batches may wait for the writer thread
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        channel: str = "books",
+        depth: int = 5,
+        file_format: str = "parquet",
+        compression: Optional[str] = "zstd",
+        batch_rows: int = DEFAULT_ARCHIVE_BATCH_ROWS,
+        flush_interval: float = DEFAULT_ARCHIVE_FLUSH_INTERVAL_SECONDS,
+        rotate_seconds: float = DEFAULT_ARCHIVE_ROTATE_SECONDS,
+        max_pending_batches: int = DEFAULT_ARCHIVE_MAX_PENDING_BATCHES,
+    ) -> None:
+        _require_pyarrow()
+        if channel not in ("books", "orders"):
+            raise ValueError("channel must be books or orders")
+        if file_format not in _FORMATS:
+            raise ValueError(f"file_format must be one of {', '.join(_FORMATS)}")
+
+        self.directory = directory
+        self.channel = channel
+        self.depth = depth
+        self.file_format = file_format
+        self.compression = compression
+        self.batch_rows = batch_rows
+        self.flush_interval = flush_interval
+        self.rotate_seconds = rotate_seconds
+        os.makedirs(directory, exist_ok=True)
+
+        self._batch = self._new_batch()
+        self._batch_started = time.monotonic()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._queue: "queue.Queue" = queue.Queue(max_pending_batches)
+        self._writer = None
+        self._period: Optional[int] = None
+        self._closed = False
+
+        self.rows = 0
+        self.written_rows = 0
+        self.dropped_rows = 0
+        self.files: List[str] = []
+        self.last_error: Optional[str] = None
+
+        self._thread = threading.Thread(target=self._write_batches, name="easybov-archiver", daemon=True)
+        self._thread.start()
+
+    def _new_batch(self) -> Union[BookRecorder, OrderRecorder]:
+        if self.channel == "books":
+            return BookRecorder(self.depth, capacity=self.batch_rows)
+        return OrderRecorder(capacity=self.batch_rows)
+
+    async def handler(self, msg: Any) -> None:
+        """The stream handler, for `subscribe_books` or `subscribe_orders` depending on `channel`."""
+        self.append(msg)
+        if self._timer is None and len(self._batch):
+            self._timer = asyncio.get_running_loop().call_later(self.flush_interval, self._flush_due)
+
+    def append(self, msg: Union[Any, RawData]) -> None:
+        """Adds a book or order update to the current batch, handing the batch to the writer once full."""
+        if self._closed:
+            raise RuntimeError("the archiver is closed")
+        self._batch.append(msg)
+        self.rows += 1
+        if len(self._batch) >= self.batch_rows:
+            self.flush()
+
+    def _flush_due(self) -> None:
+        self._timer = None
+        if not self._closed:
+            self.flush()
+
+    def flush(self) -> None:
+        """Hands the current batch to the writer thread, without waiting for it to be written."""
+        batch = self._batch
+        if not len(batch):
+            return
+        self._batch = self._new_batch()
+        try:
+            self._queue.put_nowait(batch)
+        except queue.Full:
+            if not self.dropped_rows:
+                log.warning(f"archive writer is behind, dropping {self.channel} rows, see dropped_rows")
+            self.dropped_rows += len(batch)
+
+    def close(self) -> None:
+        """Writes what is left, waits for the writer thread and closes the current file."""
+        if self._closed:
+            return
+        self.flush()
+        self._closed = True
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._queue.put(_STOP)
+        self._thread.join()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "rows": self.rows,
+            "written_rows": self.written_rows,
+            "dropped_rows": self.dropped_rows,
+            "pending_batches": self._queue.qsize(),
+            "files": len(self.files),
+        }
+
+    def _write_batches(self) -> None:
+        while True:
+            batch = self._queue.get()
+            if batch is _STOP:
+                break
+            try:
+                self._write(batch)
+            except Exception as e:
+                self.last_error = f"{type(e).__name__}: {e}"
+                log.exception(f"could not archive {len(batch)} {self.channel} rows")
+        self._close_writer()
+
+    def _write(self, batch: Union[BookRecorder, OrderRecorder]) -> None:
+        table = _to_table(batch)
+        received = batch.arrays()["received"]
+        period_ns = int(self.rotate_seconds * 1e9)
+        periods = received // period_ns
+
+        # a batch spanning a rotation boundary is split between the two files
+        start = 0
+        while start < len(received):
+            period = int(periods[start])
+            end = int(np.searchsorted(periods, period, side="right"))
+            if period != self._period:
+                self._rotate(period, table.schema)
+            self._write_table(table.slice(start, end - start))
+            self.written_rows += end - start
+            start = end
+
+    def _rotate(self, period: int, schema: "pyarrow.Schema") -> None:
+        self._close_writer()
+        started = time.strftime("%Y%m%dT%H%M%S", time.gmtime(period * self.rotate_seconds))
+        path = os.path.join(self.directory, f"{self.channel}-{started}{_FORMATS[self.file_format]}")
+        if os.path.exists(path):
+            # the same period again, eg. after a restart: never overwrite an archive
+            path = path.replace(started, f"{started}-{time.time_ns()}")
+
+        if self.file_format == "parquet":
+            self._writer = pyarrow.parquet.ParquetWriter(path, schema, compression=self.compression)
+        else:
+            self._writer = pyarrow.ipc.new_file(path, schema)
+        self._period = period
+        self.files.append(path)
+
+    def _write_table(self, table: "pyarrow.Table") -> None:
+        if self.file_format == "parquet":
+            self._writer.write_table(table, row_group_size=self.batch_rows)
+        else:
+            self._writer.write_table(table)
+
+    def _close_writer(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+            self._period = None
+
+
+def _timestamps(values: np.ndarray) -> "pyarrow.Array":
+    return pyarrow.array(values, type=pyarrow.timestamp("ns", tz="UTC"), mask=values == NAT)
+
+
+def _to_table(batch: Union[BookRecorder, OrderRecorder]) -> "pyarrow.Table":
+    columns = {}
+    for name, values in batch.arrays().items():
+        if name in batch.timestamp_columns:
+            columns[name] = _timestamps(values)
+        elif name == "symbol":
+            columns[name] = pyarrow.array(batch.symbols, pyarrow.string()).take(values)
+        elif name == "cl_ord_id":
+            columns[name] = pyarrow.array(batch.cl_ord_ids, pyarrow.string()).take(values)
+        elif name == "ord_status":
+            columns[name] = pyarrow.array(_STATUS_NAMES, pyarrow.string()).take(values)
+        else:
+            columns[name] = pyarrow.array(values)
+    return pyarrow.table(columns)
+
+
+def read_archive(
+    directory: str,
+    symbols: Optional[Sequence[str]] = None,
+    start: Optional[TimePoint] = None,
+    end: Optional[TimePoint] = None,
+    columns: Optional[List[str]] = None,
+    time_column: str = "received",
+    channel: Optional[str] = None,
+    file_format: Optional[str] = None,
+) -> "pyarrow.Table":
+    """
+    Reads the files of a StreamArchiver as one table, filtered by symbol and time. The filters are pushed down to
+    the files: Parquet row groups whose statistics cannot match are skipped without being read.
+
+    Args:
+        directory (str): The archive directory
+        symbols (Optional[Sequence[str]]): The symbols to keep, all by default
+        start (Optional[TimePoint]): The first time kept, included
+        end (Optional[TimePoint]): The time the rows must precede
+        columns (Optional[List[str]]): The columns to read, all by default
+        time_column (str): "received", or "ts" for the exchange timestamp of books
+        channel (Optional[str]): "books" or "orders", needed when the directory holds both
+        file_format (Optional[str]): "parquet" or "arrow", the files to read, needed when the directory holds both
+
+    Returns:
+        pyarrow.Table: the matching rows, call `to_pandas()` for a DataFrame
+    """
+    _require_pyarrow()
+    ds = pyarrow.dataset
+
+    if file_format is not None and file_format not in _FORMATS:
+        raise ValueError(f"file_format must be one of {', '.join(_FORMATS)}")
+    extensions = tuple(_FORMATS.values()) if file_format is None else (_FORMATS[file_format],)
+
+    paths = sorted(
+        os.path.join(directory, name)
+        for name in os.listdir(directory)
+        if name.endswith(extensions) and (channel is None or name.startswith(f"{channel}-"))
+    )
+    if not paths:
+        raise FileNotFoundError(f"no archive files in {directory}")
+    formats = {name for name, extension in _FORMATS.items() if any(path.endswith(extension) for path in paths)}
+    if len(formats) > 1:
+        raise ValueError(f"{directory} holds both parquet and arrow files, choose one with file_format")
+    dataset = ds.dataset(paths, format="parquet" if formats == {"parquet"} else "ipc")
+
+    condition = None
+    if symbols is not None:
+        condition = ds.field("symbol").isin(list(symbols))
+    timestamp = pyarrow.timestamp("ns", tz="UTC")
+    if start is not None:
+        bound = ds.field(time_column) >= pyarrow.scalar(to_ns(start), timestamp)
+        condition = bound if condition is None else condition & bound
+    if end is not None:
+        bound = ds.field(time_column) < pyarrow.scalar(to_ns(end), timestamp)
+        condition = bound if condition is None else condition & bound
+
+    return dataset.to_table(columns=columns, filter=condition)
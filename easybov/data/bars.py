@@ -0,0 +1,291 @@
+import time
+from array import array
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from easybov.common import RawData
+from easybov.data.models.compact_order_book import CompactOrderbook
+from easybov.data.models.lazy import LazyOrderbook
+from easybov.data.models.local_order_book import OrderbookView
+from easybov.data.models.order_book import Orderbook
+from easybov.data.timestamps import NAT
+
+# the fields of the per symbol state rows, one row per symbol and interval
+_OPEN, _HIGH, _LOW, _CLOSE = 0, 1, 2, 3
+_SPREAD_SUM, _SPREAD_MIN, _SPREAD_MAX, _SPREAD = 4, 5, 6, 7
+_BID_SIZE_SUM, _ASK_SIZE_SUM, _BID_SIZE, _ASK_SIZE = 8, 9, 10, 11
+_UPDATES = 12
+_FIELDS = 13
+
+
+class Bar:
+    """
+    One completed, or in progress, bar of a symbol: the open, high, low and close of the mid price, the mean, min,
+    max and close of the spread and the mean and close of the best bid and ask sizes, over the books received in
+    [`start`, `end`). Times are epoch nanoseconds of the exchange timestamps of the books.
+    """
+
+    __slots__ = (
+        "symbol",
+        "interval",
+        "start",
+        "end",
+        "open",
+        "high",
+        "low",
+        "close",
+        "spread",
+        "spread_mean",
+        "spread_min",
+        "spread_max",
+        "bid_size",
+        "ask_size",
+        "bid_size_mean",
+        "ask_size_mean",
+        "updates",
+    )
+
+    def __init__(self, symbol: str, interval: float, start: int, row: Sequence[float]) -> None:
+        updates = row[_UPDATES]
+        self.symbol = symbol
+        self.interval = interval
+        self.start = start
+        self.end = start + int(interval * 1e9)
+        self.open = row[_OPEN]
+        self.high = row[_HIGH]
+        self.low = row[_LOW]
+        self.close = row[_CLOSE]
+        self.spread = row[_SPREAD]
+        self.spread_mean = row[_SPREAD_SUM] / updates
+        self.spread_min = row[_SPREAD_MIN]
+        self.spread_max = row[_SPREAD_MAX]
+        self.bid_size = row[_BID_SIZE]
+        self.ask_size = row[_ASK_SIZE]
+        self.bid_size_mean = row[_BID_SIZE_SUM] / updates
+        self.ask_size_mean = row[_ASK_SIZE_SUM] / updates
+        self.updates = int(updates)
+
+    def __repr__(self) -> str:
+        return "Bar({})".format(", ".join(f"{k}={getattr(self, k)!r}" for k in self.__slots__))
+
+
+class BarAggregator:
+    """
+    Builds mid price bars of several intervals at once, incrementally from the `books` stream.
+
+    Each book updates, per interval, one row of a NumPy state array in O(1): no book is kept and nothing is
+    rescanned. A bar is complete when the first book of a later interval arrives for its symbol, it is then passed
+    to `on_bar`. Intervals without any book produce no bar, and the bar in progress of a symbol that went quiet is
+    only emitted by its next book or by `flush`; books of a bar completed by `flush` are ignored.
+
+    Bars follow the exchange timestamps of the books, or the time of arrival for books without one, so a recorded
+    session given to `backfill` produces the same bars it did live.
+
+        def on_bar(bar):
+            print(bar.symbol, bar.interval, bar.close, bar.spread_mean)
+
+        bars = BarAggregator([1, 60], on_bar)
+        bars.backfill("session.rec")
+        stream.subscribe_books(bars.handler, "PETR4", "VALE3")
+
+    Books with an empty side have no mid price and are skipped.
+
+    Args:
+        intervals (Sequence[float]): The bar lengths in seconds, eg. [1, 60]
+        on_bar (Optional[Callable[[Bar], Any]]): Called with each completed bar, on the event loop, so it should
+          be quick
+        capacity (int): The symbols allocated up front, doubled whenever they are all used
+    """
+
+    def __init__(
+        self,
+        intervals: Sequence[float],
+        on_bar: Optional[Callable[[Bar], Any]] = None,
+        capacity: int = 64,
+    ) -> None:
+        if not intervals or any(interval <= 0 for interval in intervals):
+            raise ValueError("intervals must be positive numbers of seconds")
+        self.intervals = tuple(intervals)
+        self.on_bar = on_bar
+        self._interval_ns = [int(interval * 1e9) for interval in self.intervals]
+
+        capacity = max(capacity, 1)
+        # per interval: the state rows of the symbols and the start of their last bar, which is in progress while
+        # its update count is not 0
+        self._state = [np.zeros((capacity, _FIELDS)) for _ in self.intervals]
+        self._starts = [np.full(capacity, NAT, dtype=np.int64) for _ in self.intervals]
+        self._views: List[Tuple[int, memoryview, memoryview]] = []
+        self._make_views()
+        self._symbols: List[str] = []
+        self._symbol_codes: Dict[str, int] = {}
+        self.skipped = 0
+
+    def _make_views(self) -> None:
+        # flat memoryviews of the state arrays: reading and writing a single value through them costs a fraction of
+        # NumPy scalar indexing, which would dominate the update
+        self._views = [
+            (interval_ns, memoryview(state).cast("B").cast("d"), memoryview(starts).cast("B").cast("q"))
+            for interval_ns, state, starts in zip(self._interval_ns, self._state, self._starts)
+        ]
+
+    @property
+    def symbols(self) -> List[str]:
+        return list(self._symbols)
+
+    async def handler(self, book: Union[Orderbook, LazyOrderbook, CompactOrderbook, OrderbookView, RawData]) -> None:
+        """The stream handler, for `subscribe_books`."""
+        self.update(book)
+
+    def update(self, book: Union[Orderbook, LazyOrderbook, CompactOrderbook, OrderbookView, RawData]) -> None:
+        """Adds a book to the bars of its symbol, emitting those it completes."""
+        top = _top_of_book(book)
+        if top is None:
+            self.skipped += 1
+            return
+        symbol, ts, bid, bid_size, ask, ask_size = top
+        mid = (bid + ask) / 2
+        spread = ask - bid
+
+        code = self._symbol_codes.get(symbol)
+        if code is None:
+            code = self._add_symbol(symbol)
+
+        base = code * _FIELDS
+        for i, (interval_ns, state, starts) in enumerate(self._views):
+            start = ts - ts % interval_ns
+            if start > starts[code]:
+                # the first book of a new bar, books arriving late are counted in the bar in progress
+                if state[base + _UPDATES] and self.on_bar is not None:
+                    self.on_bar(Bar(symbol, self.intervals[i], starts[code], state[base : base + _FIELDS]))
+                starts[code] = start
+                state[base : base + _FIELDS] = array(
+                    "d", (mid, mid, mid, mid, spread, spread, spread, spread, bid_size, ask_size, bid_size, ask_size, 1)
+                )
+                continue
+            if not state[base + _UPDATES]:
+                # the bar was already completed by flush
+                continue
+
+            state[base + _CLOSE] = mid
+            if mid > state[base + _HIGH]:
+                state[base + _HIGH] = mid
+            elif mid < state[base + _LOW]:
+                state[base + _LOW] = mid
+            state[base + _SPREAD_SUM] += spread
+            if spread < state[base + _SPREAD_MIN]:
+                state[base + _SPREAD_MIN] = spread
+            elif spread > state[base + _SPREAD_MAX]:
+                state[base + _SPREAD_MAX] = spread
+            state[base + _SPREAD] = spread
+            state[base + _BID_SIZE_SUM] += bid_size
+            state[base + _ASK_SIZE_SUM] += ask_size
+            state[base + _BID_SIZE] = bid_size
+            state[base + _ASK_SIZE] = ask_size
+            state[base + _UPDATES] += 1
+
+    def _add_symbol(self, symbol: str) -> int:
+        code = self._symbol_codes[symbol] = len(self._symbols)
+        self._symbols.append(symbol)
+        if code == len(self._starts[0]):
+            for i in range(len(self.intervals)):
+                self._state[i] = np.concatenate([self._state[i], np.zeros_like(self._state[i])])
+                self._starts[i] = np.concatenate([self._starts[i], np.full_like(self._starts[i], NAT)])
+            self._make_views()
+        return code
+
+    def current(self, symbol: str, interval: float) -> Optional[Bar]:
+        """The bar in progress of `symbol` for `interval`, None before its first book."""
+        code = self._symbol_codes.get(symbol)
+        i = self.intervals.index(interval)
+        if code is None or not self._state[i][code, _UPDATES]:
+            return None
+        return Bar(symbol, interval, int(self._starts[i][code]), self._state[i][code].tolist())
+
+    def flush(self, now: Optional[float] = None) -> List[Bar]:
+        """
+        Completes the bars in progress that ended by `now`, every one of them when None, eg. at the end of the
+        session or from a timer for symbols that trade rarely. They are passed to `on_bar` and returned.
+
+        Args:
+            now (Optional[float]): Epoch seconds
+
+        Returns:
+            List[Bar]: the completed bars
+        """
+        now_ns = None if now is None else int(now * 1e9)
+        bars = []
+        for i, interval in enumerate(self.intervals):
+            starts, state = self._starts[i], self._state[i]
+            for code, symbol in enumerate(self._symbols):
+                start = int(starts[code])
+                if not state[code, _UPDATES] or (now_ns is not None and start + self._interval_ns[i] > now_ns):
+                    continue
+                bars.append(Bar(symbol, interval, start, state[code].tolist()))
+                # no updates marks the bar as completed: later books of its interval are ignored
+                state[code, _UPDATES] = 0
+
+        bars.sort(key=lambda bar: bar.start)
+        if self.on_bar is not None:
+            for bar in bars:
+                self.on_bar(bar)
+        return bars
+
+    def backfill(self, path: str, *symbols: str, **replay_options: Any) -> None:
+        """
+        Replays a session recorded with a FrameRecorder into the bars, as fast as possible. Call it before the live
+        stream runs: it runs its own event loop. The bar in progress at the end of the recording is carried over
+        to the live books.
+
+        Args:
+            path (str): The recording
+            *symbols: The symbols to aggregate, every symbol of the recording by default
+            **replay_options: Passed to the ReplayStream, eg. `local_books=True` for a recording of incremental books
+        """
+        # the replay stream imports the streams, which import the data models
+        from easybov.data.live.replay import ReplayStream
+
+        stream = ReplayStream(path, **replay_options)
+        stream.subscribe_books(self.handler, *(symbols or ("*",)))
+        stream.run()
+
+
+def _top_of_book(
+    book: Union[Orderbook, LazyOrderbook, CompactOrderbook, OrderbookView, RawData]
+) -> Optional[Tuple[str, int, float, float, float, float]]:
+    """(symbol, ts in ns, best bid, its size, best ask, its size), None for a book with an empty side."""
+    if isinstance(book, CompactOrderbook):
+        if not len(book.bids_prices) or not len(book.asks_prices):
+            return None
+        return (
+            book.symbol,
+            int(book.ts * 1e9),
+            float(book.bids_prices[0]),
+            float(book.bids_sizes[0]),
+            float(book.asks_prices[0]),
+            float(book.asks_sizes[0]),
+        )
+
+    if isinstance(book, (LazyOrderbook, dict)):
+        if isinstance(book, LazyOrderbook):
+            symbol, raw = book.symbol, book.raw
+        else:
+            symbol, raw = book["arg"]["symbol"], book["data"][0]
+        bids, asks, ts = raw["bids"], raw["asks"], raw.get("ts")
+        if not bids or not asks:
+            return None
+        bid, ask = bids[0], asks[0]
+        ts = int(float(ts) * 1e9) if ts is not None else time.time_ns()
+        return symbol, ts, float(bid[0]), float(bid[1]), float(ask[0]), float(ask[1])
+
+    if isinstance(book, OrderbookView):
+        bid, ask = book.best_bid, book.best_ask
+        if bid is None or ask is None:
+            return None
+        ts = int(book.ts.timestamp() * 1e9) if book.ts is not None else time.time_ns()
+        return book.symbol, ts, bid[0], bid[1], ask[0], ask[1]
+
+    if not book.bids or not book.asks:
+        return None
+    bid, ask = book.bids[0], book.asks[0]
+    return book.symbol, int(book.ts.timestamp() * 1e9), bid.price, bid.size, ask.price, ask.size
@@ -0,0 +1,332 @@
+import calendar
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from easybov.common import RawData
+from easybov.data.enums import BookSide
+from easybov.data.models.compact_order_book import CompactOrderbook
+from easybov.data.models.lazy import LazyOrderbook, LazyOrderUpdate
+from easybov.data.models.local_order_book import OrderbookView
+from easybov.data.models.order_book import Orderbook
+from easybov.data.timestamps import NAT, TimePoint, to_ns
+from easybov.trading.enums import OrderStatus
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+_STATUS_CODES = {status.value: code for code, status in enumerate(OrderStatus)}
+
+
+class _Columns:
+    """
+    Typed NumPy columns sharing one row count, grown by doubling so appends are amortised O(1) and every row takes
+    the same few bytes whatever the session length. A column given as (dtype, width) is a 2D block of `width` values
+    per row, written with a single assignment.
+    """
+
+    def __init__(self, dtypes: Dict[str, Any], capacity: int) -> None:
+        self._shapes = {
+            name: (np.dtype(dtype[0]), (dtype[1],)) if isinstance(dtype, tuple) else (np.dtype(dtype), ())
+            for name, dtype in dtypes.items()
+        }
+        capacity = max(capacity, 1)
+        self._data = {name: np.empty((capacity,) + shape, dtype) for name, (dtype, shape) in self._shapes.items()}
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def capacity(self) -> int:
+        return len(next(iter(self._data.values())))
+
+    @property
+    def nbytes(self) -> int:
+        return sum(column.nbytes for column in self._data.values())
+
+    def next_row(self) -> int:
+        if self._size == self.capacity:
+            capacity = self.capacity * 2
+            for name, column in self._data.items():
+                dtype, shape = self._shapes[name]
+                grown = np.empty((capacity,) + shape, dtype)
+                grown[: self._size] = column[: self._size]
+                self._data[name] = grown
+        row = self._size
+        self._size += 1
+        return row
+
+    def views(self, rows: slice) -> Dict[str, np.ndarray]:
+        return {name: column[: self._size][rows] for name, column in self._data.items()}
+
+    def clear(self) -> None:
+        self._size = 0
+
+
+class _ColumnarRecorder:
+    """Rows appended in arrival order, with a non-decreasing `received` column the windows are searched on."""
+
+    # the int64 nanosecond columns, shown as datetime64 by to_pandas
+    timestamp_columns: Tuple[str, ...] = ("received",)
+
+    def __init__(self, dtypes: Dict[str, Any], capacity: int) -> None:
+        self._columns = _Columns(dict({"received": np.int64, "symbol": np.int32}, **dtypes), capacity)
+        self._symbols: List[str] = []
+        self._symbol_codes: Dict[str, int] = {}
+        self._last_received = NAT
+
+    def __len__(self) -> int:
+        return len(self._columns)
+
+    @property
+    def nbytes(self) -> int:
+        """The memory held by the columns, allocated capacity included."""
+        return self._columns.nbytes
+
+    @property
+    def symbols(self) -> List[str]:
+        """The symbols in the order of their codes in the `symbol` column."""
+        return list(self._symbols)
+
+    def clear(self) -> None:
+        """Forgets every row, keeping the allocated memory."""
+        self._columns.clear()
+        self._last_received = NAT
+
+    def _row(self, symbol: str) -> Tuple[int, Dict[str, np.ndarray]]:
+        code = self._symbol_codes.get(symbol)
+        if code is None:
+            code = self._symbol_codes[symbol] = len(self._symbols)
+            self._symbols.append(symbol)
+
+        row = self._columns.next_row()
+        data = self._columns._data
+        # the wall clock may step back, the column must not for the windows to be binary searched
+        received = self._last_received = max(time.time_ns(), self._last_received)
+        data["received"][row] = received
+        data["symbol"][row] = code
+        return row, data
+
+    def window(self, start: Optional[TimePoint] = None, end: Optional[TimePoint] = None) -> slice:
+        """The rows received from `start` included to `end` excluded, either bound None for no bound."""
+        received = self._columns._data["received"][: len(self)]
+        first = 0 if start is None else int(np.searchsorted(received, to_ns(start), side="left"))
+        last = len(self) if end is None else int(np.searchsorted(received, to_ns(end), side="left"))
+        return slice(first, max(first, last))
+
+    def arrays(self, start: Optional[TimePoint] = None, end: Optional[TimePoint] = None) -> Dict[str, np.ndarray]:
+        """
+        Views, not copies, of every column for the rows received between `start` and `end`. They are only valid
+        until the next append that grows the columns, and are overwritten by appends after a `clear`.
+        """
+        return self._columns.views(self.window(start, end))
+
+    def to_pandas(self, start: Optional[TimePoint] = None, end: Optional[TimePoint] = None) -> "pd.DataFrame":
+        """
+        A DataFrame of the rows received between `start` and `end`. The numeric and timestamp columns share the
+        recorder's memory, so copy the frame to keep it beyond the next appends; `symbol` is a Categorical.
+        """
+        import pandas as pd
+
+        columns: Dict[str, Any] = {}
+        for name, values in self.arrays(start, end).items():
+            if name == "symbol":
+                values = pd.Categorical.from_codes(values, categories=self._symbols)
+            elif values.dtype == np.int64 and name in self.timestamp_columns:
+                values = values.view("datetime64[ns]")
+            columns[name] = self._column_for_pandas(name, values)
+        return pd.DataFrame(columns, copy=False)
+
+    def _column_for_pandas(self, name: str, values: Any) -> Any:
+        return values
+
+
+class BookRecorder(_ColumnarRecorder):
+    """
+    Appends books into columns: `received` and `ts` (int64 nanoseconds, datetime64 in pandas), `symbol` (int32 code
+    into `symbols`) and the price and size of the best `depth` levels of each side, `bid_px_0`, `bid_sz_0`, ...,
+    `ask_sz_{depth-1}`. Missing levels are NaN.
+
+    Accepts whatever the books handlers receive (Orderbook, LazyOrderbook, CompactOrderbook, OrderbookView or the
+    raw message), so `handler` can be subscribed directly:
+
+        books = BookRecorder(depth=5)
+        stream.subscribe_books(books.handler, "PETR4", "VALE3")
+        ...
+        df = books.to_pandas(start=time.time() - 60)
+
+    Args:
+        depth (int): The number of levels kept per side
+        capacity (int): The rows allocated up front, doubled whenever they are all used
+    """
+
+    timestamp_columns = ("received", "ts")
+
+    def __init__(self, depth: int = 5, capacity: int = 1 << 16) -> None:
+        self.depth = depth
+        # every level of a row lives in one block: bid prices, bid sizes, ask prices then ask sizes
+        self._level_names = [
+            f"{side}_{field}_{i}" for side in ("bid", "ask") for field in ("px", "sz") for i in range(depth)
+        ]
+        self._padding = [[float("nan")] * (depth - count) for count in range(depth + 1)]
+        super().__init__({"ts": np.int64, "levels": (np.float64, 4 * depth)}, capacity)
+
+    async def handler(self, book: Union[Orderbook, LazyOrderbook, CompactOrderbook, OrderbookView, RawData]) -> None:
+        self.append(book)
+
+    def append(self, book: Union[Orderbook, LazyOrderbook, CompactOrderbook, OrderbookView, RawData]) -> None:
+        depth = self.depth
+        if isinstance(book, CompactOrderbook):
+            row, data = self._row(book.symbol)
+            data["ts"][row] = int(book.ts * 1e9)
+            levels = data["levels"][row]
+            levels[:] = np.nan
+            for i, values in enumerate((book.bids_prices, book.bids_sizes, book.asks_prices, book.asks_sizes)):
+                values = values[:depth]
+                levels[i * depth : i * depth + len(values)] = values
+            return
+
+        if isinstance(book, LazyOrderbook):
+            symbol, raw = book.symbol, book.raw
+            ts, bids, asks = raw.get("ts"), raw["bids"][:depth], raw["asks"][:depth]
+        elif isinstance(book, dict):
+            symbol, raw = book["arg"]["symbol"], book["data"][0]
+            ts, bids, asks = raw.get("ts"), raw["bids"][:depth], raw["asks"][:depth]
+        elif isinstance(book, OrderbookView):
+            symbol, bids, asks = book.symbol, book.bids(depth), book.asks(depth)
+            ts = book.ts.timestamp() if book.ts is not None else None
+        else:
+            symbol, ts = book.symbol, book.ts.timestamp()
+            bids = [(level.price, level.size) for level in book.bids[:depth]]
+            asks = [(level.price, level.size) for level in book.asks[:depth]]
+
+        bid_padding, ask_padding = self._padding[len(bids)], self._padding[len(asks)]
+        row, data = self._row(symbol)
+        data["ts"][row] = int(float(ts) * 1e9) if ts is not None else NAT
+        # numpy parses the price and size strings of raw messages itself
+        data["levels"][row] = (
+            [level[0] for level in bids]
+            + bid_padding
+            + [level[1] for level in bids]
+            + bid_padding
+            + [level[0] for level in asks]
+            + ask_padding
+            + [level[1] for level in asks]
+            + ask_padding
+        )
+
+    def arrays(self, start: Optional[TimePoint] = None, end: Optional[TimePoint] = None) -> Dict[str, np.ndarray]:
+        """
+        Views of the columns like the base `arrays`, with one strided view per level column instead of the level
+        block.
+        """
+        arrays = super().arrays(start, end)
+        levels = arrays.pop("levels")
+        for i, name in enumerate(self._level_names):
+            arrays[name] = levels[:, i]
+        return arrays
+
+    def side(
+        self, side: Union[BookSide, str], start: Optional[TimePoint] = None, end: Optional[TimePoint] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        The (rows, depth) prices and sizes of one side for the rows received between `start` and `end`, best level
+        first, as views like `arrays`.
+        """
+        offset = 0 if BookSide(side) == BookSide.BID else 2 * self.depth
+        levels = self._columns.views(self.window(start, end))["levels"]
+        return levels[:, offset : offset + self.depth], levels[:, offset + self.depth : offset + 2 * self.depth]
+
+
+class OrderRecorder(_ColumnarRecorder):
+    """
+    Appends order updates into columns: `received` and `transact_time` (int64 nanoseconds, datetime64 in pandas),
+    `symbol` and `cl_ord_id` (int32 codes into `symbols` and `cl_ord_ids`), `side` (int8, 1 buy and 2 sell),
+    `ord_status` (int8 code, a Categorical of OrderStatus in pandas), `price`, `last_px`, `last_qty`, `cum_qty` and
+    `order_qty` (float64).
+
+    cl_ord_ids are stored once each, so memory grows with the rows plus the distinct orders.
+
+    Args:
+        capacity (int): The rows allocated up front, doubled whenever they are all used
+    """
+
+    timestamp_columns = ("received", "transact_time")
+    # the order statuses, indexed by their code in the `ord_status` column
+    statuses: Tuple[OrderStatus, ...] = tuple(OrderStatus)
+
+    def __init__(self, capacity: int = 1 << 14) -> None:
+        super().__init__(
+            {
+                "cl_ord_id": np.int32,
+                "transact_time": np.int64,
+                "side": np.int8,
+                "ord_status": np.int8,
+                "price": np.float64,
+                "last_px": np.float64,
+                "last_qty": np.float64,
+                "cum_qty": np.float64,
+                "order_qty": np.float64,
+            },
+            capacity,
+        )
+        self._cl_ord_ids: List[str] = []
+        self._cl_ord_id_codes: Dict[str, int] = {}
+
+    @property
+    def cl_ord_ids(self) -> List[str]:
+        """The cl_ord_ids in the order of their codes in the `cl_ord_id` column."""
+        return list(self._cl_ord_ids)
+
+    async def handler(self, update: Union[Any, RawData]) -> None:
+        self.append(update)
+
+    def append(self, update: Union[Any, RawData]) -> None:
+        """Appends an OrderUpdate, a LazyOrderUpdate or a raw `orders` message."""
+        if isinstance(update, LazyOrderUpdate):
+            fields = update._data
+        elif isinstance(update, dict):
+            fields = update["data"][0]
+        else:
+            fields = update.__dict__
+
+        cl_ord_id = fields["cl_ord_id"]
+        code = self._cl_ord_id_codes.get(cl_ord_id)
+        if code is None:
+            code = self._cl_ord_id_codes[cl_ord_id] = len(self._cl_ord_ids)
+            self._cl_ord_ids.append(cl_ord_id)
+
+        row, data = self._row(fields["symbol"])
+        data["cl_ord_id"][row] = code
+        data["transact_time"][row] = _parse_transact_time(fields.get("transact_time"))
+        data["side"][row] = int(fields["side"])
+        data["ord_status"][row] = _STATUS_CODES[getattr(fields["ord_status"], "value", fields["ord_status"])]
+        for name in ("price", "last_px", "last_qty", "cum_qty", "order_qty"):
+            value = fields.get(name)
+            data[name][row] = float(value) if value is not None and value != "" else np.nan
+
+    def _column_for_pandas(self, name: str, values: Any) -> Any:
+        import pandas as pd
+
+        if name == "cl_ord_id":
+            return pd.Categorical.from_codes(values, categories=self._cl_ord_ids)
+        if name == "ord_status":
+            return pd.Categorical.from_codes(values, categories=[status.name for status in self.statuses])
+        return values
+
+
+def _parse_transact_time(value: Optional[str]) -> int:
+    """Parses `YYYYMMDD-HH:MM:SS[.fff]` in UTC into epoch nanoseconds, NaT when missing or malformed."""
+    if not value:
+        return NAT
+    try:
+        seconds = calendar.timegm(
+            (int(value[0:4]), int(value[4:6]), int(value[6:8]), int(value[9:11]), int(value[12:14]), int(value[15:17]))
+        )
+        fraction = value[18:]
+        nanos = int(fraction.ljust(9, "0")[:9]) if fraction else 0
+    except (ValueError, IndexError):
+        return NAT
+    return seconds * 1_000_000_000 + nanos
@@ -4,3 +4,20 @@ class MarketType(str, Enum):
     EQUITY = "equity"
     FUTURES = "futures"
 
+
+class BookFormat(str, Enum):
+    """
+    How `books` messages are handed to stream handlers.
+
+    Attributes:
+        MODEL: A validated pydantic `Orderbook`.
+        COMPACT: A `CompactOrderbook` backed by NumPy float64 arrays.
+    """
+
+    MODEL = "model"
+    COMPACT = "compact"
+
+
+class BookSide(str, Enum):
+    BID = "bids"
+    ASK = "asks"
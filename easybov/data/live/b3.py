@@ -1,7 +1,13 @@
-from typing import Optional, Dict
+from typing import Optional, Dict, Union
 
+from easybov.common.codec import JSONCodec
+from easybov.common.dispatch import DispatchConfig
 from easybov.common.enums import BaseURL
+from easybov.common.instrumentation import Observer
+from easybov.common.reconnect import ReconnectPolicy
+from easybov.common.recording import FrameRecorder
 from easybov.common.websocket import BaseStream
+from easybov.data.enums import BookFormat
 
 
 class B3DataStream(BaseStream):
@@ -12,6 +18,15 @@ class B3DataStream(BaseStream):
         raw_data: bool = False,        
         websocket_params: Optional[Dict] = None,
         url_override: Optional[str] = None,
+        observer: Optional[Observer] = None,
+        codec: Optional[Union[JSONCodec, str]] = None,
+        local_books: bool = False,
+        book_format: Union[BookFormat, str] = BookFormat.MODEL,
+        lazy_models: bool = False,
+        dispatch: Optional[DispatchConfig] = None,
+        decode_workers: int = 0,
+        reconnect_policy: Optional[ReconnectPolicy] = None,
+        recorder: Optional[FrameRecorder] = None,
     ) -> None:                
         super().__init__(
             endpoint=(
@@ -23,4 +38,13 @@ class B3DataStream(BaseStream):
             secret_key=secret_key,
             raw_data=raw_data,
             websocket_params=websocket_params,
+            observer=observer,
+            codec=codec,
+            local_books=local_books,
+            book_format=book_format,
+            lazy_models=lazy_models,
+            dispatch=dispatch,
+            decode_workers=decode_workers,
+            reconnect_policy=reconnect_policy,
+            recorder=recorder,
         )
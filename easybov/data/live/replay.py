@@ -0,0 +1,123 @@
+import asyncio
+import logging
+import time
+from typing import Dict, Optional, Union
+
+from easybov.common.codec import JSONCodec
+from easybov.common.dispatch import DispatchConfig
+from easybov.common.instrumentation import Observer
+from easybov.common.recording import read_frames
+from easybov.common.websocket import BaseStream
+from easybov.data.enums import BookFormat
+
+log = logging.getLogger(__name__)
+
+
+class ReplayStream(BaseStream):
+    """
+    Plays back a session recorded with a FrameRecorder through the same decoding, dispatch and model building code
+    as a live B3DataStream, for backtests and throughput benchmarks.
+
+    `subscribe_books`, `subscribe_orders` and `run` behave as on the live stream; frames of channels and symbols
+    without a handler are decoded and skipped, as they would be live. `run` returns once the recording is exhausted
+    and every queued message was handled.
+
+    Args:
+        path (str): The recording
+        speed (Optional[float]): 1 replays with the original timing, 10 ten times faster, None as fast as possible
+        raw_data (bool): Whether handlers receive the decoded dicts instead of models
+        observer, codec, local_books, book_format, lazy_models, dispatch, decode_workers: As for B3DataStream
+    """
+
+    def __init__(
+        self,
+        path: str,
+        speed: Optional[float] = None,
+        raw_data: bool = False,
+        observer: Optional[Observer] = None,
+        codec: Optional[Union[JSONCodec, str]] = None,
+        local_books: bool = False,
+        book_format: Union[BookFormat, str] = BookFormat.MODEL,
+        lazy_models: bool = False,
+        dispatch: Optional[DispatchConfig] = None,
+        decode_workers: int = 0,
+    ) -> None:
+        if speed is not None and speed <= 0:
+            raise ValueError("speed must be positive, or None to replay as fast as possible")
+
+        super().__init__(
+            endpoint=path,
+            api_key="",
+            secret_key="",
+            raw_data=raw_data,
+            observer=observer,
+            codec=codec,
+            local_books=local_books,
+            book_format=book_format,
+            lazy_models=lazy_models,
+            dispatch=dispatch,
+            decode_workers=decode_workers,
+        )
+        self._path = path
+        self._speed = speed
+        self._name = "replay"
+        self._frames = 0
+        self._elapsed = 0.0
+
+    @property
+    def stats(self) -> Dict[str, float]:
+        """Frames replayed so far, how long it took and the resulting rate."""
+        return {
+            "frames": self._frames,
+            "seconds": self._elapsed,
+            "frames_per_sec": self._frames / self._elapsed if self._elapsed else 0.0,
+        }
+
+    async def _subscribe_all(self) -> None:
+        # the recording already holds whatever was subscribed
+        pass
+
+    async def _unsubscribe(self, trades=(), books=(), orders=()) -> None:
+        pass
+
+    async def _run_forever(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._should_run = True
+        self._running = True
+        log.info(f"replaying {self._path}")
+
+        started = time.perf_counter()
+        first_received = None
+        try:
+            for received, frame in read_frames(self._path):
+                if not self._should_run:
+                    break
+
+                if self._speed is not None:
+                    if first_received is None:
+                        first_received = received
+                    delay = (received - first_received) / self._speed - (time.perf_counter() - started)
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+
+                await self._on_frame(frame)
+                self._frames += 1
+                if self._frames & 0xFF == 0:
+                    # as fast as possible must still let the dispatch workers run
+                    await asyncio.sleep(0)
+
+            if self._decoder is not None:
+                await self._decoder.drain()
+            await self._conflator.join()
+            if self._dispatcher is not None:
+                await self._dispatcher.join()
+        finally:
+            self._elapsed = time.perf_counter() - started
+            self._running = False
+            if self._dispatcher is not None:
+                await self._dispatcher.stop()
+            await self._conflator.stop()
+            if self._decoder is not None:
+                await self._decoder.stop()
+
+        log.info(f"replayed {self._frames} frames in {self._elapsed:.3f}s")
@@ -0,0 +1,331 @@
+import asyncio
+import concurrent.futures
+import logging
+import multiprocessing
+import queue
+import threading
+import zlib
+from typing import Any, Callable, Dict, List, Mapping, Optional, Set
+
+from easybov.data.enums import BookFormat
+from easybov.data.live.b3 import B3DataStream
+from easybov.data.models.local_order_book import OrderbookView
+
+log = logging.getLogger(__name__)
+
+_STOP = None
+
+
+def hash_placement(symbol: str, shards: int) -> int:
+    """The default placement: a hash of the symbol that is stable across processes and runs."""
+    return zlib.crc32(symbol.encode("utf-8")) % shards
+
+
+def _run_shard(
+    api_key: str,
+    secret_key: str,
+    symbols: List[str],
+    out: multiprocessing.Queue,
+    stop: multiprocessing.Event,
+    stream_kwargs: Dict[str, Any],
+) -> None:
+    """Entry point of a shard process: streams the books of `symbols` and forwards them to the parent."""
+    stream = B3DataStream(api_key, secret_key, **stream_kwargs)
+
+    async def forward(book) -> None:
+        # blocks while the parent is behind: the shard stops reading its connection instead of buffering
+        out.put(book)
+
+    stream.subscribe_books(forward, *symbols)
+
+    def wait_for_stop() -> None:
+        stop.wait()
+        if stream._loop is not None:
+            stream.stop()
+
+    threading.Thread(target=wait_for_stop, daemon=True).start()
+    stream.run()
+
+
+class ShardedDataStream:
+    """
+    Spreads books subscriptions over several websocket connections, each one a `B3DataStream`.
+
+    Symbols are placed on a shard when first subscribed and stay there. By default the placement hashes the symbol;
+    with `weights` (eg. the expected messages per second of each symbol) every new symbol goes to the least loaded
+    shard instead, and `placement` takes any `(symbol, shards) -> index` callable. The orders and trades channels
+    always live on one connection in this process.
+
+    By default all the connections share one event loop in the thread calling `run`. With `processes=True` each
+    shard runs, decodes and builds its books in a process of its own, and only the parsed books are sent back:
+    `CompactOrderbook`s (or the decoded dicts with `raw_data`), which pickle as a few NumPy arrays. Handlers always
+    run in the parent, on its event loop. With processes, every symbol must be subscribed before `run`, and at most
+    `queue_size` books wait for the handlers: when they fall behind the shards block, like `OverflowPolicy.BLOCK`,
+    and stop reading their connections until the handlers catch up.
+
+    A connection is opened when its shard gets its first symbol, also while the stream runs.
+
+    Args:
+        api_key (str): The API key
+        secret_key (str): The secret key
+        shards (int): The number of books connections
+        weights (Optional[Mapping[str, float]]): Per symbol load used to balance the shards. Unlisted symbols
+          weigh 1.
+        placement (Optional[Callable[[str, int], int]]): Overrides how symbols are assigned to shards
+        processes (bool): Whether to run each books shard in its own process
+        queue_size (int): The books waiting for the handlers at most, with processes
+        raw_data (bool): Whether handlers receive the decoded dicts instead of models
+        url_override (Optional[str]): The websocket endpoint to use instead of the default one
+        **stream_kwargs: Passed on to every `B3DataStream` (websocket_params, observer, codec, local_books, ...).
+          With processes they must be picklable.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        secret_key: str,
+        shards: int = 2,
+        weights: Optional[Mapping[str, float]] = None,
+        placement: Optional[Callable[[str, int], int]] = None,
+        processes: bool = False,
+        queue_size: int = 1000,
+        raw_data: bool = False,
+        url_override: Optional[str] = None,
+        **stream_kwargs,
+    ) -> None:
+        if shards < 1:
+            raise ValueError("shards must be at least 1")
+        if weights is not None and placement is not None:
+            raise ValueError("use either weights or placement, not both")
+        if queue_size < 1:
+            raise ValueError("queue_size must be at least 1")
+
+        self._api_key = api_key
+        self._secret_key = secret_key
+        self._shard_count = shards
+        self._weights = weights
+        self._placement = placement
+        self._processes = processes
+        self._queue_size = queue_size
+
+        self._stream_kwargs = dict(stream_kwargs, raw_data=raw_data, url_override=url_override)
+        if processes:
+            # the children only forward books, compact ones are the cheapest to build and to pickle
+            self._stream_kwargs["book_format"] = BookFormat.COMPACT
+            for name in ("observer", "dispatch", "local_books", "lazy_models"):
+                if self._stream_kwargs.pop(name, None):
+                    log.warning(f"{name} is ignored by the shard processes")
+
+        self._orders = B3DataStream(api_key, secret_key, **self._stream_kwargs)
+        self._shards = [None if processes else B3DataStream(api_key, secret_key, **self._stream_kwargs)
+                        for _ in range(shards)]
+
+        self._assignments: Dict[str, int] = {}
+        self._loads = [0.0] * shards
+        self._handlers: Dict[str, Callable] = {}
+        self._running = False
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # the streams whose connection was started, and the tasks running them
+        self._started: Set[B3DataStream] = set()
+        self._tasks: List[asyncio.Future] = []
+        self._start_lock = threading.Lock()
+
+        self._children: List[multiprocessing.Process] = []
+        self._child_stop = None
+        self._child_out = None
+
+    def shard_for(self, symbol: str) -> int:
+        """The shard `symbol` is, or would be, placed on."""
+        if symbol in self._assignments:
+            return self._assignments[symbol]
+        if self._placement is not None:
+            return self._placement(symbol, self._shard_count) % self._shard_count
+        if self._weights is not None:
+            return min(range(self._shard_count), key=lambda i: self._loads[i])
+        return hash_placement(symbol, self._shard_count)
+
+    @property
+    def placement(self) -> Dict[int, List[str]]:
+        """The symbols of each shard."""
+        result: Dict[int, List[str]] = {i: [] for i in range(self._shard_count)}
+        for symbol, shard in self._assignments.items():
+            result[shard].append(symbol)
+        return result
+
+    def _assign(self, symbol: str) -> int:
+        shard = self.shard_for(symbol)
+        if symbol not in self._assignments:
+            self._assignments[symbol] = shard
+            self._loads[shard] += self._weights.get(symbol, 1.0) if self._weights is not None else 1.0
+        return shard
+
+    def subscribe_books(self, handler: Callable, *symbols, conflate: bool = False) -> None:
+        if self._processes:
+            if self._running:
+                raise RuntimeError("shard processes are started by run, subscribe to every symbol before it")
+            if conflate:
+                raise ValueError("conflate is not available with shard processes")
+            B3DataStream._ensure_coroutine(handler)
+            for symbol in symbols:
+                self._assign(symbol)
+                self._handlers[symbol] = handler
+            return
+
+        by_shard: Dict[int, List[str]] = {}
+        for symbol in symbols:
+            by_shard.setdefault(self._assign(symbol), []).append(symbol)
+        for shard, shard_symbols in by_shard.items():
+            self._shards[shard].subscribe_books(handler, *shard_symbols, conflate=conflate)
+            self._start_stream(self._shards[shard])
+
+    def unsubscribe_books(self, *symbols) -> None:
+        if self._processes:
+            raise RuntimeError("shard processes do not support unsubscribing")
+        for symbol in symbols:
+            shard = self._assignments.pop(symbol)
+            self._loads[shard] -= self._weights.get(symbol, 1.0) if self._weights is not None else 1.0
+            self._shards[shard].unsubscribe_books(symbol)
+
+    def subscribe_trades(self, handler: Callable, *symbols) -> None:
+        self._orders.subscribe_trades(handler, *symbols)
+        self._start_stream(self._orders)
+
+    def unsubscribe_trades(self, *symbols) -> None:
+        self._orders.unsubscribe_trades(*symbols)
+
+    def subscribe_orders(self, handler: Callable) -> None:
+        self._orders.subscribe_orders(handler)
+        self._start_stream(self._orders)
+
+    def unsubscribe_orders(self) -> None:
+        self._orders.unsubscribe_orders()
+
+    def get_book(self, symbol: str) -> Optional[OrderbookView]:
+        """The local order book of `symbol`, when the shards keep local books."""
+        if self._processes or symbol not in self._assignments:
+            return None
+        return self._shards[self._assignments[symbol]].get_book(symbol)
+
+    def _active_streams(self) -> List[B3DataStream]:
+        streams = [shard for shard in self._shards if shard is not None and shard._handlers["books"]]
+        if self._orders._handlers["orders"] or self._orders._handlers["trades"]:
+            streams.append(self._orders)
+        return streams
+
+    def _start_stream(self, stream: B3DataStream) -> None:
+        """Runs the connection of `stream` once, when the sharded stream is running. Callable from any thread."""
+        with self._start_lock:
+            loop = self._loop
+            if loop is None or stream in self._started:
+                return
+            self._started.add(stream)
+
+        def create_task() -> None:
+            self._tasks.append(loop.create_task(stream._run_forever()))
+
+        loop.call_soon_threadsafe(create_task)
+
+    async def _run_forever(self) -> None:
+        with self._start_lock:
+            self._loop = asyncio.get_running_loop()
+        for stream in self._active_streams():
+            self._start_stream(stream)
+        if self._processes:
+            self._tasks.append(asyncio.ensure_future(self._forward_children()))
+        # lets the tasks scheduled above be created
+        await asyncio.sleep(0)
+
+        # the connections started while running are waited for too
+        awaited = 0
+        while awaited < len(self._tasks):
+            tasks = self._tasks[awaited:]
+            awaited = len(self._tasks)
+            await asyncio.gather(*tasks)
+
+    def _start_children(self) -> None:
+        context = multiprocessing.get_context("spawn")
+        self._child_out = context.Queue(self._queue_size)
+        self._child_stop = context.Event()
+        for shard, symbols in self.placement.items():
+            if not symbols:
+                continue
+            child = context.Process(
+                target=_run_shard,
+                args=(self._api_key, self._secret_key, symbols, self._child_out, self._child_stop,
+                      self._stream_kwargs),
+                name=f"easybov-shard-{shard}",
+                daemon=True,
+            )
+            child.start()
+            self._children.append(child)
+
+    async def _forward_children(self) -> None:
+        books: asyncio.Queue = asyncio.Queue(self._queue_size)
+        loop = asyncio.get_running_loop()
+
+        def read() -> None:
+            while True:
+                book = self._child_out.get()
+                try:
+                    # waits for room: the shared queue fills up and the children block while the handlers are behind
+                    asyncio.run_coroutine_threadsafe(books.put(book), loop).result()
+                except (RuntimeError, concurrent.futures.CancelledError):
+                    # the event loop is gone
+                    return
+                if book is _STOP:
+                    return
+
+        threading.Thread(target=read, name="easybov-shard-reader", daemon=True).start()
+
+        while True:
+            book = await books.get()
+            if book is _STOP:
+                return
+            symbol = book["arg"]["symbol"] if isinstance(book, dict) else book.symbol
+            handler = self._handlers.get(symbol, self._handlers.get("*"))
+            if handler is None:
+                continue
+            try:
+                await handler(book)
+            except Exception as e:
+                log.exception(f"error in books handler: {e}")
+
+    def run(self) -> None:
+        self._running = True
+        if self._processes:
+            self._start_children()
+        try:
+            asyncio.run(self._run_forever())
+        except KeyboardInterrupt:
+            print("keyboard interrupt, bye")
+        finally:
+            self.stop()
+
+    def stop(self) -> None:
+        with self._start_lock:
+            loop, self._loop = self._loop, None
+            started, self._started = self._started, set()
+        running = loop is not None and loop.is_running()
+        if running:
+            # the connections whose task has not begun yet stop as soon as they start
+            for stream in started:
+                asyncio.run_coroutine_threadsafe(stream.stop_ws(), loop).result()
+
+        if self._children:
+            self._child_stop.set()
+            try:
+                # the handlers drain the queue while the loop runs, otherwise the sentinel only ends the reader
+                self._child_out.put(_STOP, block=running)
+            except queue.Full:
+                pass
+            for child in self._children:
+                child.join(timeout=5)
+                if child.is_alive():
+                    child.terminate()
+            self._children = []
+        self._tasks = []
+        self._running = False
+
+    def stats(self) -> Dict[int, Dict[str, float]]:
+        """The symbols and accumulated weight of each shard, for checking the balance."""
+        return {i: {"symbols": len(symbols), "load": self._loads[i]} for i, symbols in self.placement.items()}
@@ -0,0 +1,256 @@
+import multiprocessing
+import time
+from multiprocessing import resource_tracker, shared_memory
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+
+from easybov.common.types import RawData
+from easybov.data.models.compact_order_book import CompactOrderbook
+from easybov.data.models.local_order_book import OrderbookView
+from easybov.data.models.order_book import Orderbook
+
+DEFAULT_SHARED_BOOKS_NAME = "easybov-books"
+
+_MAGIC = b"EBOVBK01"
+_HEADER = np.dtype([("magic", "S8"), ("depth", "<u4"), ("capacity", "<u4"), ("count", "<u4")])
+_HEADER_SIZE = 64
+_MAX_SYMBOL_LENGTH = 16
+_READ_SPINS = 1000
+
+# segments created by publishers of this process, whose tracker registration belongs to the publisher
+_published = set()
+
+
+def _slot_dtype(depth: int) -> np.dtype:
+    # seq first so the version counter of every slot is 8 byte aligned
+    return np.dtype(
+        [
+            ("seq", "<u8"),
+            ("ts", "<f8"),
+            ("n_bids", "<u4"),
+            ("n_asks", "<u4"),
+            ("symbol", f"S{_MAX_SYMBOL_LENGTH}"),
+            ("bids", "<f8", (2, depth)),
+            ("asks", "<f8", (2, depth)),
+        ]
+    )
+
+
+class _SharedBooks:
+    """The memory layout shared by the publisher and the readers: a header, then one fixed size slot per symbol."""
+
+    def __init__(self, shm: shared_memory.SharedMemory, depth: int, capacity: int) -> None:
+        self._shm = shm
+        self.depth = depth
+        self.capacity = capacity
+        self.header = np.ndarray((), _HEADER, buffer=shm.buf)
+        slots = np.ndarray((capacity,), _slot_dtype(depth), buffer=shm.buf, offset=_HEADER_SIZE)
+        self.seq = slots["seq"]
+        self.ts = slots["ts"]
+        self.n_bids = slots["n_bids"]
+        self.n_asks = slots["n_asks"]
+        self.symbols = slots["symbol"]
+        self.bids = slots["bids"]
+        self.asks = slots["asks"]
+
+    @staticmethod
+    def size(depth: int, capacity: int) -> int:
+        return _HEADER_SIZE + capacity * _slot_dtype(depth).itemsize
+
+    def release(self) -> None:
+        # numpy views keep the buffer exported, they must go before the segment can be closed
+        self.header = self.seq = self.ts = self.n_bids = self.n_asks = self.symbols = self.bids = self.asks = None
+        self._shm.close()
+
+
+class SharedBookPublisher:
+    """
+    Writes the latest top `depth` levels of each symbol to a shared memory segment, for SharedBookReaders in other
+    processes on the same host.
+
+    One process owns the stream and publishes, every strategy process reads: no duplicate connections, logins or
+    decoding. Each symbol has a fixed slot guarded by a seqlock: the slot version is odd while it is being written,
+    so readers never wait on a lock and retry the rare read that overlapped a write.
+
+    Example:
+        publisher = SharedBookPublisher(depth=10)
+        stream = B3DataStream(api_key, secret_key, book_format="compact")
+        stream.subscribe_books(publisher.handler, "PETR4", "VALE3")
+        stream.run()
+
+    Args:
+        name (str): The name of the shared memory segment
+        depth (int): The number of levels kept per side
+        capacity (int): The maximum number of symbols
+    """
+
+    def __init__(self, name: str = DEFAULT_SHARED_BOOKS_NAME, depth: int = 20, capacity: int = 256) -> None:
+        self._shm = shared_memory.SharedMemory(name=name, create=True, size=_SharedBooks.size(depth, capacity))
+        _published.add(self._shm.name)
+        self._books = _SharedBooks(self._shm, depth, capacity)
+        self._books.header["depth"] = depth
+        self._books.header["capacity"] = capacity
+        self._books.header["count"] = 0
+        self._books.header["magic"] = _MAGIC
+        self._index: Dict[str, int] = {}
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    def _slot(self, symbol: str) -> int:
+        index = self._index.get(symbol)
+        if index is not None:
+            return index
+
+        encoded = symbol.encode("utf-8")
+        if len(encoded) > _MAX_SYMBOL_LENGTH:
+            raise ValueError(f"symbols are limited to {_MAX_SYMBOL_LENGTH} bytes, got {symbol!r}")
+        index = len(self._index)
+        if index >= self._books.capacity:
+            raise ValueError(f"the segment is full, it holds {self._books.capacity} symbols")
+
+        self._books.symbols[index] = encoded
+        self._index[symbol] = index
+        # readers look symbols up below count only, so the slot is published last
+        self._books.header["count"] = index + 1
+        return index
+
+    def publish(self, book: Union[CompactOrderbook, Orderbook, OrderbookView, RawData]) -> None:
+        """
+        Writes the top levels of `book`: a CompactOrderbook, an Orderbook, a local book view or a raw `books`
+        message.
+        """
+        if not isinstance(book, CompactOrderbook):
+            if isinstance(book, Orderbook):
+                book = CompactOrderbook.from_orderbook(book)
+            elif isinstance(book, OrderbookView):
+                book = CompactOrderbook.from_orderbook(book.to_orderbook(self._books.depth))
+            else:
+                book = CompactOrderbook.from_raw(book["arg"]["symbol"], book)
+
+        books = self._books
+        i = self._slot(book.symbol)
+        depth = books.depth
+        n_bids = min(len(book.bids_prices), depth)
+        n_asks = min(len(book.asks_prices), depth)
+
+        books.seq[i] += 1
+        books.ts[i] = book.ts
+        books.n_bids[i] = n_bids
+        books.n_asks[i] = n_asks
+        books.bids[i, 0, :n_bids] = book.bids_prices[:n_bids]
+        books.bids[i, 1, :n_bids] = book.bids_sizes[:n_bids]
+        books.asks[i, 0, :n_asks] = book.asks_prices[:n_asks]
+        books.asks[i, 1, :n_asks] = book.asks_sizes[:n_asks]
+        books.seq[i] += 1
+
+    async def handler(self, book: Union[CompactOrderbook, Orderbook, OrderbookView, RawData]) -> None:
+        """A books handler publishing every book it receives, for `subscribe_books`."""
+        self.publish(book)
+
+    def close(self, unlink: bool = True) -> None:
+        """Detaches from the segment and, by default, removes it. Readers attached at that time keep working."""
+        self._books.release()
+        if unlink:
+            self._shm.unlink()
+            _published.discard(self._shm.name)
+
+
+class SharedBookReader:
+    """
+    Reads the books written by a SharedBookPublisher in another process.
+
+    Reads take no lock and do not talk to the publisher: the levels of the slot are copied (a few hundred bytes) and
+    kept only if the slot version did not move meanwhile, so a book is never torn.
+
+    Args:
+        name (str): The name of the shared memory segment
+    """
+
+    def __init__(self, name: str = DEFAULT_SHARED_BOOKS_NAME) -> None:
+        self._shm = _attach(name)
+
+        header = np.ndarray((), _HEADER, buffer=self._shm.buf)
+        magic, depth, capacity = bytes(header["magic"]), int(header["depth"]), int(header["capacity"])
+        del header
+        if magic != _MAGIC:
+            self._shm.close()
+            raise ValueError(f"{name!r} is not a shared books segment")
+        self._books = _SharedBooks(self._shm, depth, capacity)
+        self._index: Dict[str, int] = {}
+
+    @property
+    def symbols(self) -> List[str]:
+        """The symbols published so far."""
+        count = int(self._books.header["count"])
+        return [symbol.decode("utf-8") for symbol in self._books.symbols[:count]]
+
+    def _slot(self, symbol: str) -> Optional[int]:
+        index = self._index.get(symbol)
+        if index is None:
+            self._index = {name: i for i, name in enumerate(self.symbols)}
+            index = self._index.get(symbol)
+        return index
+
+    def version(self, symbol: str) -> int:
+        """
+        The slot version of `symbol`, which grows with every update: compare it with the last one seen to skip
+        reading books that did not change. 0 for a symbol never published.
+        """
+        i = self._slot(symbol)
+        return 0 if i is None else int(self._books.seq[i])
+
+    def read(self, symbol: str) -> Optional[CompactOrderbook]:
+        """The current book of `symbol`, None if it was never published."""
+        i = self._slot(symbol)
+        if i is None:
+            return None
+
+        books = self._books
+        spins = 0
+        while True:
+            before = books.seq[i]
+            if before and not before & 1:
+                ts = float(books.ts[i])
+                n_bids = int(books.n_bids[i])
+                n_asks = int(books.n_asks[i])
+                bids = books.bids[i, :, :n_bids].copy()
+                asks = books.asks[i, :, :n_asks].copy()
+                if books.seq[i] == before:
+                    return CompactOrderbook(symbol, ts, bids, asks)
+            elif not before:
+                return None
+
+            spins += 1
+            if spins % _READ_SPINS == 0:
+                # the publisher was probably preempted mid write, let it run
+                time.sleep(0)
+
+    def orderbook(self, symbol: str) -> Optional[Orderbook]:
+        """The current book of `symbol` as an `Orderbook` model."""
+        book = self.read(symbol)
+        return book.to_orderbook() if book is not None else None
+
+    def close(self) -> None:
+        self._books.release()
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        pass
+
+    # before Python 3.13 attaching registers the segment with the resource tracker, which would remove it when the
+    # reader exits while the publisher still uses it. Processes started through multiprocessing share the tracker
+    # of their parent, possibly the publisher's own, and must leave the registration alone.
+    shm = shared_memory.SharedMemory(name=name)
+    if multiprocessing.parent_process() is None and shm.name not in _published:
+        try:
+            # the tracker knows POSIX segments by the name shm_open got, with its leading slash
+            resource_tracker.unregister("/" + shm.name, "shared_memory")
+        except Exception:
+            pass
+    return shm
@@ -1,2 +1,6 @@
 from easybov.data.models.order_book import *
+from easybov.data.models.local_order_book import *
 
+from easybov.data.models.compact_order_book import *
+from easybov.data.models.lazy import *
+from easybov.data.models.trade import *
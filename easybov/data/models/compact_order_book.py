@@ -0,0 +1,156 @@
+import math
+from typing import Dict, Optional, Union
+
+import numpy as np
+
+from easybov.data.enums import BookSide
+from easybov.data.models.order_book import Orderbook
+
+_EMPTY = np.empty((2, 0), dtype=np.float64)
+
+
+def _parse_levels(levels) -> np.ndarray:
+    """
+    Parses [[price, size, ...], ...] into one contiguous (2, n) float64 array, prices in row 0 and sizes in row 1.
+    """
+    if not levels:
+        return _EMPTY
+    try:
+        parsed = np.array(levels, dtype=np.float64)
+    except ValueError:
+        # levels of different lengths, keep only price and size
+        parsed = np.array([level[:2] for level in levels], dtype=np.float64)
+    return parsed[:, :2].T.copy()
+
+
+class CompactOrderbook:
+    """
+    An order book stored in NumPy float64 arrays instead of one pydantic object per level.
+
+    `bids_prices`, `bids_sizes`, `asks_prices` and `asks_sizes` are contiguous views ordered best first, so
+    analytics run vectorised without any per level Python objects. Use `to_orderbook` for the validated model.
+    """
+
+    __slots__ = ("symbol", "ts", "_bids", "_asks")
+
+    def __init__(self, symbol: str, ts: float, bids: np.ndarray, asks: np.ndarray) -> None:
+        self.symbol = symbol
+        self.ts = ts
+        self._bids = bids
+        self._asks = asks
+
+    @classmethod
+    def from_raw(cls, symbol: str, raw_data: Dict) -> "CompactOrderbook":
+        """Builds the book from a decoded `books` message, like `Orderbook(symbol, raw_data)`."""
+        data = raw_data["data"][0]
+        return cls(symbol, float(data["ts"]), _parse_levels(data["bids"]), _parse_levels(data["asks"]))
+
+    @classmethod
+    def from_orderbook(cls, orderbook: Orderbook) -> "CompactOrderbook":
+        return cls(
+            orderbook.symbol,
+            orderbook.ts.timestamp(),
+            _parse_levels([(level.price, level.size) for level in orderbook.bids]),
+            _parse_levels([(level.price, level.size) for level in orderbook.asks]),
+        )
+
+    def to_orderbook(self) -> Orderbook:
+        """Converts to the validated `Orderbook` model."""
+        return Orderbook(
+            self.symbol,
+            {
+                "data": [
+                    {
+                        "ts": self.ts,
+                        "bids": self._bids.T.tolist(),
+                        "asks": self._asks.T.tolist(),
+                    }
+                ]
+            },
+        )
+
+    @property
+    def bids_prices(self) -> np.ndarray:
+        return self._bids[0]
+
+    @property
+    def bids_sizes(self) -> np.ndarray:
+        return self._bids[1]
+
+    @property
+    def asks_prices(self) -> np.ndarray:
+        return self._asks[0]
+
+    @property
+    def asks_sizes(self) -> np.ndarray:
+        return self._asks[1]
+
+    def _side(self, side: Union[BookSide, str]) -> np.ndarray:
+        if side == BookSide.BID:
+            return self._bids
+        if side == BookSide.ASK:
+            return self._asks
+        raise ValueError(f"side must be one of {BookSide.BID.value!r} or {BookSide.ASK.value!r}")
+
+    @property
+    def best_bid(self) -> float:
+        return self._bids[0, 0] if self._bids.shape[1] else math.nan
+
+    @property
+    def best_ask(self) -> float:
+        return self._asks[0, 0] if self._asks.shape[1] else math.nan
+
+    @property
+    def mid(self) -> float:
+        return (self.best_bid + self.best_ask) / 2
+
+    @property
+    def spread(self) -> float:
+        return self.best_ask - self.best_bid
+
+    @property
+    def microprice(self) -> float:
+        """The top of book mid weighted by the opposite side's size."""
+        if not self._bids.shape[1] or not self._asks.shape[1]:
+            return math.nan
+        bid_price, bid_size = self._bids[:, 0]
+        ask_price, ask_size = self._asks[:, 0]
+        total = bid_size + ask_size
+        if total == 0:
+            return self.mid
+        return (bid_price * ask_size + ask_price * bid_size) / total
+
+    def cumulative_depth(self, side: Union[BookSide, str]) -> np.ndarray:
+        """The running total of size from the best level outwards."""
+        return np.cumsum(self._side(side)[1])
+
+    def vwap_to_size(self, side: Union[BookSide, str], size: float) -> float:
+        """
+        The average price paid to take `size` from `side`, walking the book from the best level.
+
+        If the side holds less than `size`, the average over the whole side is returned. NaN for an empty side.
+        """
+        prices, sizes = self._side(side)
+        taken_before = np.cumsum(sizes) - sizes
+        fills = np.clip(size - taken_before, 0, sizes)
+        filled = fills.sum()
+        if filled == 0:
+            return math.nan
+        return float(np.dot(prices, fills) / filled)
+
+    def imbalance(self, depth: Optional[int] = 1) -> float:
+        """
+        (bid size - ask size) / (bid size + ask size) over the top `depth` levels, or the whole book for None.
+        """
+        bid_size = self._bids[1, :depth].sum()
+        ask_size = self._asks[1, :depth].sum()
+        total = bid_size + ask_size
+        if total == 0:
+            return 0.0
+        return float((bid_size - ask_size) / total)
+
+    def __repr__(self) -> str:
+        return (
+            f"CompactOrderbook(symbol={self.symbol!r}, ts={self.ts}, bids={self._bids.shape[1]}, "
+            f"asks={self._asks.shape[1]}, best_bid={self.best_bid}, best_ask={self.best_ask})"
+        )
@@ -0,0 +1,152 @@
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from easybov.data.models.order_book import Orderbook, OrderbookLevel
+from easybov.data.models.order_update import OrderUpdate
+from easybov.trading.enums import OrderSide, OrderStatus
+
+_UNSET = object()
+
+
+class LazyOrderbook:
+    """
+    An `Orderbook` look-alike that keeps the decoded message and builds fields only when they are read.
+
+    Parsing the timestamp and creating the `OrderbookLevel` objects happens on first access and is cached, so
+    handlers that skip most ticks after a glance at `best_bid`/`best_ask` pay almost nothing. Values are not
+    validated until `to_orderbook` is called.
+    """
+
+    __slots__ = ("symbol", "_data", "_ts", "_bids", "_asks", "_model")
+
+    def __init__(self, symbol: str, raw_data: Dict) -> None:
+        self.symbol = symbol
+        self._data = raw_data["data"][0]
+        self._ts = _UNSET
+        self._bids = _UNSET
+        self._asks = _UNSET
+        self._model = _UNSET
+
+    @property
+    def raw(self) -> Dict:
+        return self._data
+
+    @property
+    def ts(self) -> datetime:
+        if self._ts is _UNSET:
+            self._ts = datetime.fromtimestamp(float(self._data["ts"]))
+        return self._ts
+
+    @property
+    def bids(self) -> List[OrderbookLevel]:
+        if self._bids is _UNSET:
+            self._bids = [OrderbookLevel(p=bid[0], s=bid[1]) for bid in self._data["bids"]]
+        return self._bids
+
+    @property
+    def asks(self) -> List[OrderbookLevel]:
+        if self._asks is _UNSET:
+            self._asks = [OrderbookLevel(p=ask[0], s=ask[1]) for ask in self._data["asks"]]
+        return self._asks
+
+    @property
+    def best_bid(self) -> Optional[float]:
+        """The best bid price, read straight from the message without building any level."""
+        bids = self._data["bids"]
+        return float(bids[0][0]) if bids else None
+
+    @property
+    def best_ask(self) -> Optional[float]:
+        """The best ask price, read straight from the message without building any level."""
+        asks = self._data["asks"]
+        return float(asks[0][0]) if asks else None
+
+    def to_orderbook(self) -> Orderbook:
+        """The validated `Orderbook`, built once and cached."""
+        if self._model is _UNSET:
+            self._model = Orderbook(self.symbol, {"data": [self._data]})
+        return self._model
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # slots only, and the fields not built yet are left out since the sentinel is not kept by pickle or deepcopy
+        return {name: getattr(self, name) for name in self.__slots__ if getattr(self, name) is not _UNSET}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        for name in self.__slots__:
+            setattr(self, name, state.get(name, _UNSET))
+
+    def __repr__(self) -> str:
+        return f"LazyOrderbook(symbol={self.symbol!r}, best_bid={self.best_bid}, best_ask={self.best_ask})"
+
+
+class LazyOrderUpdate:
+    """
+    An `OrderUpdate` look-alike that converts fields (floats, `OrderSide`, `OrderStatus`) on first access only.
+
+    Unknown attributes raise AttributeError like the model would. Values are not validated until `to_order_update`
+    is called.
+    """
+
+    __slots__ = ("symbol", "_data", "_cache", "_model")
+
+    _CONVERTERS: Dict[str, Callable[[Any], Any]] = {
+        "cl_ord_id": str,
+        "orig_cl_ord_id": str,
+        "side": OrderSide,
+        "price": float,
+        "last_px": float,
+        "last_qty": float,
+        "cum_qty": float,
+        "order_qty": float,
+        "ord_type": str,
+        "ord_status": OrderStatus,
+        "transact_time": str,
+    }
+
+    def __init__(self, symbol: str, raw_data: Dict) -> None:
+        self._data = raw_data["data"][0]
+        self.symbol = self._data.get("symbol", symbol)
+        self._cache: Dict[str, Any] = {}
+        self._model = _UNSET
+
+    @property
+    def raw(self) -> Dict:
+        return self._data
+
+    def __getattr__(self, name: str) -> Any:
+        # only reached for names that are not slots or properties, or for slots not set yet on an instance that
+        # copy or pickle is still building, where looking up `_cache` would recurse
+        if name.startswith("_"):
+            raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+        try:
+            return self._cache[name]
+        except KeyError:
+            pass
+
+        converter = self._CONVERTERS.get(name)
+        if converter is None:
+            raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+
+        raw = self._data.get(name)
+        value = converter(raw) if raw is not None else None
+        self._cache[name] = value
+        return value
+
+    def to_order_update(self) -> OrderUpdate:
+        """The validated `OrderUpdate`, built once and cached."""
+        if self._model is _UNSET:
+            self._model = OrderUpdate(self.symbol, {"data": [self._data]})
+        return self._model
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__ if getattr(self, name) is not _UNSET}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        for name in self.__slots__:
+            setattr(self, name, state.get(name, _UNSET))
+
+    def __repr__(self) -> str:
+        return (
+            f"LazyOrderUpdate(symbol={self.symbol!r}, cl_ord_id={self._data.get('cl_ord_id')!r}, "
+            f"ord_status={self._data.get('ord_status')!r})"
+        )
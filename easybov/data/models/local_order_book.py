@@ -0,0 +1,293 @@
+import logging
+import zlib
+from bisect import bisect_left
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from easybov.data.models.order_book import Orderbook
+
+log = logging.getLogger(__name__)
+
+CHECKSUM_DEPTH = 25
+
+Level = Tuple[float, float]  # (price, size)
+
+
+class _BookSide:
+    """
+    One side of a LocalOrderBook: a price -> size dict plus the prices kept sorted best first.
+
+    Bids are stored under negated keys so both sides are ordered best first and the best level is always at
+    index 0.
+    """
+
+    __slots__ = ("_keys", "_sizes", "_raw", "_sign")
+
+    def __init__(self, descending: bool, keep_raw: bool) -> None:
+        self._keys: List[float] = []
+        self._sizes: Dict[float, float] = {}
+        self._raw: Optional[Dict[float, Tuple[str, str]]] = {} if keep_raw else None
+        self._sign = -1.0 if descending else 1.0
+
+    def clear(self) -> None:
+        self._keys.clear()
+        self._sizes.clear()
+        if self._raw is not None:
+            self._raw.clear()
+
+    def set(self, price: str, size: str) -> None:
+        key = float(price) * self._sign
+        amount = float(size)
+
+        if amount == 0:
+            if key in self._sizes:
+                del self._sizes[key]
+                del self._keys[bisect_left(self._keys, key)]
+                if self._raw is not None:
+                    del self._raw[key]
+            return
+
+        if key not in self._sizes:
+            index = bisect_left(self._keys, key)
+            self._keys.insert(index, key)
+        self._sizes[key] = amount
+        if self._raw is not None:
+            self._raw[key] = (price, size)
+
+    def best(self) -> Optional[Level]:
+        if not self._keys:
+            return None
+        key = self._keys[0]
+        return key * self._sign, self._sizes[key]
+
+    def size_at(self, price: float) -> float:
+        return self._sizes.get(price * self._sign, 0.0)
+
+    def rank(self, price: float) -> int:
+        """The number of levels strictly better than `price`."""
+        return bisect_left(self._keys, price * self._sign)
+
+    def depth_through(self, price: float) -> float:
+        """The cumulative size of every level at `price` or better."""
+        key = price * self._sign
+        total = 0.0
+        for level_key in self._keys:
+            if level_key > key:
+                break
+            total += self._sizes[level_key]
+        return total
+
+    def levels(self, depth: Optional[int] = None) -> List[Level]:
+        keys = self._keys if depth is None else self._keys[:depth]
+        return [(key * self._sign, self._sizes[key]) for key in keys]
+
+    def raw_levels(self, depth: int) -> List[Tuple[str, str]]:
+        return [self._raw[key] for key in self._keys[:depth]]
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+
+class LocalOrderBook:
+    """
+    An order book for one symbol that is kept up to date in place from `books` messages.
+
+    Messages with `"action": "update"` are applied as deltas, a size of zero removing the level; anything else is
+    treated as a full snapshot. When the payload carries `seqId`/`prevSeqId` a gap marks the book invalid, and when
+    it carries a `checksum` the top 25 levels are verified with the exchange's CRC32. An invalid book stays invalid
+    until the next snapshot.
+
+    Best bid and ask are O(1), locating a price level is O(log n).
+
+    Args:
+        symbol (str): The symbol of the book
+        validate_checksum (bool): Whether to verify `checksum` fields. Requires keeping the raw price strings.
+    """
+
+    def __init__(self, symbol: str, validate_checksum: bool = True) -> None:
+        self.symbol = symbol
+        self.ts: Optional[float] = None
+        self.seq_id: Optional[int] = None
+        self.is_valid = False
+        self._validate_checksum = validate_checksum
+        self._bids = _BookSide(descending=True, keep_raw=validate_checksum)
+        self._asks = _BookSide(descending=False, keep_raw=validate_checksum)
+        self._view = OrderbookView(self)
+
+    @property
+    def view(self) -> "OrderbookView":
+        """A read-only view of this book. The same object is returned on every call."""
+        return self._view
+
+    def apply(self, msg: Dict) -> bool:
+        """
+        Applies a `books` message.
+
+        Args:
+            msg (Dict): The decoded websocket message
+
+        Returns:
+            bool: whether the book is valid after applying the message
+        """
+        data = msg["data"][0]
+        is_snapshot = msg.get("action", "snapshot") != "update"
+
+        if is_snapshot:
+            self._bids.clear()
+            self._asks.clear()
+            self.is_valid = True
+        elif not self.is_valid:
+            # deltas on top of a broken book are meaningless, wait for the next snapshot
+            return False
+        else:
+            prev_seq_id = data.get("prevSeqId")
+            if prev_seq_id is not None and self.seq_id is not None and int(prev_seq_id) != self.seq_id:
+                log.warning(f"{self.symbol} book sequence gap: expected {self.seq_id}, got {prev_seq_id}")
+                self.invalidate()
+                return False
+
+        for level in data.get("bids", ()):
+            self._bids.set(level[0], level[1])
+        for level in data.get("asks", ()):
+            self._asks.set(level[0], level[1])
+
+        if "ts" in data:
+            self.ts = float(data["ts"])
+        if data.get("seqId") is not None:
+            self.seq_id = int(data["seqId"])
+
+        checksum = data.get("checksum")
+        if self._validate_checksum and checksum is not None and int(checksum) != self.checksum():
+            log.warning(f"{self.symbol} book checksum mismatch")
+            self.invalidate()
+
+        return self.is_valid
+
+    def invalidate(self) -> None:
+        """Marks the book unusable until the next snapshot."""
+        self.is_valid = False
+
+    def checksum(self, depth: int = CHECKSUM_DEPTH) -> int:
+        """
+        The signed CRC32 of "bid_px:bid_sz:ask_px:ask_sz:..." over the top `depth` levels, as sent by the exchange.
+        """
+        if not self._validate_checksum:
+            raise ValueError("checksum requires the book to be created with validate_checksum=True")
+
+        bids = self._bids.raw_levels(depth)
+        asks = self._asks.raw_levels(depth)
+        parts = []
+        for i in range(max(len(bids), len(asks))):
+            if i < len(bids):
+                parts.extend(bids[i])
+            if i < len(asks):
+                parts.extend(asks[i])
+
+        crc = zlib.crc32(":".join(parts).encode("utf-8"))
+        return crc - (1 << 32) if crc & 0x80000000 else crc
+
+
+class OrderbookView:
+    """
+    A read-only window on a LocalOrderBook.
+
+    The view always reflects the current state of the book: copy what you need (eg. with `to_orderbook`) if you
+    want to keep it past the handler call.
+    """
+
+    __slots__ = ("_book",)
+
+    def __init__(self, book: LocalOrderBook) -> None:
+        self._book = book
+
+    @property
+    def symbol(self) -> str:
+        return self._book.symbol
+
+    @property
+    def ts(self) -> Optional[datetime]:
+        return datetime.fromtimestamp(self._book.ts) if self._book.ts is not None else None
+
+    @property
+    def seq_id(self) -> Optional[int]:
+        return self._book.seq_id
+
+    @property
+    def is_valid(self) -> bool:
+        return self._book.is_valid
+
+    @property
+    def best_bid(self) -> Optional[Level]:
+        return self._book._bids.best()
+
+    @property
+    def best_ask(self) -> Optional[Level]:
+        return self._book._asks.best()
+
+    @property
+    def mid(self) -> Optional[float]:
+        bid, ask = self._book._bids.best(), self._book._asks.best()
+        if bid is None or ask is None:
+            return None
+        return (bid[0] + ask[0]) / 2
+
+    @property
+    def spread(self) -> Optional[float]:
+        bid, ask = self._book._bids.best(), self._book._asks.best()
+        if bid is None or ask is None:
+            return None
+        return ask[0] - bid[0]
+
+    def bid_size_at(self, price: float) -> float:
+        return self._book._bids.size_at(price)
+
+    def ask_size_at(self, price: float) -> float:
+        return self._book._asks.size_at(price)
+
+    def bid_rank(self, price: float) -> int:
+        """How many bid levels are priced better than `price`."""
+        return self._book._bids.rank(price)
+
+    def ask_rank(self, price: float) -> int:
+        """How many ask levels are priced better than `price`."""
+        return self._book._asks.rank(price)
+
+    def bid_depth_through(self, price: float) -> float:
+        """Total bid size at `price` or higher."""
+        return self._book._bids.depth_through(price)
+
+    def ask_depth_through(self, price: float) -> float:
+        """Total ask size at `price` or lower."""
+        return self._book._asks.depth_through(price)
+
+    def bids(self, depth: Optional[int] = None) -> List[Level]:
+        return self._book._bids.levels(depth)
+
+    def asks(self, depth: Optional[int] = None) -> List[Level]:
+        return self._book._asks.levels(depth)
+
+    @property
+    def bid_count(self) -> int:
+        return len(self._book._bids)
+
+    @property
+    def ask_count(self) -> int:
+        return len(self._book._asks)
+
+    def to_orderbook(self, depth: Optional[int] = None) -> Orderbook:
+        """Copies the current state into an `Orderbook` model."""
+        return Orderbook(
+            self.symbol,
+            {
+                "data": [
+                    {
+                        "ts": self._book.ts or 0,
+                        "bids": self.bids(depth),
+                        "asks": self.asks(depth),
+                    }
+                ]
+            },
+        )
+
+    def __repr__(self) -> str:
+        return f"OrderbookView(symbol={self.symbol!r}, best_bid={self.best_bid}, best_ask={self.best_ask})"
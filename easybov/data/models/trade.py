@@ -0,0 +1,93 @@
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Union
+
+from easybov.data.mappings import TRADE_MAPPING
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def _timestamp_ns(value: Union[str, int, float]) -> int:
+    """Epoch nanoseconds of a trade time: epoch seconds like the books' `ts`, or an RFC 3339 string."""
+    if isinstance(value, int):
+        return value * 1_000_000_000
+    # a float has no room for the nanoseconds of a current time: the seconds and their fraction are parsed apart,
+    # floats from their shortest decimal form
+    seconds, _, fraction = (repr(value) if isinstance(value, float) else value).partition(".")
+    if seconds.lstrip("-").isdigit() and (not fraction or fraction.isdigit()):
+        nanos = int(fraction.ljust(9, "0")[:9]) if fraction else 0
+        return int(seconds) * 1_000_000_000 + (-nanos if seconds.startswith("-") else nanos)
+    try:
+        return round(float(value) * 1e9)
+    except ValueError:
+        pass
+
+    # RFC 3339 with up to nanoseconds, which datetime cannot hold: the fraction is parsed apart
+    text = value.replace("Z", "+00:00")
+    fraction = 0
+    if "." in text:
+        head, tail = text.split(".", 1)
+        digits = len(tail) - len(tail.lstrip("0123456789"))
+        fraction = int(tail[:digits].ljust(9, "0")[:9])
+        text = head + tail[digits:]
+    when = datetime.fromisoformat(text)
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    delta = when - _EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1_000_000_000 + fraction
+
+
+class Trade:
+    """
+    A trade of the `trades` channel, built without validation: `timestamp` is in epoch nanoseconds, `price` and
+    `size` are floats. The message may use the short keys of `TRADE_MAPPING` (`p`, `s`, ...) or the long names.
+    """
+
+    __slots__ = ("symbol", "timestamp", "price", "size", "exchange", "id", "conditions", "tape")
+
+    def __init__(
+        self,
+        symbol: str,
+        timestamp: int,
+        price: float,
+        size: float,
+        exchange: Optional[str] = None,
+        id: Optional[Union[int, str]] = None,
+        conditions: Optional[List[str]] = None,
+        tape: Optional[str] = None,
+    ) -> None:
+        self.symbol = symbol
+        self.timestamp = timestamp
+        self.price = price
+        self.size = size
+        self.exchange = exchange
+        self.id = id
+        self.conditions = conditions
+        self.tape = tape
+
+    @classmethod
+    def from_raw(cls, symbol: str, raw_data: Dict) -> "Trade":
+        """Builds the first trade of a decoded `trades` message."""
+        return cls.from_data(symbol, raw_data["data"][0])
+
+    @classmethod
+    def from_data(cls, symbol: str, data: Dict[str, Any]) -> "Trade":
+        """Builds a trade from one entry of the `data` of a `trades` message."""
+        if "p" not in data:
+            data = {short: data[name] for short, name in TRADE_MAPPING.items() if name in data}
+        return cls(
+            symbol,
+            _timestamp_ns(data["t"]),
+            float(data["p"]),
+            float(data["s"]),
+            data.get("x"),
+            data.get("i"),
+            data.get("c"),
+            data.get("z"),
+        )
+
+    def to_datetime(self) -> datetime:
+        """`timestamp` as an aware UTC datetime, to the microsecond."""
+        return datetime.fromtimestamp(self.timestamp / 1e9, tz=timezone.utc)
+
+    def __repr__(self) -> str:
+        return "Trade({})".format(", ".join(f"{k}={getattr(self, k)!r}" for k in self.__slots__))
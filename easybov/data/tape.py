@@ -0,0 +1,163 @@
+import math
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from easybov.common import RawData
+from easybov.data.models.trade import Trade
+from easybov.data.timestamps import TimePoint, to_ns
+
+_EMPTY = np.zeros(0)
+_EMPTY_TIMESTAMPS = np.zeros(0, dtype=np.int64)
+
+
+class _Ring:
+    """
+    The last `capacity` trades of one symbol. Each trade is written twice, at its slot and `capacity` further, so the
+    latest n trades are always one contiguous slice and every query works on views.
+    """
+
+    __slots__ = ("capacity", "count", "timestamps", "prices", "sizes", "_writers")
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self.count = 0
+        self.timestamps = np.zeros(2 * capacity, dtype=np.int64)
+        self.prices = np.zeros(2 * capacity)
+        self.sizes = np.zeros(2 * capacity)
+        # writing single values through memoryviews costs a fraction of NumPy scalar indexing
+        self._writers = (
+            memoryview(self.timestamps).cast("B").cast("q"),
+            memoryview(self.prices).cast("B").cast("d"),
+            memoryview(self.sizes).cast("B").cast("d"),
+        )
+
+    def append(self, timestamp: int, price: float, size: float) -> None:
+        slot = self.count % self.capacity
+        mirror = slot + self.capacity
+        timestamps, prices, sizes = self._writers
+        timestamps[slot] = timestamps[mirror] = timestamp
+        prices[slot] = prices[mirror] = price
+        sizes[slot] = sizes[mirror] = size
+        self.count += 1
+
+    def __len__(self) -> int:
+        return min(self.count, self.capacity)
+
+    def bounds(self, n: Optional[int] = None) -> Tuple[int, int]:
+        """The slice of the latest `n` trades, all those kept when None, oldest first."""
+        end = self.count % self.capacity + self.capacity if self.count >= self.capacity else self.count
+        kept = len(self)
+        return end - (kept if n is None else min(n, kept)), end
+
+
+class TradeTape:
+    """
+    Keeps the last `capacity` trades of each symbol in fixed size NumPy ring buffers, for VWAP, volume and last
+    trades queries that run vectorised on views of the buffers: a query copies nothing and appends allocate nothing
+    once a symbol's buffer exists.
+
+        tape = TradeTape(capacity=10000)
+        stream.subscribe_trades(tape.handler, "PETR4")
+        ...
+        tape.vwap("PETR4", window=60)
+
+    Windows in seconds end at `now`, by default the time of the symbol's latest trade, so queries give the same
+    answers live and on a replay. The time windows are binary searched: trades are expected in time order, as a
+    venue prints them.
+
+    Args:
+        capacity (int): The trades kept per symbol, the older ones are overwritten
+    """
+
+    def __init__(self, capacity: int = 10000) -> None:
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self._rings: Dict[str, _Ring] = {}
+
+    @property
+    def symbols(self) -> List[str]:
+        return list(self._rings)
+
+    def count(self, symbol: str) -> int:
+        """The trades of `symbol` currently kept."""
+        ring = self._rings.get(symbol)
+        return len(ring) if ring is not None else 0
+
+    async def handler(self, trade: Union[Trade, RawData]) -> None:
+        """The stream handler, for `subscribe_trades`."""
+        self.append(trade)
+
+    def append(self, trade: Union[Trade, RawData]) -> None:
+        """Adds a Trade, or every trade of a raw `trades` message."""
+        if isinstance(trade, dict):
+            symbol = trade["arg"]["symbol"]
+            for data in trade["data"]:
+                self.append(Trade.from_data(symbol, data))
+            return
+
+        ring = self._rings.get(trade.symbol)
+        if ring is None:
+            ring = self._rings[trade.symbol] = _Ring(self.capacity)
+        ring.append(trade.timestamp, trade.price, trade.size)
+
+    def last(self, symbol: str, n: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        The timestamps (epoch nanoseconds), prices and sizes of the latest `n` trades of `symbol`, oldest first.
+        They are views of the buffer: copy them to keep them beyond the next trades.
+
+        Args:
+            symbol (str): The symbol
+            n (Optional[int]): The number of trades, every trade kept when None
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray]: timestamps, prices and sizes
+        """
+        ring = self._rings.get(symbol)
+        if ring is None:
+            return _EMPTY_TIMESTAMPS, _EMPTY, _EMPTY
+        start, end = ring.bounds(n)
+        return ring.timestamps[start:end], ring.prices[start:end], ring.sizes[start:end]
+
+    def vwap(
+        self, symbol: str, window: Optional[float] = None, n: Optional[int] = None, now: Optional[TimePoint] = None
+    ) -> float:
+        """
+        The volume weighted average price of the trades of `symbol` in the last `window` seconds, or of its last
+        `n` trades, or of every trade kept. NaN without any trade.
+
+        Args:
+            symbol (str): The symbol
+            window (Optional[float]): The seconds before `now` to include
+            n (Optional[int]): The number of latest trades to include, when no window is given
+            now (Optional[TimePoint]): The end of the window, the latest trade of the symbol by default
+        """
+        _, prices, sizes = self._select(symbol, window, n, now)
+        volume = sizes.sum()
+        return float(np.dot(prices, sizes) / volume) if volume else math.nan
+
+    def volume(
+        self, symbol: str, window: Optional[float] = None, n: Optional[int] = None, now: Optional[TimePoint] = None
+    ) -> float:
+        """The traded size of `symbol`, over the same trades as `vwap`."""
+        return float(self._select(symbol, window, n, now)[2].sum())
+
+    def _select(
+        self, symbol: str, window: Optional[float], n: Optional[int], now: Optional[TimePoint]
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        ring = self._rings.get(symbol)
+        if ring is None:
+            return _EMPTY_TIMESTAMPS, _EMPTY, _EMPTY
+        start, end = ring.bounds(None if window is not None else n)
+        if window is not None and end > start:
+            timestamps = ring.timestamps[start:end]
+            if now is None:
+                last = int(timestamps[-1])
+            else:
+                last = to_ns(now)
+                end = start + int(timestamps.searchsorted(last, side="right"))
+            # the trades in (last - window, last]
+            start += int(timestamps.searchsorted(last - int(window * 1e9), side="right"))
+            end = max(start, end)
+        return ring.timestamps[start:end], ring.prices[start:end], ring.sizes[start:end]
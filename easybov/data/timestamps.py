@@ -0,0 +1,19 @@
+from datetime import datetime
+from typing import Union
+
+import numpy as np
+
+# a point in time given to the window methods: epoch seconds, a datetime or a pandas Timestamp
+TimePoint = Union[float, int, datetime]
+
+# a missing time in the int64 nanosecond columns, NaT for NumPy and pandas
+NAT = np.iinfo(np.int64).min
+
+
+def to_ns(point: TimePoint) -> int:
+    """Epoch nanoseconds of `point`, keeping the nanoseconds of pandas Timestamps."""
+    if isinstance(point, datetime):
+        # pandas Timestamps are datetimes too, and keep their nanoseconds in `value`
+        value = getattr(point, "value", None)
+        return value if isinstance(value, int) else int(point.timestamp() * 1e9)
+    return int(point * 1e9)
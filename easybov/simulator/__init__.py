@@ -0,0 +1,4 @@
+from easybov.simulator.books import *
+from easybov.simulator.market_data import *
+from easybov.simulator.trading import *
+from easybov.simulator.server import *
@@ -0,0 +1,56 @@
+"""
+Runs the simulator until interrupted:
+
+    python -m easybov.simulator --ws-port 8765 --rest-port 8001 --api-key key --secret-key secret
+"""
+import argparse
+import logging
+import time
+
+from easybov.simulator.server import Simulator
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Local market data and trading simulator")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--ws-port", type=int, default=8765)
+    parser.add_argument("--rest-port", type=int, default=8001)
+    parser.add_argument("--api-key", help="require logins and requests signed with this key")
+    parser.add_argument("--secret-key")
+    parser.add_argument("--rate", type=float, default=10.0, help="books updates per second per symbol")
+    parser.add_argument("--levels", type=int, default=10)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--disconnect-after", type=float, help="close every connection after this many seconds")
+    parser.add_argument("--rate-limit", type=float, help="REST requests per second before answering 429")
+    parser.add_argument("--reject-rate", type=float, default=0.0, help="fraction of REST requests answered 429")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every REST response")
+    args = parser.parse_args()
+
+    if bool(args.api_key) != bool(args.secret_key):
+        parser.error("--api-key and --secret-key go together")
+
+    logging.basicConfig(level=logging.INFO)
+    simulator = Simulator(
+        host=args.host,
+        ws_port=args.ws_port,
+        rest_port=args.rest_port,
+        credentials={args.api_key: args.secret_key} if args.api_key else None,
+        rate=args.rate,
+        levels=args.levels,
+        disconnect_after=args.disconnect_after,
+        seed=args.seed,
+        rate_limit=args.rate_limit,
+        reject_rate=args.reject_rate,
+        latency=args.latency,
+    )
+    with simulator:
+        print(f"market data: {simulator.ws_url}\ntrading:     {simulator.rest_url}")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
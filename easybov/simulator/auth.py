@@ -0,0 +1,68 @@
+import hashlib
+import hmac
+import time
+from typing import Mapping, Optional, Union
+
+# how far the signed timestamp may be from the server clock
+MAX_CLOCK_SKEW_SECONDS = 30
+
+WS_VERIFY_PATH = "/api/v1/users/verify"
+
+
+def sign(
+    secret_key: str, ts: str, method: str, path: str, query_string: str = "", payload: Union[str, bytes] = b""
+) -> str:
+    """The signature the SDK clients send, computed the same way."""
+    if isinstance(payload, str):
+        payload = payload.encode("utf-8")
+    hashed_payload = hashlib.sha512(payload).hexdigest()
+    s = "%s\n%s\n%s\n%s\n%s" % (method, path, query_string or "", hashed_payload, ts)
+    return hmac.new(secret_key.encode("utf-8"), s.encode("utf-8"), hashlib.sha512).hexdigest()
+
+
+class Authenticator:
+    """
+    Checks the signatures of REST requests and websocket logins.
+
+    Args:
+        credentials (Optional[Mapping[str, str]]): api key -> secret key. None accepts every request unchecked.
+    """
+
+    def __init__(self, credentials: Optional[Mapping[str, str]] = None) -> None:
+        self._credentials = dict(credentials) if credentials is not None else None
+
+    def verify(
+        self,
+        api_key: Optional[str],
+        ts: Optional[str],
+        signature: Optional[str],
+        method: str,
+        path: str,
+        query_string: str = "",
+        payload: Union[str, bytes] = b"",
+    ) -> Optional[str]:
+        """
+        Returns:
+            Optional[str]: why the request is rejected, None when it is accepted
+        """
+        if self._credentials is None:
+            return None
+
+        secret_key = self._credentials.get(api_key or "")
+        if secret_key is None:
+            return "unknown api key"
+
+        try:
+            if abs(time.time() - float(ts)) > MAX_CLOCK_SKEW_SECONDS:
+                return "timestamp expired"
+        except (TypeError, ValueError):
+            return "invalid timestamp"
+
+        expected = sign(secret_key, ts, method, path, query_string, payload)
+        if not hmac.compare_digest(expected, signature or ""):
+            return "invalid signature"
+        return None
+
+    def verify_login(self, args: Mapping[str, str]) -> Optional[str]:
+        """Checks the arguments of a websocket `login` op."""
+        return self.verify(args.get("api_key"), args.get("timestamp"), args.get("sign"), "GET", WS_VERIFY_PATH)
@@ -0,0 +1,132 @@
+import random
+import time
+from typing import Dict, List, Optional
+
+from easybov.data.models.local_order_book import LocalOrderBook
+
+
+class SyntheticBook:
+    """
+    A random walk order book producing `books` messages: a snapshot, then updates carrying `seqId`, `prevSeqId`
+    and the exchange `checksum`, so clients keeping local books can validate them. `trade` prints trades at the
+    touch for the `trades` channel.
+
+    Every update changes a few sizes and, now and then, moves the price by one tick; the book always keeps `levels`
+    levels on each side.
+
+    Args:
+        symbol (str): The symbol of the book
+        price (float): The initial mid price
+        levels (int): The number of levels per side
+        tick (float): The price increment
+        seed (Optional[int]): Seeds the random generator, for reproducible traffic
+    """
+
+    def __init__(
+        self, symbol: str, price: float = 30.0, levels: int = 10, tick: float = 0.01, seed: Optional[int] = None
+    ) -> None:
+        self.symbol = symbol
+        self.levels = levels
+        self.tick = tick
+        self._random = random.Random(seed)
+        self._seq_id = 0
+        self._trade_id = 0
+        # the checksums are computed the way clients verify them, on the very strings sent
+        self._book = LocalOrderBook(symbol)
+
+        best_bid = round(price - tick / 2, 2)
+        bids = [[self._price(best_bid - i * tick), self._size()] for i in range(levels)]
+        asks = [[self._price(best_bid + (i + 1) * tick), self._size()] for i in range(levels)]
+        self._apply("snapshot", bids, asks)
+
+    def _price(self, price: float) -> str:
+        return f"{price:.2f}"
+
+    def _size(self) -> str:
+        return str(self._random.randint(1, 50) * 100)
+
+    def _apply(self, action: str, bids: List[List[str]], asks: List[List[str]]) -> Dict:
+        self._seq_id += 1
+        data = {
+            "ts": str(time.time()),
+            "bids": bids,
+            "asks": asks,
+            "seqId": self._seq_id,
+            "prevSeqId": self._seq_id - 1 if action == "update" else -1,
+        }
+        msg = {"arg": {"channel": "books", "symbol": self.symbol}, "action": action, "data": [data]}
+        self._book.apply(msg)
+        data["checksum"] = self._book.checksum()
+        return msg
+
+    @property
+    def best_bid(self) -> float:
+        return self._book.view.best_bid[0]
+
+    @property
+    def best_ask(self) -> float:
+        return self._book.view.best_ask[0]
+
+    def snapshot(self) -> Dict:
+        """The current book as a snapshot message, without advancing it."""
+        view = self._book.view
+        bids = [[self._price(price), str(int(size))] for price, size in view.bids()]
+        asks = [[self._price(price), str(int(size))] for price, size in view.asks()]
+        return {
+            "arg": {"channel": "books", "symbol": self.symbol},
+            "action": "snapshot",
+            "data": [
+                {
+                    "ts": str(time.time()),
+                    "bids": bids,
+                    "asks": asks,
+                    "seqId": self._seq_id,
+                    "prevSeqId": -1,
+                    "checksum": self._book.checksum(),
+                }
+            ],
+        }
+
+    def update(self) -> Dict:
+        """Advances the book and returns the update message."""
+        view = self._book.view
+        bids: List[List[str]] = []
+        asks: List[List[str]] = []
+
+        if self._random.random() < 0.1:
+            if self._random.random() < 0.5:
+                # price up: the best ask is taken and a new bid level appears above the old best bid
+                bid_levels, ask_levels = view.bids(), view.asks()
+                asks.append([self._price(ask_levels[0][0]), "0"])
+                asks.append([self._price(ask_levels[-1][0] + self.tick), self._size()])
+                bids.append([self._price(bid_levels[0][0] + self.tick), self._size()])
+                bids.append([self._price(bid_levels[-1][0]), "0"])
+            else:
+                bid_levels, ask_levels = view.bids(), view.asks()
+                bids.append([self._price(bid_levels[0][0]), "0"])
+                bids.append([self._price(bid_levels[-1][0] - self.tick), self._size()])
+                asks.append([self._price(ask_levels[0][0] - self.tick), self._size()])
+                asks.append([self._price(ask_levels[-1][0]), "0"])
+        else:
+            for _ in range(self._random.randint(1, 3)):
+                side, levels = (bids, view.bids()) if self._random.random() < 0.5 else (asks, view.asks())
+                price = levels[self._random.randrange(len(levels))][0]
+                side.append([self._price(price), self._size()])
+
+        return self._apply("update", _dedupe(bids), _dedupe(asks))
+
+    def trade(self) -> Dict:
+        """A `trades` message of one or a few trades at the best bid or ask, the book is left as is."""
+        trades = []
+        for _ in range(self._random.randint(1, 3)):
+            self._trade_id += 1
+            price = self.best_ask if self._random.random() < 0.5 else self.best_bid
+            trades.append(
+                {"t": str(time.time()), "p": self._price(price), "s": self._size(), "x": "B3", "i": self._trade_id}
+            )
+        return {"arg": {"channel": "trades", "symbol": self.symbol}, "data": trades}
+
+
+def _dedupe(levels: List[List[str]]) -> List[List[str]]:
+    # the last change of a price wins, like the client applies them
+    return list({price: [price, size] for price, size in levels}.values())
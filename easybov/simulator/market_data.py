@@ -0,0 +1,183 @@
+import asyncio
+import json
+import logging
+import time
+from typing import Dict, List, Mapping, Optional, Set
+
+import websockets
+
+from easybov.simulator.auth import Authenticator
+from easybov.simulator.books import SyntheticBook
+
+log = logging.getLogger(__name__)
+
+
+class MarketDataServer:
+    """
+    A websocket server speaking the market data protocol of the SDK: `login`, `subscribe`/`unsubscribe`, then
+    `books` snapshots and updates, `trades` and `orders` updates.
+
+    Books are synthetic random walks shared by every connection and advanced at `rate` updates per second per
+    subscribed symbol; each update is encoded once and broadcast to its subscribers. Trades are printed at the
+    touch of those books every `trade_every` ticks. Order updates come from a TradingServer through `publish_order`.
+
+    Args:
+        host (str): The interface to listen on
+        port (int): The port, 0 for any free one
+        credentials (Optional[Mapping[str, str]]): api key -> secret key checked on login, None to accept any login
+        rate (float): Books updates per second for each subscribed symbol
+        trade_every (int): Ticks per trades message for each symbol subscribed to trades
+        levels (int): The number of levels per side of the books
+        prices (Optional[Mapping[str, float]]): Initial mid price per symbol, 30 for the others
+        disconnect_after (Optional[float]): Seconds after which every connection is closed by the server, to
+          exercise reconnects
+        seed (Optional[int]): Seeds the books, for reproducible traffic
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        credentials: Optional[Mapping[str, str]] = None,
+        rate: float = 10.0,
+        trade_every: int = 4,
+        levels: int = 10,
+        prices: Optional[Mapping[str, float]] = None,
+        disconnect_after: Optional[float] = None,
+        seed: Optional[int] = None,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.rate = rate
+        self.trade_every = trade_every
+        self.levels = levels
+        self.disconnect_after = disconnect_after
+        self._auth = Authenticator(credentials)
+        self._prices = dict(prices or {})
+        self._seed = seed
+
+        self.books: Dict[str, SyntheticBook] = {}
+        self._book_subscribers: Dict[str, Set] = {}
+        self._trade_subscribers: Dict[str, Set] = {}
+        self._order_subscribers: Set = set()
+        self._server = None
+        self._ticker: Optional[asyncio.Task] = None
+
+        self.connections = 0
+        self.messages_sent = 0
+
+    @property
+    def url(self) -> str:
+        return f"ws://{self.host}:{self.port}"
+
+    def book(self, symbol: str) -> SyntheticBook:
+        book = self.books.get(symbol)
+        if book is None:
+            seed = None if self._seed is None else self._seed + len(self.books)
+            book = self.books[symbol] = SyntheticBook(symbol, self._prices.get(symbol, 30.0), self.levels, seed=seed)
+        return book
+
+    async def start(self) -> None:
+        self._server = await websockets.serve(self._serve, self.host, self.port, max_size=None)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._ticker = asyncio.ensure_future(self._tick())
+        log.info(f"market data simulator listening on {self.url}")
+
+    async def stop(self) -> None:
+        if self._ticker is not None:
+            self._ticker.cancel()
+            await asyncio.gather(self._ticker, return_exceptions=True)
+            self._ticker = None
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    def publish_order(self, update: Dict) -> None:
+        """Sends an order update to every `orders` subscriber."""
+        if self._order_subscribers:
+            self._broadcast(self._order_subscribers, {"arg": {"channel": "orders", "symbol": "*"}, "data": [update]})
+
+    def _broadcast(self, connections, msg: Dict) -> None:
+        websockets.broadcast(connections, json.dumps(msg))
+        self.messages_sent += len(connections)
+
+    async def _tick(self) -> None:
+        # messages are owed in proportion to the elapsed time, so high rates do not depend on the sleep resolution
+        started = time.monotonic()
+        sent = 0
+        while True:
+            due = int((time.monotonic() - started) * self.rate)
+            for tick in range(sent + 1, due + 1):
+                for symbol, subscribers in self._book_subscribers.items():
+                    if subscribers:
+                        self._broadcast(subscribers, self.book(symbol).update())
+                if tick % self.trade_every == 0:
+                    for symbol, subscribers in self._trade_subscribers.items():
+                        if subscribers:
+                            self._broadcast(subscribers, self.book(symbol).trade())
+            sent = due
+            await asyncio.sleep(max(0.001, 1 / self.rate))
+
+    async def _serve(self, ws, *args) -> None:
+        self.connections += 1
+        closer = None
+        if self.disconnect_after is not None:
+            closer = asyncio.get_running_loop().call_later(
+                self.disconnect_after, lambda: asyncio.ensure_future(ws.close(1001, "simulated disconnect"))
+            )
+
+        try:
+            login = json.loads(await ws.recv())
+            args = (login.get("args") or [{}])[0]
+            error = self._auth.verify_login(args) if login.get("op") == "login" else "login first"
+            if error is not None:
+                await ws.send(json.dumps({"event": "login", "code": "60009", "msg": error}))
+                return
+            await ws.send(json.dumps({"event": "login", "code": "0", "msg": ""}))
+
+            async for frame in ws:
+                msg = json.loads(frame)
+                op = msg.get("op") or msg.get("action")
+                if op == "subscribe":
+                    self._subscribe(ws, msg.get("args") or [])
+                elif op == "unsubscribe":
+                    self._unsubscribe(ws, msg.get("args") or [])
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            if closer is not None:
+                closer.cancel()
+            self._order_subscribers.discard(ws)
+            for subscribers in self._book_subscribers.values():
+                subscribers.discard(ws)
+            for subscribers in self._trade_subscribers.values():
+                subscribers.discard(ws)
+
+    def _subscribe(self, ws, args: List[Dict]) -> None:
+        for arg in args:
+            channel, symbol = arg.get("channel"), arg.get("symbol")
+            if channel == "books" and symbol:
+                websockets.broadcast([ws], json.dumps({"event": "subscribe", "arg": arg}))
+                # the snapshot is written before any later update, broadcast does not yield
+                websockets.broadcast([ws], json.dumps(self.book(symbol).snapshot()))
+                self._book_subscribers.setdefault(symbol, set()).add(ws)
+            elif channel == "trades" and symbol:
+                websockets.broadcast([ws], json.dumps({"event": "subscribe", "arg": arg}))
+                self._trade_subscribers.setdefault(symbol, set()).add(ws)
+            elif channel == "orders":
+                websockets.broadcast([ws], json.dumps({"event": "subscribe", "arg": arg}))
+                self._order_subscribers.add(ws)
+            else:
+                websockets.broadcast(
+                    [ws], json.dumps({"event": "error", "code": "60018", "msg": f"unknown channel {channel}"})
+                )
+
+    def _unsubscribe(self, ws, args: List[Dict]) -> None:
+        for arg in args:
+            if arg.get("channel") == "orders":
+                self._order_subscribers.discard(ws)
+            elif arg.get("channel") == "trades":
+                self._trade_subscribers.get(arg.get("symbol"), set()).discard(ws)
+            else:
+                self._book_subscribers.get(arg.get("symbol"), set()).discard(ws)
@@ -0,0 +1,112 @@
+import asyncio
+import logging
+import threading
+from typing import Mapping, Optional
+
+from easybov.simulator.market_data import MarketDataServer
+from easybov.simulator.trading import TradingServer
+
+log = logging.getLogger(__name__)
+
+
+class Simulator:
+    """
+    Runs a MarketDataServer and a TradingServer on an event loop of their own, in a background thread, so tests,
+    benchmarks and examples can point the regular clients at them:
+
+        with Simulator(credentials={"key": "secret"}) as sim:
+            client = TradingClient("key", "secret", url_override=sim.rest_url)
+            stream = B3DataStream("key", "secret", url_override=sim.ws_url)
+
+    Args:
+        host (str): The interface both servers listen on
+        ws_port (int): The websocket port, 0 for any free one
+        rest_port (int): The HTTP port, 0 for any free one
+        credentials (Optional[Mapping[str, str]]): api key -> secret key, None to accept any request
+        rate, levels, prices, disconnect_after, seed: As for MarketDataServer
+        rate_limit, reject_rate, latency: As for TradingServer
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        ws_port: int = 0,
+        rest_port: int = 0,
+        credentials: Optional[Mapping[str, str]] = None,
+        rate: float = 10.0,
+        levels: int = 10,
+        prices: Optional[Mapping[str, float]] = None,
+        disconnect_after: Optional[float] = None,
+        seed: Optional[int] = None,
+        rate_limit: Optional[float] = None,
+        reject_rate: float = 0.0,
+        latency: float = 0.0,
+    ) -> None:
+        self.market_data = MarketDataServer(
+            host=host,
+            port=ws_port,
+            credentials=credentials,
+            rate=rate,
+            levels=levels,
+            prices=prices,
+            disconnect_after=disconnect_after,
+            seed=seed,
+        )
+        self.trading = TradingServer(
+            host=host,
+            port=rest_port,
+            credentials=credentials,
+            market_data=self.market_data,
+            rate_limit=rate_limit,
+            reject_rate=reject_rate,
+            latency=latency,
+        )
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def ws_url(self) -> str:
+        return self.market_data.url
+
+    @property
+    def rest_url(self) -> str:
+        return self.trading.url
+
+    async def serve(self) -> None:
+        """Starts both servers on the running loop, for callers already inside asyncio."""
+        await self.market_data.start()
+        await self.trading.start()
+
+    async def shutdown(self) -> None:
+        await self.trading.stop()
+        await self.market_data.stop()
+
+    def start(self) -> "Simulator":
+        """Starts both servers in a background thread and returns once they accept connections."""
+        if self._thread is not None:
+            return self
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="easybov-simulator", daemon=True)
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self.serve(), self._loop).result()
+        return self
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+
+        try:
+            asyncio.run_coroutine_threadsafe(self.shutdown(), self._loop).result()
+        finally:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop.close()
+            self._loop = None
+            self._thread = None
+
+    def __enter__(self) -> "Simulator":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
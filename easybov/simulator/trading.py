@@ -0,0 +1,231 @@
+import asyncio
+import itertools
+import json
+import logging
+import random
+import time
+from typing import Dict, Mapping, Optional
+
+from aiohttp import web
+
+from easybov.common.ratelimit import TokenBucket
+from easybov.simulator.auth import Authenticator
+from easybov.simulator.market_data import MarketDataServer
+from easybov.trading.enums import OrderSide, OrderStatus, OrderType, TimeInForce
+
+log = logging.getLogger(__name__)
+
+_LIVE_STATUSES = (OrderStatus.NEW.value, OrderStatus.PARTIALLY_FILLED.value)
+
+
+class TradingServer:
+    """
+    An HTTP server implementing `/api/v1/trade/order` (POST and GET) and `/api/v1/trade/cancel-order` with the
+    SDK's signature scheme.
+
+    Market orders fill at once at the simulated top of book, limit orders fill when they cross it and otherwise rest
+    until cancelled. Every state change is pushed as an `orders` update through the linked MarketDataServer.
+
+    Args:
+        host (str): The interface to listen on
+        port (int): The port, 0 for any free one
+        credentials (Optional[Mapping[str, str]]): api key -> secret key, None to accept unsigned requests
+        market_data (Optional[MarketDataServer]): Provides fill prices and receives the order updates
+        rate_limit (Optional[float]): Requests per second allowed before answering 429 with a Retry-After
+        reject_rate (float): Fraction, between 0 and 1, of requests answered with a 429 at random
+        latency (float): Seconds added to every response
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        credentials: Optional[Mapping[str, str]] = None,
+        market_data: Optional[MarketDataServer] = None,
+        rate_limit: Optional[float] = None,
+        reject_rate: float = 0.0,
+        latency: float = 0.0,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.market_data = market_data
+        self.reject_rate = reject_rate
+        self.latency = latency
+        self._auth = Authenticator(credentials)
+        self._bucket = TokenBucket(rate_limit) if rate_limit else None
+        self._order_ids = itertools.count(1)
+        self._runner: Optional[web.AppRunner] = None
+
+        self.orders: Dict[str, Dict] = {}
+        self.requests = 0
+        self.rejected = 0
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def _application(self) -> web.Application:
+        app = web.Application(middlewares=[self._middleware])
+        app.router.add_post("/api/v1/trade/order", self._submit_order)
+        app.router.add_get("/api/v1/trade/order", self._get_order)
+        app.router.add_post("/api/v1/trade/cancel-order", self._cancel_order)
+        return app
+
+    async def start(self) -> None:
+        self._runner = web.AppRunner(self._application(), access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+        log.info(f"trading simulator listening on {self.url}")
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    @web.middleware
+    async def _middleware(self, request: web.Request, handler) -> web.Response:
+        self.requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        if self._bucket is not None:
+            available = self._bucket.available()
+            if available < 1:
+                return self._too_many_requests((1 - available) / self._bucket.rate)
+            self._bucket.reserve()
+        if self.reject_rate and random.random() < self.reject_rate:
+            return self._too_many_requests(0.05)
+
+        body = await request.read()
+        error = self._auth.verify(
+            request.headers.get("EB-ACCESS-KEY"),
+            request.headers.get("EB-ACCESS-TIMESTAMP"),
+            request.headers.get("EB-ACCESS-SIGN"),
+            request.method,
+            request.path,
+            request.rel_url.raw_query_string,
+            body,
+        )
+        if error is not None:
+            return _error(401, "50113", error)
+
+        return await handler(request)
+
+    def _too_many_requests(self, retry_after: float) -> web.Response:
+        self.rejected += 1
+        response = _error(429, "50011", "too many requests")
+        response.headers["Retry-After"] = f"{retry_after:.3f}"
+        return response
+
+    def _fill_price(self, order: Dict) -> Optional[float]:
+        """The price the order executes at right now, None if it does not cross."""
+        if self.market_data is None:
+            return float(order["price"]) if order.get("price") else None
+
+        book = self.market_data.book(order["symbol"])
+        best = book.best_ask if order["side"] == OrderSide.BUY.value else book.best_bid
+        if order["ord_type"] == OrderType.MARKET.value:
+            return best
+        limit = float(order["price"])
+        crosses = limit >= best if order["side"] == OrderSide.BUY.value else limit <= best
+        return best if crosses else None
+
+    def _publish(self, order: Dict, last_px: float = 0.0, last_qty: float = 0.0) -> None:
+        if self.market_data is None:
+            return
+        self.market_data.publish_order(
+            {
+                "symbol": order["symbol"],
+                "cl_ord_id": order["cl_ord_id"],
+                "orig_cl_ord_id": order.get("orig_cl_ord_id"),
+                "side": order["side"],
+                "price": order.get("price") or last_px,
+                "last_px": last_px,
+                "last_qty": last_qty,
+                "cum_qty": order["cum_qty"],
+                "order_qty": order["order_qty"],
+                "ord_type": order["ord_type"],
+                "ord_status": order["ord_status"],
+                "transact_time": time.strftime("%Y%m%d-%H:%M:%S", time.gmtime()),
+            }
+        )
+
+    async def _submit_order(self, request: web.Request) -> web.Response:
+        body = json.loads(await request.read())
+        missing = [field for field in ("symbol", "cl_ord_id", "order_qty", "side") if not body.get(field)]
+        if missing:
+            return _error(400, "51000", f"missing {', '.join(missing)}")
+        if body["cl_ord_id"] in self.orders:
+            return _error(400, "51016", "duplicated cl_ord_id")
+
+        order = {
+            "type": "order",
+            "cl_ord_id": body["cl_ord_id"],
+            "orig_cl_ord_id": None,
+            "order_id": str(next(self._order_ids)),
+            "symbol": body["symbol"],
+            "side": body["side"],
+            "ord_type": body.get("ord_type") or OrderType.MARKET.value,
+            "tif": body.get("tif") or TimeInForce.DAY.value,
+            "order_qty": str(body["order_qty"]),
+            "price": str(body["price"]) if body.get("price") is not None else None,
+            "ord_status": OrderStatus.NEW.value,
+            "cum_qty": "0",
+            "avg_px": None,
+        }
+        self.orders[order["cl_ord_id"]] = order
+        self._publish(order)
+
+        price = self._fill_price(order)
+        if price is not None:
+            order["ord_status"] = OrderStatus.FILLED.value
+            order["cum_qty"] = order["order_qty"]
+            order["avg_px"] = str(price)
+            self._publish(order, price, float(order["order_qty"]))
+
+        return _ok(order)
+
+    async def _cancel_order(self, request: web.Request) -> web.Response:
+        body = json.loads(await request.read())
+        order = self.orders.get(body.get("orig_cl_ord_id", ""))
+        if order is None:
+            return _error(400, "51400", "order does not exist")
+        if order["ord_status"] not in _LIVE_STATUSES:
+            return _error(400, "51401", "order is not live")
+
+        order["ord_status"] = OrderStatus.CANCELED.value
+        if body.get("cl_ord_id"):
+            order["orig_cl_ord_id"] = order["cl_ord_id"]
+            order["cl_ord_id"] = body["cl_ord_id"]
+            self.orders[body["cl_ord_id"]] = order
+        self._publish(order)
+        return _ok(order)
+
+    async def _get_order(self, request: web.Request) -> web.Response:
+        order = self.orders.get(request.query.get("cl_ord_id", ""))
+        if order is None:
+            return _error(404, "51603", "order does not exist")
+        return web.json_response(order)
+
+
+def _ok(order: Dict) -> web.Response:
+    return web.json_response(
+        {
+            "code": "0",
+            "data": [
+                {
+                    "cl_ord_id": order["cl_ord_id"],
+                    "orig_cl_ord_id": order.get("orig_cl_ord_id"),
+                    "order_id": order["order_id"],
+                    "s_code": "0",
+                    "s_msg": "",
+                }
+            ],
+        }
+    )
+
+
+def _error(status: int, code: str, msg: str) -> web.Response:
+    return web.json_response({"code": code, "msg": msg}, status=status)
@@ -2,3 +2,4 @@ from easybov.trading.client import *
 from easybov.trading.models import *
 from easybov.trading.enums import *
 from easybov.trading.requests import *
+from easybov.trading.order_state import *
@@ -1,20 +1,46 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from easybov.common import RawData
-from easybov.common.rest import RESTClient
-from typing import Optional,  Union
+from easybov.common.codec import JSONCodec
+from easybov.common.constants import DEFAULT_BATCH_MAX_WORKERS
+from easybov.common.exceptions import APIError
+from easybov.common.instrumentation import Observer
+from easybov.common.ratelimit import RateLimiter
+from easybov.common.rest import RESTClient, AsyncRESTClient
+from easybov.common.retry import RetryPolicy
+from easybov.common.types import Timeout
+from typing import List, Optional, Sequence, Union
 from easybov.common.enums import BaseURL
 
 from easybov.trading.requests import (
     OrderRequest,
     GetOrdersRequest
-    
+
 )
 
 from easybov.trading.models import (
     OrderResponse,
-    OrderEntry
+    OrderEntry,
+    OrderBatchResult,
 )
 
 
+def _batch_result(
+    order_data: OrderRequest,
+    response: Optional[Union[OrderResponse, RawData]] = None,
+    error: Optional[BaseException] = None,
+) -> OrderBatchResult:
+    if error is None:
+        return OrderBatchResult(cl_ord_id=order_data.cl_ord_id, response=response)
+
+    return OrderBatchResult(
+        cl_ord_id=order_data.cl_ord_id,
+        error=str(error) or type(error).__name__,
+        status_code=error.status_code if isinstance(error, APIError) else None,
+    )
+
+
 class TradingClient(RESTClient):
     def __init__(
         self,
@@ -22,7 +48,15 @@ class TradingClient(RESTClient):
         secret_key: Optional[str] = None,
         raw_data: bool = False,
         url_override: Optional[str] = None,
-    ) -> None:        
+        rate_limiter: Optional[RateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        timeout: Optional[Timeout] = None,
+        deadline: Optional[float] = None,
+        observer: Optional[Observer] = None,
+        codec: Optional[Union[JSONCodec, str]] = None,
+        pool_size: Optional[int] = None,
+        batch_max_workers: Optional[int] = None,
+    ) -> None:
         super().__init__(
             api_key=api_key,
             secret_key=secret_key,
@@ -31,33 +65,275 @@ class TradingClient(RESTClient):
             if url_override
             else BaseURL.TRADING_LIVE,
             raw_data=raw_data,
+            rate_limiter=rate_limiter,
+            retry_policy=retry_policy,
+            timeout=timeout,
+            deadline=deadline,
+            observer=observer,
+            codec=codec,
+            pool_size=pool_size,
+        )
+        self._batch_max_workers: int = (
+            batch_max_workers if batch_max_workers and batch_max_workers > 0 else DEFAULT_BATCH_MAX_WORKERS
         )
+        self._batch_executor: Optional[ThreadPoolExecutor] = None
+
+    def __enter__(self) -> "TradingClient":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Shuts down the batch thread pool and closes the HTTP session and its connection pool."""
+        if self._batch_executor is not None:
+            self._batch_executor.shutdown()
+            self._batch_executor = None
+        self._session.close()
+
+    def submit_order(
+        self,
+        order_data: OrderRequest,
+        timeout: Optional[Timeout] = None,
+        deadline: Optional[float] = None,
+    ) -> Union[OrderResponse, RawData]:
+        data = order_data.to_request_body()
+        response = self.post("/trade/order", data, timeout=timeout, deadline=deadline)
+
+        return self._parse_model(OrderResponse, response, "POST /trade/order")
 
-    def submit_order(self, order_data: OrderRequest) -> Union[OrderResponse, RawData]:        
-        data = order_data.to_request_fields()
-        response = self.post("/trade/order", data)
+    def cancel_order(
+        self,
+        order_data: OrderRequest,
+        timeout: Optional[Timeout] = None,
+        deadline: Optional[float] = None,
+    ) -> Union[OrderResponse, RawData]:
+        data = order_data.to_request_body()
+        # cancelling twice has no further effect, so a cancel is safe to retry
+        response = self.post("/trade/cancel-order", data, idempotent=True, timeout=timeout, deadline=deadline)
 
-        if self._use_raw_data:
-            return response
+        return self._parse_model(OrderResponse, response, "POST /trade/cancel-order")
+
+    def submit_orders(
+        self,
+        orders: Sequence[OrderRequest],
+        timeout: Optional[Timeout] = None,
+        deadline: Optional[float] = None,
+    ) -> List[OrderBatchResult]:
+        """
+        Submits several orders concurrently over the client's thread pool.
 
-        return OrderResponse(**response)
-    
-    def cancel_order(self, order_data: OrderRequest) -> Union[OrderResponse, RawData]:        
-        data = order_data.to_request_fields()
-        response = self.post("/trade/cancel-order", data)
+        A failing order does not abort the batch, its error is reported in the matching result instead.
+
+        Args:
+            orders (Sequence[OrderRequest]): The orders to submit
+            timeout (Optional[Timeout]): Per attempt timeout applied to every order
+            deadline (Optional[float]): Deadline in seconds applied to every order
+
+        Returns:
+            List[OrderBatchResult]: One result per order, in the same order as `orders`
+        """
+        return self._run_batch(partial(self.submit_order, timeout=timeout, deadline=deadline), orders)
+
+    def cancel_orders(
+        self,
+        orders: Sequence[OrderRequest],
+        timeout: Optional[Timeout] = None,
+        deadline: Optional[float] = None,
+    ) -> List[OrderBatchResult]:
+        """
+        Cancels several orders concurrently over the client's thread pool.
 
-        if self._use_raw_data:
-            return response
+        A failing cancel does not abort the batch, its error is reported in the matching result instead.
 
-        return OrderResponse(**response)    
+        Args:
+            orders (Sequence[OrderRequest]): The cancel requests to send
+            timeout (Optional[Timeout]): Per attempt timeout applied to every request
+            deadline (Optional[float]): Deadline in seconds applied to every request
+
+        Returns:
+            List[OrderBatchResult]: One result per request, in the same order as `orders`
+        """
+        return self._run_batch(partial(self.cancel_order, timeout=timeout, deadline=deadline), orders)
+
+    def _run_batch(self, send, orders: Sequence[OrderRequest]) -> List[OrderBatchResult]:
+        if self._batch_executor is None:
+            self._batch_executor = ThreadPoolExecutor(
+                max_workers=self._batch_max_workers, thread_name_prefix="easybov-batch"
+            )
+
+        futures = [self._batch_executor.submit(send, order_data) for order_data in orders]
+
+        results = []
+        for order_data, future in zip(orders, futures):
+            try:
+                results.append(_batch_result(order_data, response=future.result()))
+            except Exception as e:
+                results.append(_batch_result(order_data, error=e))
+
+        return results
+
+    def get_order(
+        self,
+        orderRequest: GetOrdersRequest,
+        timeout: Optional[Timeout] = None,
+        deadline: Optional[float] = None,
+    ) -> Union[OrderEntry, RawData]:
 
-    def get_order( self, orderRequest: GetOrdersRequest) -> Union[OrderEntry, RawData]:
-     
         params = orderRequest.to_request_fields()
 
-        response = self.get(f"/trade/order", params)
+        response = self.get("/trade/order", params, timeout=timeout, deadline=deadline)
+
+        return self._parse_model(OrderEntry, response, "GET /trade/order")
+
+
+class AsyncTradingClient(AsyncRESTClient):
+    """
+    asyncio counterpart of `TradingClient`. Every method is awaitable and shares the event loop with the data
+    streams, so order entry never stalls book processing.
+
+    Args:
+        rate_limiter (Optional[RateLimiter]): Paces requests per endpoint before they are sent,
+          see `RateLimiter.for_trading`.
+        retry_policy (Optional[RetryPolicy]): Backoff, deadline and idempotency rules for retries.
+        timeout (Optional[Timeout]): Default per attempt timeout, in seconds or as a (connect, read) pair.
+        deadline (Optional[float]): Default number of seconds a request may take, retries included, before
+          RequestTimeoutError is raised.
+        observer (Optional[Observer]): Receives signing, network, decode and model latencies per endpoint,
+          eg. a HistogramCollector.
+        codec (Optional[Union[JSONCodec, str]]): JSON library used for payloads and responses, "orjson", "ujson"
+          or "json". Defaults to the fastest one installed.
+        pool_size (Optional[int]): Maximum number of pooled keep-alive connections.
+        keepalive_timeout (Optional[float]): Seconds an idle pooled connection is kept open.
+        max_in_flight (Optional[int]): Maximum number of requests on the wire at once.
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        secret_key: Optional[str] = None,
+        raw_data: bool = False,
+        url_override: Optional[str] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        timeout: Optional[Timeout] = None,
+        deadline: Optional[float] = None,
+        observer: Optional[Observer] = None,
+        codec: Optional[Union[JSONCodec, str]] = None,
+        pool_size: Optional[int] = None,
+        keepalive_timeout: Optional[float] = None,
+        max_in_flight: Optional[int] = None,
+    ) -> None:
+        super().__init__(
+            api_key=api_key,
+            secret_key=secret_key,
+            api_version="v1",
+            base_url=url_override
+            if url_override
+            else BaseURL.TRADING_LIVE,
+            raw_data=raw_data,
+            rate_limiter=rate_limiter,
+            retry_policy=retry_policy,
+            timeout=timeout,
+            deadline=deadline,
+            observer=observer,
+            codec=codec,
+            pool_size=pool_size,
+            keepalive_timeout=keepalive_timeout,
+            max_in_flight=max_in_flight,
+        )
+
+    async def submit_order(
+        self,
+        order_data: OrderRequest,
+        timeout: Optional[Timeout] = None,
+        deadline: Optional[float] = None,
+    ) -> Union[OrderResponse, RawData]:
+        data = order_data.to_request_body()
+        response = await self.post("/trade/order", data, timeout=timeout, deadline=deadline)
+
+        return self._parse_model(OrderResponse, response, "POST /trade/order")
+
+    async def cancel_order(
+        self,
+        order_data: OrderRequest,
+        timeout: Optional[Timeout] = None,
+        deadline: Optional[float] = None,
+    ) -> Union[OrderResponse, RawData]:
+        data = order_data.to_request_body()
+        # cancelling twice has no further effect, so a cancel is safe to retry
+        response = await self.post("/trade/cancel-order", data, idempotent=True, timeout=timeout, deadline=deadline)
+
+        return self._parse_model(OrderResponse, response, "POST /trade/cancel-order")
+
+    async def submit_orders(
+        self,
+        orders: Sequence[OrderRequest],
+        timeout: Optional[Timeout] = None,
+        deadline: Optional[float] = None,
+    ) -> List[OrderBatchResult]:
+        """
+        Submits several orders concurrently, bounded by the client's `max_in_flight`.
+
+        A failing order does not abort the batch, its error is reported in the matching result instead.
+
+        Args:
+            orders (Sequence[OrderRequest]): The orders to submit
+            timeout (Optional[Timeout]): Per attempt timeout applied to every order
+            deadline (Optional[float]): Deadline in seconds applied to every order
+
+        Returns:
+            List[OrderBatchResult]: One result per order, in the same order as `orders`
+        """
+        return await self._run_batch(partial(self.submit_order, timeout=timeout, deadline=deadline), orders)
+
+    async def cancel_orders(
+        self,
+        orders: Sequence[OrderRequest],
+        timeout: Optional[Timeout] = None,
+        deadline: Optional[float] = None,
+    ) -> List[OrderBatchResult]:
+        """
+        Cancels several orders concurrently, bounded by the client's `max_in_flight`.
+
+        A failing cancel does not abort the batch, its error is reported in the matching result instead.
+
+        Args:
+            orders (Sequence[OrderRequest]): The cancel requests to send
+            timeout (Optional[Timeout]): Per attempt timeout applied to every request
+            deadline (Optional[float]): Deadline in seconds applied to every request
+
+        Returns:
+            List[OrderBatchResult]: One result per request, in the same order as `orders`
+        """
+        return await self._run_batch(partial(self.cancel_order, timeout=timeout, deadline=deadline), orders)
+
+    async def _run_batch(self, send, orders: Sequence[OrderRequest]) -> List[OrderBatchResult]:
+        responses = await asyncio.gather(
+            *(send(order_data) for order_data in orders), return_exceptions=True
+        )
+
+        results = []
+        for order_data, response in zip(orders, responses):
+            if isinstance(response, Exception):
+                results.append(_batch_result(order_data, error=response))
+            elif isinstance(response, BaseException):
+                # cancellation and interpreter exit must still propagate
+                raise response
+            else:
+                results.append(_batch_result(order_data, response=response))
+
+        return results
+
+    async def get_order(
+        self,
+        orderRequest: GetOrdersRequest,
+        timeout: Optional[Timeout] = None,
+        deadline: Optional[float] = None,
+    ) -> Union[OrderEntry, RawData]:
+
+        params = orderRequest.to_request_fields()
 
-        if self._use_raw_data:
-            return response
+        response = await self.get("/trade/order", params, timeout=timeout, deadline=deadline)
 
-        return OrderEntry(**response)
\ No newline at end of file
+        return self._parse_model(OrderEntry, response, "GET /trade/order")
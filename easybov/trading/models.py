@@ -2,6 +2,7 @@ from easybov.common.models import ModelWithCode, ValidateBaseModel as BaseModel
 from uuid import UUID
 from datetime import datetime
 from typing import Optional, List, Union
+from easybov.common.types import RawData
 from easybov.trading.enums import (
     OrderStatus,
     OrderType,
@@ -22,6 +23,24 @@ class OrderResponseEntry(BaseModel):
 class OrderResponse(ModelWithCode):    
     data: List[OrderResponseEntry]
 
+
+class OrderBatchResult(BaseModel):
+    """
+    Outcome of one order inside a batch submission or cancellation.
+
+    Exactly one of `response` and `error` is set. `response` holds the OrderResponse (or the raw dict when the
+    client uses raw_data), `error` holds the error text when the request failed.
+    """
+
+    cl_ord_id: str
+    response: Optional[Union[RawData, OrderResponse]] = None
+    error: Optional[str] = None
+    status_code: Optional[int] = None
+
+    @property
+    def succeeded(self) -> bool:
+        return self.error is None
+
   
 class OrderEntry(BaseModel):
     type: str
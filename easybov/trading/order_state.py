@@ -0,0 +1,397 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Mapping, Optional, Set, Union
+
+from easybov.common import RawData
+from easybov.common.exceptions import APIError
+from easybov.trading.client import AsyncTradingClient, TradingClient
+from easybov.trading.enums import OrderSide, OrderStatus
+from easybov.trading.models import OrderEntry
+from easybov.trading.requests import GetOrdersRequest, OrderRequest
+
+if TYPE_CHECKING:
+    # the streams import the trading enums, importing them here at runtime would be circular
+    from easybov.common.websocket import BaseStream
+
+log = logging.getLogger(__name__)
+
+# statuses after which an order no longer changes. REPLACED is not one: the order lives on under the new cl_ord_id
+DONE_STATUSES = frozenset(
+    {
+        OrderStatus.FILLED,
+        OrderStatus.DONE_FOR_DAY,
+        OrderStatus.CANCELED,
+        OrderStatus.STOPPED,
+        OrderStatus.REJECTED,
+        OrderStatus.EXPIRED,
+    }
+)
+
+# what the exchange answers a cancel or replace request it has not accepted yet, or will not accept
+_REQUEST_PENDING_STATUSES = frozenset({OrderStatus.PENDING_CANCEL, OrderStatus.PENDING_REPLACE})
+
+# quantities are compared with this tolerance, they travel as decimal strings
+_QTY_EPSILON = 1e-9
+
+
+class OrderState:
+    """
+    The known state of one order, kept up to date by an OrderStateCache.
+
+    A cancel or replace request gets a cl_ord_id of its own while the order stays the same: `cl_ord_id` is the
+    latest one the exchange accepted and `cl_ord_ids` the whole accepted chain, oldest first. Requests sent but not
+    accepted yet are in `pending_cl_ord_ids`, those the exchange rejected in `rejected_cl_ord_ids`. Every one of
+    them finds the order in the cache.
+    """
+
+    __slots__ = (
+        "cl_ord_id",
+        "cl_ord_ids",
+        "pending_cl_ord_ids",
+        "rejected_cl_ord_ids",
+        "order_id",
+        "symbol",
+        "side",
+        "ord_type",
+        "price",
+        "order_qty",
+        "cum_qty",
+        "avg_px",
+        "last_px",
+        "last_qty",
+        "ord_status",
+        "transact_time",
+        "updated_at",
+    )
+
+    def __init__(
+        self,
+        cl_ord_id: str,
+        symbol: str,
+        side: Optional[OrderSide] = None,
+        ord_type: Optional[str] = None,
+        price: Optional[float] = None,
+        order_qty: float = 0.0,
+        ord_status: OrderStatus = OrderStatus.PENDING_NEW,
+    ) -> None:
+        self.cl_ord_id = cl_ord_id
+        self.cl_ord_ids: List[str] = [cl_ord_id]
+        self.pending_cl_ord_ids: List[str] = []
+        self.rejected_cl_ord_ids: List[str] = []
+        self.order_id: Optional[str] = None
+        self.symbol = symbol
+        self.side = side
+        self.ord_type = ord_type
+        self.price = price
+        self.order_qty = order_qty
+        self.cum_qty = 0.0
+        self.avg_px: Optional[float] = None
+        self.last_px: Optional[float] = None
+        self.last_qty: Optional[float] = None
+        self.ord_status = ord_status
+        self.transact_time: Optional[str] = None
+        self.updated_at = time.time()
+
+    @property
+    def orig_cl_ord_id(self) -> Optional[str]:
+        """The cl_ord_id the latest request replaced, None for an order never cancelled or replaced."""
+        return self.cl_ord_ids[-2] if len(self.cl_ord_ids) > 1 else None
+
+    @property
+    def leaves_qty(self) -> float:
+        return 0.0 if self.is_done else max(self.order_qty - self.cum_qty, 0.0)
+
+    @property
+    def is_done(self) -> bool:
+        return self.ord_status in DONE_STATUSES
+
+    def __repr__(self) -> str:
+        return "OrderState({})".format(", ".join(f"{k}={getattr(self, k)!r}" for k in self.__slots__))
+
+
+class OrderStateCache:
+    """
+    Tracks orders from the `orders` stream so their status is a dictionary lookup instead of a REST round trip.
+
+    Orders are indexed by every cl_ord_id of their cancel/replace chain and, while live, by symbol. REST is only
+    queried to reconcile: for an order whose updates show a missed fill (its `cum_qty` grew by more than the
+    `last_qty` of the update), and for every live order after the stream reconnects.
+
+        cache = OrderStateCache(client)
+        cache.attach(stream)
+        ...
+        client.submit_order(order)
+        cache.track(order)
+        cache.get(order.cl_ord_id).ord_status
+
+    Args:
+        client (Optional[Union[TradingClient, AsyncTradingClient]]): Used to reconcile, None to never query REST.
+          A blocking client is called from a thread of the event loop's default executor.
+        max_done (int): How many finished orders are kept for lookups before the oldest are forgotten
+    """
+
+    def __init__(
+        self,
+        client: Optional[Union[TradingClient, AsyncTradingClient]] = None,
+        max_done: int = 10000,
+    ) -> None:
+        self._client = client
+        self._max_done = max_done
+
+        self._orders: Dict[str, OrderState] = {}
+        self._live: Dict[str, Dict[str, OrderState]] = {}
+        # finished orders by their first cl_ord_id, oldest first
+        self._done: "OrderedDict[str, OrderState]" = OrderedDict()
+        self._reconciling: Set[str] = set()
+
+        self.updates = 0
+        self.stale_updates = 0
+        self.gaps = 0
+        self.rejected_requests = 0
+        self.reconciliations = 0
+        self.reconcile_errors = 0
+
+    def attach(self, stream: "BaseStream", handler: Optional[Callable] = None) -> None:
+        """
+        Subscribes to the orders of `stream` and reconciles the live orders whenever it reconnects.
+
+        Args:
+            stream (BaseStream): The stream delivering the order updates
+            handler (Optional[Callable]): A coroutine function also called with every update, once the cache has
+              applied it, since the stream has a single orders handler
+        """
+        if handler is None:
+            stream.subscribe_orders(self.handler)
+        else:
+            stream._ensure_coroutine(handler)
+
+            async def forward(update) -> None:
+                self.apply(update)
+                await handler(update)
+
+            stream.subscribe_orders(forward)
+        stream.add_reconnect_handler(self.reconcile)
+
+    def get(self, cl_ord_id: str) -> Optional[OrderState]:
+        """The order that `cl_ord_id`, or any request of its cancel/replace chain, belongs to."""
+        return self._orders.get(cl_ord_id)
+
+    def live_orders(self, symbol: Optional[str] = None) -> List[OrderState]:
+        """The orders not done yet, of `symbol` or of every symbol."""
+        if symbol is not None:
+            return list(self._live.get(symbol, {}).values())
+        return [state for orders in self._live.values() for state in orders.values()]
+
+    def track(self, order: OrderRequest) -> OrderState:
+        """
+        Registers an order just submitted so lookups find it, as PENDING_NEW, before its first update arrives. A
+        cancel or replace request is pending on the order it refers to until the exchange accepts it.
+        """
+        orig = getattr(order, "orig_cl_ord_id", None)
+        state = self._orders.get(orig) if orig else None
+        if state is not None:
+            self._add_pending(state, order.cl_ord_id)
+            return state
+
+        state = self._orders.get(order.cl_ord_id)
+        if state is None:
+            state = OrderState(
+                order.cl_ord_id,
+                order.symbol,
+                side=OrderSide(order.side),
+                ord_type=getattr(order.ord_type, "value", order.ord_type),
+                price=_float(getattr(order, "price", None)),
+                order_qty=_float(order.order_qty) or 0.0,
+            )
+            self._orders[state.cl_ord_id] = state
+            self._live.setdefault(state.symbol, {})[state.cl_ord_ids[0]] = state
+        return state
+
+    async def handler(self, update: Union[Any, RawData]) -> None:
+        """The orders handler: accepts OrderUpdate models, their lazy counterparts or raw messages."""
+        self.apply(update)
+
+    def apply(self, update: Union[Any, RawData]) -> Optional[OrderState]:
+        """Applies one order update and returns the order, None when the update is older than what is known."""
+        fields = _update_fields(update)
+        self.updates += 1
+
+        cl_ord_id = fields["cl_ord_id"]
+        orig = fields.get("orig_cl_ord_id")
+        status = OrderStatus(fields["ord_status"])
+        state = self._orders.get(cl_ord_id)
+        if state is None and orig:
+            state = self._orders.get(orig)
+            if state is not None:
+                self._add_pending(state, cl_ord_id)
+        if state is not None and cl_ord_id in state.pending_cl_ord_ids:
+            # the answer to a cancel or replace request: until the exchange accepts it, the order is left as is
+            if status == OrderStatus.REJECTED:
+                state.pending_cl_ord_ids.remove(cl_ord_id)
+                state.rejected_cl_ord_ids.append(cl_ord_id)
+                self.rejected_requests += 1
+                log.info(f"request {cl_ord_id} on order {state.cl_ord_id} was rejected")
+                return state
+            if status in _REQUEST_PENDING_STATUSES:
+                return state
+            self._accept(state, cl_ord_id)
+        if state is None:
+            state = OrderState(cl_ord_id, fields["symbol"])
+            if orig:
+                state.cl_ord_ids.insert(0, orig)
+                self._orders[orig] = state
+            self._orders[cl_ord_id] = state
+            self._live.setdefault(state.symbol, {})[state.cl_ord_ids[0]] = state
+
+        cum_qty = _float(fields.get("cum_qty")) or 0.0
+        last_qty = _float(fields.get("last_qty")) or 0.0
+        if status == OrderStatus.REPLACED:
+            status = OrderStatus.PARTIALLY_FILLED if cum_qty > _QTY_EPSILON else OrderStatus.NEW
+        if cum_qty < state.cum_qty - _QTY_EPSILON or (state.is_done and status not in DONE_STATUSES):
+            # delivered out of order, or behind what a reconciliation already fetched
+            self.stale_updates += 1
+            return None
+
+        if cum_qty > state.cum_qty + last_qty + _QTY_EPSILON:
+            # a fill happened that no update reported
+            self.gaps += 1
+            self._schedule_reconcile(state)
+
+        if last_qty > 0 and cum_qty > 0:
+            last_px = _float(fields.get("last_px")) or 0.0
+            previous = (state.avg_px or 0.0) * (cum_qty - last_qty)
+            state.avg_px = (previous + last_px * last_qty) / cum_qty
+
+        state.side = OrderSide(fields["side"]) if fields.get("side") is not None else state.side
+        state.ord_type = fields.get("ord_type") or state.ord_type
+        state.price = _float(fields.get("price")) or state.price
+        state.order_qty = _float(fields.get("order_qty")) or state.order_qty
+        state.cum_qty = cum_qty
+        state.last_px = _float(fields.get("last_px"))
+        state.last_qty = last_qty
+        state.transact_time = fields.get("transact_time")
+        self._set_status(state, status)
+        return state
+
+    async def reconcile(self, cl_ord_ids: Optional[List[str]] = None) -> None:
+        """
+        Fetches the orders from REST and applies whatever the stream missed.
+
+        Args:
+            cl_ord_ids (Optional[List[str]]): The orders to fetch, every live order by default
+        """
+        if self._client is None:
+            return
+
+        if cl_ord_ids is None:
+            states = self.live_orders()
+        else:
+            states = [self._orders[cl_ord_id] for cl_ord_id in cl_ord_ids if cl_ord_id in self._orders]
+        await asyncio.gather(*(self._reconcile_one(state) for state in states))
+
+    async def _reconcile_one(self, state: OrderState) -> None:
+        key = state.cl_ord_ids[0]
+        if key in self._reconciling:
+            return
+        self._reconciling.add(key)
+        try:
+            # the latest cl_ord_id the exchange accepted, a pending request may never be known to it
+            request = GetOrdersRequest(cl_ord_id=state.cl_ord_id)
+            if isinstance(self._client, AsyncTradingClient):
+                entry = await self._client.get_order(request)
+            else:
+                entry = await asyncio.get_running_loop().run_in_executor(None, self._client.get_order, request)
+            self.reconciliations += 1
+            self._apply_entry(state, entry if isinstance(entry, OrderEntry) else OrderEntry(**entry))
+        except APIError as e:
+            self.reconcile_errors += 1
+            log.warning(f"could not reconcile order {state.cl_ord_id}: {e}")
+        except Exception:
+            self.reconcile_errors += 1
+            log.exception(f"could not reconcile order {state.cl_ord_id}")
+        finally:
+            self._reconciling.discard(key)
+
+    def _schedule_reconcile(self, state: OrderState) -> None:
+        if self._client is not None:
+            asyncio.ensure_future(self._reconcile_one(state))
+
+    def _apply_entry(self, state: OrderState, entry: OrderEntry) -> None:
+        cum_qty = _float(entry.cum_qty) or 0.0
+        # the stream may have moved on while the request was in flight
+        if cum_qty < state.cum_qty - _QTY_EPSILON or (cum_qty <= state.cum_qty + _QTY_EPSILON and state.is_done):
+            return
+
+        state.order_id = entry.order_id
+        state.side = entry.side
+        state.ord_type = entry.ord_type.value
+        state.price = _float(entry.price) or state.price
+        state.order_qty = _float(entry.order_qty) or state.order_qty
+        state.cum_qty = cum_qty
+        state.avg_px = _float(entry.avg_px) if entry.avg_px else state.avg_px
+        self._set_status(state, entry.ord_status)
+
+    def _add_pending(self, state: OrderState, cl_ord_id: str) -> None:
+        if cl_ord_id not in self._orders:
+            state.pending_cl_ord_ids.append(cl_ord_id)
+            self._orders[cl_ord_id] = state
+
+    def _accept(self, state: OrderState, cl_ord_id: str) -> None:
+        state.pending_cl_ord_ids.remove(cl_ord_id)
+        state.cl_ord_ids.append(cl_ord_id)
+        state.cl_ord_id = cl_ord_id
+
+    def _set_status(self, state: OrderState, status: OrderStatus) -> None:
+        state.ord_status = status
+        state.updated_at = time.time()
+        if status not in DONE_STATUSES:
+            return
+
+        key = state.cl_ord_ids[0]
+        live = self._live.get(state.symbol)
+        if live is not None and live.pop(key, None) is not None and not live:
+            del self._live[state.symbol]
+        self._done[key] = state
+        while len(self._done) > self._max_done:
+            _, forgotten = self._done.popitem(last=False)
+            for cl_ord_id in forgotten.cl_ord_ids + forgotten.pending_cl_ord_ids + forgotten.rejected_cl_ord_ids:
+                if self._orders.get(cl_ord_id) is forgotten:
+                    del self._orders[cl_ord_id]
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "orders": len(set(map(id, self._orders.values()))),
+            "live": sum(len(orders) for orders in self._live.values()),
+            "updates": self.updates,
+            "stale_updates": self.stale_updates,
+            "gaps": self.gaps,
+            "rejected_requests": self.rejected_requests,
+            "reconciliations": self.reconciliations,
+            "reconcile_errors": self.reconcile_errors,
+        }
+
+
+def _update_fields(update: Union[Any, RawData]) -> Mapping[str, Any]:
+    if isinstance(update, dict):
+        return update["data"][0] if "data" in update else update
+    # OrderUpdate, or a LazyOrderUpdate which converts the fields read below on access
+    return {
+        "symbol": update.symbol,
+        "cl_ord_id": update.cl_ord_id,
+        "orig_cl_ord_id": update.orig_cl_ord_id,
+        "side": update.side,
+        "price": update.price,
+        "last_px": update.last_px,
+        "last_qty": update.last_qty,
+        "cum_qty": update.cum_qty,
+        "order_qty": update.order_qty,
+        "ord_type": update.ord_type,
+        "ord_status": update.ord_status,
+        "transact_time": update.transact_time,
+    }
+
+
+def _float(value: Any) -> Optional[float]:
+    return float(value) if value is not None and value != "" else None
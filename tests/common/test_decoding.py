@@ -0,0 +1,57 @@
+import asyncio
+import json
+
+from easybov.common.decoding import DECODED_KEY, _decode_batch, _init_worker
+from easybov.data.enums import BookFormat
+from easybov.data.live.b3 import B3DataStream
+from easybov.data.models.compact_order_book import CompactOrderbook
+from easybov.simulator.books import SyntheticBook
+from tests.conftest import API_KEY, SECRET_KEY
+
+
+def _frames(skip: int = 0):
+    """A snapshot and four updates of a book, as sent, without the update at index `skip` when given."""
+    book = SyntheticBook("PETR4", seed=1)
+    messages = [book.snapshot()] + [book.update() for _ in range(4)]
+    return [json.dumps(msg) for i, msg in enumerate(messages) if not skip or i != skip]
+
+
+def _stream() -> B3DataStream:
+    return B3DataStream(API_KEY, SECRET_KEY, book_format=BookFormat.COMPACT, decode_workers=1)
+
+
+def test_decoded_books_keep_the_sequence_ids():
+    _init_worker("json", True)
+    snapshot, update = _decode_batch(_frames()[:2])
+
+    assert isinstance(snapshot[DECODED_KEY], CompactOrderbook)
+    assert (snapshot["action"], update["action"]) == ("snapshot", "update")
+    assert update["prevSeqId"] == snapshot["seqId"]
+
+
+def test_decoded_updates_do_not_refresh_stale_books():
+    _init_worker("json", True)
+    snapshot, update = _decode_batch(_frames()[:2])
+    stream = _stream()
+
+    stream._stale_books.add("PETR4")
+    stream._track_book_sequence("PETR4", update)
+    assert stream.is_book_stale("PETR4")
+
+    stream._track_book_sequence("PETR4", snapshot)
+    assert not stream.is_book_stale("PETR4")
+
+
+def test_decode_workers_count_sequence_gaps():
+    stream = _stream()
+
+    async def feed() -> None:
+        for frame in _frames(skip=2):
+            await stream._on_frame(frame)
+        await stream._decoder.drain()
+        await stream._decoder.stop()
+
+    asyncio.run(feed())
+
+    assert stream.decode_stats["delivered"] == 4
+    assert stream.reconnect_stats.sequence_gaps == 1
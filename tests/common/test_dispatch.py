@@ -0,0 +1,176 @@
+import asyncio
+
+import pytest
+
+from easybov.common.dispatch import DispatchConfig, DispatchEngine, DispatchQueue
+from easybov.common.enums import OverflowPolicy
+from easybov.data.live.b3 import B3DataStream
+from easybov.simulator.books import SyntheticBook
+from tests.conftest import API_KEY, SECRET_KEY
+
+
+async def _drain(queue: DispatchQueue):
+    items = []
+    while len(queue):
+        items.append((await queue.get())[1])
+    return items
+
+
+def test_drop_oldest_keeps_the_newest():
+    async def run():
+        queue = DispatchQueue(2, OverflowPolicy.DROP_OLDEST)
+        for i in range(5):
+            await queue.put("PETR4", i)
+        return queue, await _drain(queue)
+
+    queue, items = asyncio.run(run())
+    assert items == [3, 4]
+    assert queue.stats()["dropped"] == 3
+    assert queue.stats()["high_water"] == 2
+
+
+def test_conflate_keeps_the_latest_per_key_in_place():
+    async def run():
+        queue = DispatchQueue(2, OverflowPolicy.CONFLATE)
+        await queue.put("PETR4", "petr-1")
+        await queue.put("VALE3", "vale-1")
+        await queue.put("PETR4", "petr-2")
+        first = await _drain(queue)
+
+        # full of other keys, the oldest one goes
+        await queue.put("PETR4", "petr-3")
+        await queue.put("VALE3", "vale-2")
+        await queue.put("ITUB4", "itub-1")
+        return queue, first, await _drain(queue)
+
+    queue, first, second = asyncio.run(run())
+    assert first == ["petr-2", "vale-1"]
+    assert second == ["vale-2", "itub-1"]
+    assert (queue.conflated, queue.dropped) == (1, 1)
+
+
+def test_block_waits_for_room():
+    async def run():
+        queue = DispatchQueue(1, OverflowPolicy.BLOCK)
+        await queue.put("PETR4", 1)
+        put = asyncio.ensure_future(queue.put("PETR4", 2))
+        await asyncio.sleep(0.01)
+        blocked = not put.done()
+        first = (await queue.get())[1]
+        await put
+        return blocked, first, (await queue.get())[1]
+
+    assert asyncio.run(run()) == (True, 1, 2)
+
+
+def test_invalid_size():
+    with pytest.raises(ValueError):
+        DispatchQueue(0, OverflowPolicy.BLOCK)
+
+
+def test_slow_books_do_not_hold_up_orders():
+    handled = []
+
+    async def handle(msg):
+        if msg["arg"]["channel"] == "books":
+            await asyncio.sleep(0.05)
+        handled.append(msg["arg"]["channel"])
+
+    async def run():
+        engine = DispatchEngine(handle, DispatchConfig(policies={"books": OverflowPolicy.BLOCK}))
+        await engine.put("books", "PETR4", {"arg": {"channel": "books"}})
+        await engine.put("orders", "*", {"arg": {"channel": "orders"}})
+        await engine.join()
+        await engine.stop()
+        return engine
+
+    engine = asyncio.run(run())
+    assert handled == ["orders", "books"]
+    assert engine.stats() == {}
+
+
+def test_per_symbol_queues_keep_the_order_and_survive_errors():
+    handled = []
+
+    async def handle(msg):
+        if msg["n"] == 1:
+            raise RuntimeError("handler bug")
+        handled.append((msg["symbol"], msg["n"]))
+
+    async def run():
+        engine = DispatchEngine(handle, DispatchConfig(default_policy=OverflowPolicy.BLOCK, per_symbol=True))
+        for n in range(4):
+            for symbol in ("PETR4", "VALE3"):
+                await engine.put("trades", symbol, {"symbol": symbol, "n": n})
+        await engine.join()
+        stats = engine.stats()
+        await engine.stop()
+        return stats
+
+    stats = asyncio.run(run())
+    for symbol in ("PETR4", "VALE3"):
+        assert [n for s, n in handled if s == symbol] == [0, 2, 3]
+        assert stats[f"trades:{symbol}"]["delivered"] == 4
+
+
+def test_stream_handlers_run_off_the_reader():
+    stream = B3DataStream(
+        API_KEY, SECRET_KEY, raw_data=True, dispatch=DispatchConfig(queue_size=2, policies={"books": "drop_oldest"})
+    )
+    handled = []
+
+    async def on_book(book):
+        await asyncio.sleep(0.01)
+        handled.append(book["data"][0]["seqId"])
+
+    stream.subscribe_books(on_book, "PETR4")
+    book = SyntheticBook("PETR4", seed=1)
+
+    async def run():
+        for msg in [book.snapshot()] + [book.update() for _ in range(5)]:
+            await stream._route(msg)
+        await stream._dispatcher.join()
+        stats = stream.dispatch_stats
+        await stream._dispatcher.stop()
+        return stats
+
+    stats = asyncio.run(run())
+    # the reader queued every book before the worker ran, only the last two fit
+    assert handled == [5, 6]
+    assert stats["books"]["dropped"] == 4
+
+
+def test_conflated_books_deliver_the_latest():
+    stream = B3DataStream(API_KEY, SECRET_KEY, raw_data=True)
+    handled = []
+
+    async def on_book(book):
+        handled.append((book["arg"]["symbol"], book["data"][0]["seqId"]))
+
+    stream.subscribe_books(on_book, "PETR4", conflate=True)
+    stream.subscribe_books(on_book, "VALE3")
+    books = {symbol: SyntheticBook(symbol, seed=1) for symbol in ("PETR4", "VALE3")}
+
+    async def run():
+        for _ in range(3):
+            for book in books.values():
+                await stream._route(book.update())
+        await stream._conflator.join()
+        stats = stream.conflation_stats
+        await stream._conflator.stop()
+        return stats
+
+    stats = asyncio.run(run())
+    # VALE3 is handled inline as it arrives, the PETR4 books queued meanwhile collapse into the latest one
+    assert handled == [("VALE3", 2), ("VALE3", 3), ("VALE3", 4), ("PETR4", 4)]
+    assert stats == {"PETR4": {"received": 3, "delivered": 1, "conflated": 2}}
+
+
+def test_conflate_needs_every_update_for_local_books():
+    stream = B3DataStream(API_KEY, SECRET_KEY, local_books=True)
+
+    async def on_book(book):
+        pass
+
+    with pytest.raises(ValueError):
+        stream.subscribe_books(on_book, "PETR4", conflate=True)
@@ -0,0 +1,89 @@
+import asyncio
+import time
+
+import pytest
+
+from easybov.common.exceptions import APIError, RequestTimeoutError
+from easybov.common.ratelimit import RateLimiter, TokenBucket, parse_retry_after
+from easybov.common.rest import AsyncRESTClient, RESTClient
+from easybov.simulator import Simulator
+from tests.conftest import API_KEY, SECRET_KEY
+
+
+def test_bucket_paces_after_the_burst():
+    bucket = TokenBucket(rate=10, capacity=2)
+
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == pytest.approx(0.1, abs=0.01)
+
+
+def test_reserve_past_the_timeout_takes_nothing():
+    bucket = TokenBucket(rate=1, capacity=1)
+    bucket.reserve()
+
+    assert bucket.reserve(timeout=0.5) is None
+    assert bucket.acquire(timeout=0.5) is False
+    assert bucket.available() == pytest.approx(0, abs=0.01)
+
+
+def test_block_for_refuses_tokens():
+    bucket = TokenBucket(rate=100)
+    bucket.block_for(1.0)
+
+    assert bucket.available() == 0
+    assert bucket.reserve(timeout=0.1) is None
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("1.5") == 1.5
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+
+
+def test_starved_limiter_does_not_outlive_the_deadline():
+    bucket = TokenBucket(rate=0.1, capacity=1)
+    bucket.reserve()
+    client = RESTClient(
+        "http://127.0.0.1:9", API_KEY, SECRET_KEY, rate_limiter=RateLimiter(default=bucket), deadline=0.2
+    )
+
+    started = time.monotonic()
+    with pytest.raises(RequestTimeoutError):
+        client.get("/trade/order", {"cl_ord_id": "1"})
+
+    assert time.monotonic() - started < 0.1
+
+
+def test_slow_server_hits_the_deadline():
+    with Simulator(credentials={API_KEY: SECRET_KEY}, latency=1.0) as sim:
+        client = RESTClient(sim.rest_url, API_KEY, SECRET_KEY, deadline=0.3)
+
+        started = time.monotonic()
+        with pytest.raises(RequestTimeoutError):
+            client.get("/trade/order", {"cl_ord_id": "1"})
+        assert time.monotonic() - started < 0.8
+
+
+def test_async_slow_server_hits_the_deadline():
+    with Simulator(credentials={API_KEY: SECRET_KEY}, latency=1.0) as sim:
+
+        async def get():
+            async with AsyncRESTClient(sim.rest_url, API_KEY, SECRET_KEY, deadline=0.3) as client:
+                await client.get("/trade/order", {"cl_ord_id": "1"})
+
+        with pytest.raises(RequestTimeoutError):
+            asyncio.run(get())
+
+
+def test_server_429_is_retried(simulator):
+    simulator.trading.reject_rate = 0.5
+    client = RESTClient(simulator.rest_url, API_KEY, SECRET_KEY, retry_attempts=20, retry_wait_seconds=0.01)
+
+    for _ in range(10):
+        with pytest.raises(APIError) as error:
+            client.get("/trade/order", {"cl_ord_id": "missing"})
+        assert error.value.status_code == 404
+
+    assert simulator.trading.rejected > 0
@@ -0,0 +1,56 @@
+import asyncio
+
+import pytest
+
+from easybov.common.exceptions import APIError
+from easybov.common.rest import AsyncRESTClient, RESTClient
+from easybov.trading.client import TradingClient
+from easybov.trading.enums import OrderSide
+from easybov.trading.requests import MarketOrderRequest
+from tests.conftest import API_KEY, SECRET_KEY
+
+# quoted differently by requests, aiohttp and urlencode, and None which requests drops
+PARAMS = {"cl_ord_id": "a b/c+d&é", "flag": True, "empty": None}
+
+
+def _submit(simulator) -> None:
+    client = TradingClient(API_KEY, SECRET_KEY, url_override=simulator.rest_url)
+    client.submit_order(
+        MarketOrderRequest(symbol="PETR4", cl_ord_id=PARAMS["cl_ord_id"], side=OrderSide.BUY, order_qty="100")
+    )
+
+
+def test_get_signs_the_query_sent(simulator):
+    _submit(simulator)
+    client = RESTClient(simulator.rest_url, API_KEY, SECRET_KEY)
+
+    order = client.get("/trade/order", PARAMS)
+
+    assert order["cl_ord_id"] == PARAMS["cl_ord_id"]
+
+
+def test_async_get_signs_the_query_sent(simulator):
+    _submit(simulator)
+
+    async def get():
+        async with AsyncRESTClient(simulator.rest_url, API_KEY, SECRET_KEY) as client:
+            return await client.get("/trade/order", PARAMS)
+
+    order = asyncio.run(get())
+
+    assert order["cl_ord_id"] == PARAMS["cl_ord_id"]
+
+
+def test_wrong_secret_is_rejected(simulator):
+    client = RESTClient(simulator.rest_url, API_KEY, "other")
+
+    with pytest.raises(APIError) as error:
+        client.get("/trade/order", PARAMS)
+
+    assert error.value.status_code == 401
+
+
+def test_query_string_skips_none():
+    assert RESTClient._query_string(PARAMS) == "cl_ord_id=a+b%2Fc%2Bd%26%C3%A9&flag=True"
+    assert RESTClient._query_string("a=1") == "a=1"
+    assert RESTClient._query_string(None) == ""
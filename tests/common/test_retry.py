@@ -0,0 +1,58 @@
+import time
+
+import pytest
+import requests
+
+from easybov.common.rest import RESTClient
+from easybov.common.retry import RetryPolicy
+
+
+def test_legacy_wait_is_fixed():
+    client = RESTClient("http://localhost", "key", "secret", retry_attempts=4, retry_wait_seconds=2)
+
+    policy = client.retry_policy
+    assert policy.max_retries == 4
+    assert policy.jitter == 0.0
+    assert [policy.backoff(attempt) for attempt in range(4)] == [2, 2, 2, 2]
+
+
+def test_backoff_grows_to_the_max():
+    policy = RetryPolicy(backoff_base=0.1, backoff_factor=2, backoff_max=0.5, jitter=0.0)
+
+    assert [policy.backoff(attempt) for attempt in range(5)] == pytest.approx([0.1, 0.2, 0.4, 0.5, 0.5])
+
+
+def test_full_jitter_stays_under_the_delay():
+    policy = RetryPolicy(backoff_base=1, backoff_max=1, jitter=1.0)
+
+    delays = [policy.backoff(0) for _ in range(200)]
+
+    assert all(0 <= delay <= 1 for delay in delays)
+    assert max(delays) - min(delays) > 0.5
+
+
+def test_retry_after_wins_over_a_shorter_delay():
+    policy = RetryPolicy(backoff_base=0.1, jitter=0.0)
+
+    assert policy.backoff(0, 429, retry_after=3.0) == 3.0
+    assert policy.backoff(0, 429, retry_after=0.01) == 0.1
+
+
+def test_orders_only_retry_when_the_server_did_not_act():
+    policy = RetryPolicy()
+
+    assert policy.should_retry_status(429, idempotent=False)
+    assert not policy.should_retry_status(504, idempotent=False)
+    assert policy.should_retry_status(504, idempotent=True)
+    assert policy.should_retry_exception(requests.exceptions.ConnectTimeout(), idempotent=False)
+    assert not policy.should_retry_exception(requests.exceptions.ReadTimeout(), idempotent=False)
+    assert policy.should_retry_exception(requests.exceptions.ReadTimeout(), idempotent=True)
+
+
+def test_next_delay_gives_up():
+    policy = RetryPolicy(max_retries=2, backoff_base=1, backoff_max=4, jitter=0.0, deadline=1.5)
+    started = time.monotonic()
+
+    assert policy.next_delay(0, started) == 1
+    assert policy.next_delay(1, started) is None  # 2s more would overshoot the deadline
+    assert policy.next_delay(2, started) is None
@@ -0,0 +1,52 @@
+import threading
+
+from easybov.data.live.b3 import B3DataStream
+from easybov.simulator import Simulator
+from tests.conftest import API_KEY, SECRET_KEY, wait_for
+
+
+def _run_in_thread(stream: B3DataStream) -> threading.Thread:
+    thread = threading.Thread(target=stream.run, daemon=True)
+    thread.start()
+    wait_for(lambda: stream._loop is not None)
+    return thread
+
+
+def test_handler_errors_keep_the_connection(simulator):
+    stream = B3DataStream(API_KEY, SECRET_KEY, url_override=simulator.ws_url)
+    books = []
+
+    async def failing_handler(book):
+        books.append(book)
+        if len(books) <= 3:
+            raise RuntimeError("handler bug")
+
+    stream.subscribe_books(failing_handler, "PETR4")
+    thread = _run_in_thread(stream)
+    wait_for(lambda: len(books) > 5)
+    stream.stop()
+    thread.join(timeout=10)
+
+    stats = stream.reconnect_stats
+    assert stats.connects == 1
+    assert stats.disconnects == 0
+    assert stats.last_error is None
+    assert not stream.stale_books
+
+
+def test_dropped_connections_reconnect():
+    with Simulator(credentials={API_KEY: SECRET_KEY}, seed=1, disconnect_after=0.3) as sim:
+        stream = B3DataStream(API_KEY, SECRET_KEY, url_override=sim.ws_url)
+        books = []
+
+        async def on_book(book):
+            books.append(book)
+
+        stream.subscribe_books(on_book, "PETR4")
+        thread = _run_in_thread(stream)
+        wait_for(lambda: stream.reconnect_stats.reconnects >= 1)
+        stream.stop()
+        thread.join(timeout=10)
+
+    assert stream.reconnect_stats.disconnects >= 1
+    assert books
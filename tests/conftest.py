@@ -0,0 +1,22 @@
+import time
+
+import pytest
+
+from easybov.simulator import Simulator
+
+API_KEY = "key"
+SECRET_KEY = "secret"
+
+
+def wait_for(condition, timeout: float = 10.0) -> None:
+    """Polls `condition` until it is true, failing the test after `timeout` seconds."""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.02)
+
+
+@pytest.fixture
+def simulator():
+    with Simulator(credentials={API_KEY: SECRET_KEY}, seed=1) as sim:
+        yield sim
@@ -0,0 +1,57 @@
+import pytest
+
+from easybov.data.archive import StreamArchiver, read_archive
+from easybov.simulator.books import SyntheticBook
+from easybov.trading.enums import OrderStatus
+
+pytest.importorskip("pyarrow")
+
+
+def _archive(directory, file_format: str, symbols) -> None:
+    archiver = StreamArchiver(str(directory), file_format=file_format)
+    for symbol in symbols:
+        book = SyntheticBook(symbol, seed=1)
+        archiver.append(book.snapshot())
+        archiver.append(book.update())
+    archiver.close()
+    assert archiver.last_error is None
+
+
+def test_read_archive_filters_symbols(tmp_path):
+    _archive(tmp_path, "parquet", ["PETR4", "VALE3"])
+
+    table = read_archive(str(tmp_path), symbols=["VALE3"])
+    assert table.num_rows == 2
+    assert set(table.column("symbol").to_pylist()) == {"VALE3"}
+    assert str(table.schema.field("received").type) == "timestamp[ns, tz=UTC]"
+
+
+def test_read_archive_with_mixed_formats(tmp_path):
+    _archive(tmp_path, "parquet", ["PETR4"])
+    _archive(tmp_path, "arrow", ["PETR4", "VALE3"])
+
+    with pytest.raises(ValueError, match="file_format"):
+        read_archive(str(tmp_path))
+    assert read_archive(str(tmp_path), file_format="parquet").num_rows == 2
+    assert read_archive(str(tmp_path), file_format="arrow").num_rows == 4
+
+
+def test_order_statuses_are_archived_by_name(tmp_path):
+    archiver = StreamArchiver(str(tmp_path), channel="orders")
+    for status in (OrderStatus.NEW, OrderStatus.FILLED):
+        archiver.append({
+            "arg": {"channel": "orders", "symbol": "PETR4"},
+            "data": [{
+                "symbol": "PETR4",
+                "cl_ord_id": "a",
+                "side": "1",
+                "ord_status": status.value,
+                "transact_time": "20240102-10:00:00.5",
+                "order_qty": "100",
+            }],
+        })
+    archiver.close()
+
+    table = read_archive(str(tmp_path), channel="orders")
+    assert table.column("ord_status").to_pylist() == ["NEW", "FILLED"]
+    assert table.column("transact_time")[0].as_py().isoformat() == "2024-01-02T10:00:00.500000+00:00"
@@ -0,0 +1,113 @@
+import json
+
+import pytest
+
+from easybov.common.recording import FrameRecorder
+from easybov.data.bars import BarAggregator
+
+START = 1700000000
+
+
+def _book(symbol: str, ts: float, bid: float, ask: float, bid_size: float = 100, ask_size: float = 200):
+    return {
+        "arg": {"channel": "books", "symbol": symbol},
+        "action": "snapshot",
+        "data": [{"ts": str(ts), "bids": [[str(bid), str(bid_size)]], "asks": [[str(ask), str(ask_size)]]}],
+    }
+
+
+def _summary(bar):
+    return bar.symbol, bar.interval, bar.start // 1_000_000_000, bar.open, bar.high, bar.low, bar.close, bar.updates
+
+
+def test_bar_fields():
+    bars = BarAggregator([1])
+    bars.update(_book("PETR4", START, 29.9, 30.1, 100, 300))
+    bars.update(_book("PETR4", START + 0.2, 30.0, 30.4, 200, 100))
+    bars.update(_book("PETR4", START + 0.4, 29.7, 29.9, 300, 200))
+    bar = bars.current("PETR4", 1)
+
+    # mids 30.0, 30.2, 29.8 and spreads 0.2, 0.4, 0.2
+    assert (bar.open, bar.high, bar.low, bar.close) == pytest.approx((30.0, 30.2, 29.8, 29.8))
+    assert (bar.spread_mean, bar.spread_min, bar.spread_max, bar.spread) == pytest.approx((0.8 / 3, 0.2, 0.4, 0.2))
+    assert (bar.bid_size_mean, bar.ask_size_mean, bar.bid_size, bar.ask_size) == (200, 200, 300, 200)
+    assert (bar.start, bar.end, bar.updates) == (START * 1_000_000_000, (START + 1) * 1_000_000_000, 3)
+
+
+def test_several_intervals_complete_on_the_next_book():
+    completed = []
+    bars = BarAggregator([1, 5], completed.append)
+    for ts, mid in [(0, 30.0), (0.5, 31.0), (1.2, 32.0), (4.9, 29.0), (5.0, 30.0)]:
+        bars.update(_book("PETR4", START + ts, mid - 0.1, mid + 0.1))
+
+    assert [_summary(bar) for bar in completed] == pytest.approx(
+        [
+            ("PETR4", 1, START, 30.0, 31.0, 30.0, 31.0, 2),
+            ("PETR4", 1, START + 1, 32.0, 32.0, 32.0, 32.0, 1),
+            ("PETR4", 1, START + 4, 29.0, 29.0, 29.0, 29.0, 1),
+            ("PETR4", 5, START, 30.0, 32.0, 29.0, 29.0, 4),
+        ]
+    )
+    assert bars.current("PETR4", 5).updates == 1
+
+
+def test_empty_intervals_and_sides_produce_no_bar():
+    completed = []
+    bars = BarAggregator([1], completed.append)
+    bars.update(_book("PETR4", START, 29.9, 30.1))
+    # nothing from START + 1 to START + 3
+    bars.update(_book("PETR4", START + 3.5, 29.9, 30.1))
+    one_sided = _book("PETR4", START + 4, 29.9, 30.1)
+    one_sided["data"][0]["asks"] = []
+    bars.update(one_sided)
+
+    assert [bar.start // 1_000_000_000 for bar in completed] == [START]
+    assert bars.skipped == 1
+    assert bars.current("VALE3", 1) is None
+
+
+def test_flush_completes_the_bars_that_ended():
+    bars = BarAggregator([1, 60])
+    bars.update(_book("PETR4", START, 29.9, 30.1))
+
+    assert [bar.interval for bar in bars.flush(now=START + 1)] == [1]
+    # the completed bar ignores its late books
+    bars.update(_book("PETR4", START + 0.5, 28.9, 29.1))
+    assert bars.current("PETR4", 1) is None
+    assert [(bar.interval, bar.updates) for bar in bars.flush()] == [(60, 2)]
+
+
+def test_symbols_beyond_the_capacity():
+    bars = BarAggregator([1, 5], capacity=2)
+    symbols = [f"SYM{i}" for i in range(5)]
+    for i, symbol in enumerate(symbols):
+        bars.update(_book(symbol, START, 10.0 + i - 0.1, 10.0 + i + 0.1))
+    bars.update(_book("SYM0", START + 0.5, 8.9, 9.1))
+
+    assert bars.symbols == symbols
+    assert [bars.current(symbol, 5).close for symbol in symbols] == pytest.approx([9.0, 11.0, 12.0, 13.0, 14.0])
+    assert bars.current("SYM0", 1).open == pytest.approx(10.0)
+
+
+def test_backfill_matches_the_live_bars(tmp_path):
+    books = [
+        _book(symbol, START + i * 0.3, 30.0 + i % 4 * 0.05, 30.2 + i % 3 * 0.1)
+        for i in range(20)
+        for symbol in ("PETR4", "VALE3")
+    ]
+    path = tmp_path / "session.rec"
+    recorder = FrameRecorder(str(path))
+    for book in books:
+        recorder.write(json.dumps(book))
+    recorder.close()
+
+    live, replayed = [], []
+    live_bars, backfilled = BarAggregator([1, 2], live.append), BarAggregator([1, 2], replayed.append)
+    for book in books:
+        live_bars.update(book)
+    backfilled.backfill(str(path), raw_data=True)
+
+    # 5 one second and 2 two second bars per symbol, the last ones still in progress
+    assert len(replayed) == 14
+    assert [_summary(bar) for bar in replayed] == [_summary(bar) for bar in live]
+    assert backfilled.current("PETR4", 2).close == live_bars.current("PETR4", 2).close
@@ -0,0 +1,118 @@
+import itertools
+import math
+
+import numpy as np
+import pytest
+
+from easybov.data import columnar
+from easybov.data.columnar import BookRecorder, OrderRecorder
+from easybov.data.enums import BookSide
+from easybov.data.timestamps import NAT
+from easybov.trading.enums import OrderStatus
+
+SECOND = 1_000_000_000
+START = 1700000000
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Rows are received one second apart from START."""
+    seconds = itertools.count(START)
+    monkeypatch.setattr(columnar.time, "time_ns", lambda: next(seconds) * SECOND)
+
+
+def _book(symbol: str, bids, asks, ts=START):
+    return {
+        "arg": {"channel": "books", "symbol": symbol},
+        "data": [
+            {"ts": str(ts), "bids": [[str(p), str(s)] for p, s in bids], "asks": [[str(p), str(s)] for p, s in asks]}
+        ],
+    }
+
+
+def _update(cl_ord_id: str, status: OrderStatus, cum_qty: str, transact_time=None):
+    return {
+        "arg": {"channel": "orders", "symbol": "PETR4"},
+        "data": [
+            {
+                "symbol": "PETR4",
+                "cl_ord_id": cl_ord_id,
+                "side": "2",
+                "price": "30.5",
+                "last_px": "",
+                "last_qty": "0",
+                "cum_qty": cum_qty,
+                "order_qty": "100",
+                "ord_status": status.value,
+                "transact_time": transact_time,
+            }
+        ],
+    }
+
+
+def test_books_are_appended_level_by_level(clock):
+    books = BookRecorder(depth=2)
+    books.append(_book("PETR4", [(30.0, 100), (29.9, 200), (29.8, 300)], [(30.1, 400)], ts=START + 0.5))
+    books.append(_book("VALE3", [], [(60.1, 10), (60.2, 20)]))
+
+    arrays = books.arrays()
+    assert books.symbols == ["PETR4", "VALE3"]
+    assert list(arrays["symbol"]) == [0, 1]
+    assert list(arrays["received"]) == [START * SECOND, (START + 1) * SECOND]
+    assert arrays["ts"][0] == START * SECOND + SECOND // 2
+    # levels beyond the depth are dropped, missing ones are NaN
+    assert (arrays["bid_px_0"][0], arrays["bid_px_1"][0], arrays["bid_sz_1"][0]) == (30.0, 29.9, 200)
+    assert (arrays["ask_px_0"][0], arrays["ask_sz_0"][0]) == (30.1, 400)
+    assert math.isnan(arrays["ask_px_1"][0]) and math.isnan(arrays["bid_px_0"][1])
+
+    prices, sizes = books.side(BookSide.ASK)
+    assert prices.shape == (2, 2)
+    assert list(prices[1]) == [60.1, 60.2] and list(sizes[1]) == [10, 20]
+
+
+def test_columns_grow_past_the_capacity(clock):
+    books = BookRecorder(depth=1, capacity=2)
+    for i in range(5):
+        books.append(_book("PETR4", [(30.0 + i, 100)], [(31.0 + i, 100)]))
+
+    assert len(books) == 5
+    assert books._columns.capacity == 8
+    assert list(books.arrays()["bid_px_0"]) == [30.0, 31.0, 32.0, 33.0, 34.0]
+    assert list(books.arrays()["received"]) == [(START + i) * SECOND for i in range(5)]
+
+
+def test_windows_slice_the_rows_received(clock):
+    books = BookRecorder(depth=1)
+    for i in range(5):
+        books.append(_book("PETR4", [(30.0 + i, 100)], [(31.0 + i, 100)]))
+
+    # start included, end excluded
+    assert list(books.arrays(START + 1, START + 3)["bid_px_0"]) == [31.0, 32.0]
+    assert list(books.arrays(start=START + 3.5)["bid_px_0"]) == [34.0]
+    assert list(books.arrays(end=START + 1)["bid_px_0"]) == [30.0]
+    assert len(books.arrays(START + 3, START + 1)["bid_px_0"]) == 0
+    # views of the columns, not copies
+    assert np.shares_memory(books.arrays(START + 1)["bid_px_0"], books._columns._data["levels"])
+
+    books.clear()
+    assert len(books) == 0 and len(books.arrays()["bid_px_0"]) == 0
+
+
+def test_order_updates(clock):
+    orders = OrderRecorder(capacity=1)
+    orders.append(_update("a", OrderStatus.NEW, "0", transact_time="20231114-22:13:20.5"))
+    orders.append(_update("b", OrderStatus.NEW, "0"))
+    orders.append(_update("a", OrderStatus.FILLED, "100", transact_time="not a time"))
+
+    arrays = orders.arrays()
+    assert orders.cl_ord_ids == ["a", "b"]
+    assert list(arrays["cl_ord_id"]) == [0, 1, 0]
+    assert [orders.statuses[code] for code in arrays["ord_status"]] == [
+        OrderStatus.NEW,
+        OrderStatus.NEW,
+        OrderStatus.FILLED,
+    ]
+    assert list(arrays["transact_time"]) == [START * SECOND + SECOND // 2, NAT, NAT]
+    assert list(arrays["side"]) == [2, 2, 2]
+    assert list(arrays["cum_qty"]) == [0, 0, 100]
+    assert math.isnan(arrays["last_px"][0])
@@ -0,0 +1,72 @@
+import math
+
+import pytest
+
+from easybov.data.enums import BookSide
+from easybov.data.models.compact_order_book import CompactOrderbook
+
+
+def _book(bids, asks) -> CompactOrderbook:
+    return CompactOrderbook.from_raw("PETR4", {"data": [{"ts": "1700000000", "bids": bids, "asks": asks}]})
+
+
+BIDS = [["30.0", "100"], ["29.9", "200"], ["29.8", "300"]]
+ASKS = [["30.1", "50"], ["30.2", "150"]]
+
+
+def test_levels_are_parsed_best_first():
+    # extra fields after the size are dropped
+    book = _book(BIDS, [["30.1", "50", "2"], ["30.2", "150"]])
+
+    assert list(book.bids_prices) == [30.0, 29.9, 29.8]
+    assert list(book.asks_sizes) == [50, 150]
+    assert (book.best_bid, book.best_ask) == (30.0, 30.1)
+    assert (book.mid, book.spread) == pytest.approx((30.05, 0.1))
+    assert list(book.cumulative_depth(BookSide.BID)) == [100, 300, 600]
+
+
+def test_microprice_leans_towards_the_thinner_side():
+    # (30.0 * 50 + 30.1 * 100) / 150
+    assert _book(BIDS, ASKS).microprice == pytest.approx(4510 / 150)
+    # no size at the top falls back to the mid
+    assert _book([["30.0", "0"]], [["30.2", "0"]]).microprice == pytest.approx(30.1)
+
+
+def test_vwap_walks_the_levels():
+    book = _book(BIDS, ASKS)
+
+    assert book.vwap_to_size(BookSide.BID, 100) == 30.0
+    # 50 at 30.1 and 70 at 30.2
+    assert book.vwap_to_size(BookSide.ASK, 120) == pytest.approx((50 * 30.1 + 70 * 30.2) / 120)
+    # more than the side holds, the whole side
+    assert book.vwap_to_size(BookSide.BID, 1000) == pytest.approx((3000 + 5980 + 8940) / 600)
+    assert math.isnan(book.vwap_to_size(BookSide.BID, 0))
+    with pytest.raises(ValueError):
+        book.vwap_to_size("both", 100)
+
+
+def test_imbalance_over_the_levels():
+    book = _book(BIDS, ASKS)
+
+    assert book.imbalance() == pytest.approx((100 - 50) / 150)
+    assert book.imbalance(2) == pytest.approx((300 - 200) / 500)
+    assert book.imbalance(None) == pytest.approx((600 - 200) / 800)
+
+
+def test_one_sided_book():
+    book = _book(BIDS, [])
+
+    assert math.isnan(book.best_ask) and math.isnan(book.mid) and math.isnan(book.microprice)
+    assert math.isnan(book.vwap_to_size(BookSide.ASK, 100))
+    assert book.vwap_to_size(BookSide.BID, 300) == pytest.approx((3000 + 5980) / 300)
+    assert book.imbalance() == 1.0
+    assert list(book.cumulative_depth(BookSide.ASK)) == []
+
+
+def test_empty_book():
+    book = _book([], [])
+
+    assert math.isnan(book.best_bid) and math.isnan(book.spread) and math.isnan(book.microprice)
+    assert math.isnan(book.vwap_to_size(BookSide.BID, 100))
+    assert book.imbalance() == 0.0
+    assert book.to_orderbook().bids == []
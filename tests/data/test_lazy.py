@@ -0,0 +1,89 @@
+import copy
+import pickle
+
+import pytest
+
+from easybov.data.models.lazy import LazyOrderbook, LazyOrderUpdate
+from easybov.trading.enums import OrderSide, OrderStatus
+
+BOOK = {
+    "arg": {"channel": "books", "symbol": "PETR4"},
+    "data": [{"ts": "1700000000", "bids": [["30.0", "100"], ["29.9", "200"]], "asks": [["30.1", "300"]]}],
+}
+
+UPDATE = {
+    "arg": {"channel": "orders", "symbol": "PETR4"},
+    "data": [
+        {
+            "symbol": "PETR4",
+            "cl_ord_id": "a",
+            "side": "1",
+            "price": "30.0",
+            "last_px": "30.0",
+            "last_qty": "40",
+            "cum_qty": "40",
+            "order_qty": "100",
+            "ord_type": "limit",
+            "ord_status": "1",
+            "transact_time": "2023-11-14T22:13:20Z",
+        }
+    ],
+}
+
+
+def test_book_fields_match_the_model():
+    book = LazyOrderbook("PETR4", BOOK)
+    model = book.to_orderbook()
+
+    assert (book.best_bid, book.best_ask) == (30.0, 30.1)
+    assert (book.ts, book.bids, book.asks) == (model.ts, model.bids, model.asks)
+    assert book.to_orderbook() is model
+
+
+def test_update_fields_match_the_model():
+    update = LazyOrderUpdate("ignored", UPDATE)
+
+    assert update.symbol == "PETR4"
+    assert (update.side, update.ord_status) == (OrderSide.BUY, OrderStatus.PARTIALLY_FILLED)
+    assert (update.cum_qty, update.order_qty) == (40.0, 100.0)
+    assert update.orig_cl_ord_id is None
+    assert update.to_order_update().model_dump() == {
+        "symbol": "PETR4",
+        "cl_ord_id": "a",
+        "orig_cl_ord_id": None,
+        "side": update.side,
+        "price": update.price,
+        "last_px": update.last_px,
+        "last_qty": update.last_qty,
+        "cum_qty": update.cum_qty,
+        "order_qty": update.order_qty,
+        "ord_type": "limit",
+        "ord_status": update.ord_status,
+        "transact_time": update.transact_time,
+    }
+
+
+def test_unknown_update_fields_raise():
+    update = LazyOrderUpdate("PETR4", UPDATE)
+
+    with pytest.raises(AttributeError):
+        update.quantity
+    with pytest.raises(AttributeError):
+        update._private
+
+
+@pytest.mark.parametrize("clone", [copy.copy, copy.deepcopy, lambda value: pickle.loads(pickle.dumps(value))])
+def test_copies_keep_the_fields(clone):
+    book = LazyOrderbook("PETR4", BOOK)
+    update = LazyOrderUpdate("PETR4", UPDATE)
+    # some fields converted and cached, others still raw
+    book.bids
+    book.to_orderbook()
+    update.ord_status
+
+    book_copy, update_copy = clone(book), clone(update)
+
+    assert (book_copy.symbol, book_copy.bids, book_copy.asks) == ("PETR4", book.bids, book.asks)
+    assert book_copy.to_orderbook() == book.to_orderbook()
+    assert (update_copy.ord_status, update_copy.cum_qty) == (OrderStatus.PARTIALLY_FILLED, 40.0)
+    assert update_copy.to_order_update() == update.to_order_update()
@@ -0,0 +1,79 @@
+import copy
+import zlib
+
+import pytest
+
+from easybov.data.models.local_order_book import LocalOrderBook
+from easybov.simulator.books import SyntheticBook
+
+
+def _message(action, bids=(), asks=(), seq_id=None, prev_seq_id=None, checksum=None):
+    data = {"ts": "1700000000.5", "bids": [list(level) for level in bids], "asks": [list(level) for level in asks]}
+    if seq_id is not None:
+        data["seqId"] = seq_id
+    if prev_seq_id is not None:
+        data["prevSeqId"] = prev_seq_id
+    if checksum is not None:
+        data["checksum"] = checksum
+    return {"arg": {"channel": "books", "symbol": "PETR4"}, "action": action, "data": [data]}
+
+
+def _signed_crc(text: str) -> int:
+    crc = zlib.crc32(text.encode("utf-8"))
+    return crc - (1 << 32) if crc & 0x80000000 else crc
+
+
+def test_updates_change_and_remove_levels():
+    book = LocalOrderBook("PETR4")
+    book.apply(_message("snapshot", bids=[("10.0", "5"), ("9.9", "7")], asks=[("10.1", "3")], seq_id=1))
+    assert book.apply(_message("update", bids=[("10.0", "0"), ("9.95", "2")], asks=[("10.1", "4")], seq_id=2,
+                               prev_seq_id=1))
+
+    view = book.view
+    assert view.bids() == [(9.95, 2.0), (9.9, 7.0)]
+    assert view.best_ask == (10.1, 4.0)
+    assert view.mid == pytest.approx(10.025)
+    assert view.spread == pytest.approx(0.15)
+    assert view.bid_depth_through(9.9) == 9.0
+    assert view.seq_id == 2
+
+
+def test_checksum_covers_interleaved_levels():
+    book = LocalOrderBook("PETR4")
+    book.apply(_message("snapshot", bids=[("10.0", "5"), ("9.9", "7")], asks=[("10.1", "3")]))
+
+    assert book.checksum() == _signed_crc("10.0:5:10.1:3:9.9:7")
+
+
+def test_checksum_mismatch_invalidates_the_book():
+    book = LocalOrderBook("PETR4")
+    book.apply(_message("snapshot", bids=[("10.0", "5")], asks=[("10.1", "3")], seq_id=1))
+
+    assert not book.apply(_message("update", bids=[("10.0", "6")], seq_id=2, prev_seq_id=1, checksum=12345))
+    assert not book.view.is_valid
+
+
+def test_sequence_gap_waits_for_a_snapshot():
+    book = LocalOrderBook("PETR4")
+    book.apply(_message("snapshot", bids=[("10.0", "5")], asks=[("10.1", "3")], seq_id=1))
+
+    assert not book.apply(_message("update", bids=[("10.0", "6")], seq_id=3, prev_seq_id=2))
+    # later updates are ignored, even when they follow on
+    assert not book.apply(_message("update", bids=[("10.0", "7")], seq_id=4, prev_seq_id=3))
+    assert book.view.best_bid == (10.0, 5.0)
+
+    assert book.apply(_message("snapshot", bids=[("10.0", "8")], asks=[("10.1", "3")], seq_id=5))
+    assert book.view.best_bid == (10.0, 8.0)
+
+
+def test_follows_the_simulator_books():
+    synthetic = SyntheticBook("PETR4", seed=7)
+    book = LocalOrderBook("PETR4")
+    book.apply(synthetic.snapshot())
+
+    for _ in range(200):
+        # every update carries the checksum of the book it leads to
+        assert book.apply(copy.deepcopy(synthetic.update()))
+
+    assert book.view.bids() == synthetic._book.view.bids()
+    assert book.view.asks() == synthetic._book.view.asks()
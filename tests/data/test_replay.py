@@ -0,0 +1,106 @@
+import json
+import threading
+import time
+
+import pytest
+
+from easybov.common.recording import FrameRecorder, read_frames
+from easybov.data.live.b3 import B3DataStream
+from easybov.data.live.replay import ReplayStream
+from easybov.simulator.books import SyntheticBook
+from tests.conftest import API_KEY, SECRET_KEY, wait_for
+
+
+def _record(path, frames, spacing: float = 0.0) -> None:
+    recorder = FrameRecorder(str(path))
+    for i, frame in enumerate(frames):
+        recorder.write(frame, received=1700000000 + i * spacing)
+    recorder.close()
+
+
+def _book_frames(symbol: str, updates: int):
+    book = SyntheticBook(symbol, seed=1)
+    return book, [json.dumps(msg) for msg in [book.snapshot()] + [book.update() for _ in range(updates)]]
+
+
+def test_frames_round_trip(tmp_path):
+    path = tmp_path / "session.rec"
+    _record(path, ["text", b"bytes"], spacing=0.5)
+
+    assert list(read_frames(str(path))) == [(1700000000, "text"), (1700000000.5, b"bytes")]
+
+
+def test_not_a_recording(tmp_path):
+    path = tmp_path / "session.rec"
+    path.write_bytes(b"something else")
+
+    with pytest.raises(ValueError):
+        list(read_frames(str(path)))
+
+
+def test_replay_rebuilds_the_local_books(tmp_path):
+    petr, petr_frames = _book_frames("PETR4", 50)
+    _, vale_frames = _book_frames("VALE3", 50)
+    path = tmp_path / "session.rec"
+    _record(path, [frame for pair in zip(petr_frames, vale_frames) for frame in pair])
+
+    stream = ReplayStream(str(path), local_books=True)
+    views = []
+
+    async def on_book(view):
+        views.append(view.is_valid)
+
+    stream.subscribe_books(on_book, "PETR4")
+    stream.run()
+
+    # VALE3 had no handler, its frames were skipped
+    assert len(views) == 51 and all(views)
+    assert stream.get_book("VALE3") is None
+    assert stream.get_book("PETR4").bids() == petr._book.view.bids()
+    assert stream.stats["frames"] == 102
+
+
+def test_replay_follows_the_recorded_timing(tmp_path):
+    _, frames = _book_frames("PETR4", 4)
+    path = tmp_path / "session.rec"
+    _record(path, frames, spacing=0.1)
+
+    async def on_book(book):
+        pass
+
+    stream = ReplayStream(str(path), speed=2)
+    stream.subscribe_books(on_book, "PETR4")
+    started = time.perf_counter()
+    stream.run()
+
+    # 0.4 seconds of recording at twice the speed
+    assert time.perf_counter() - started == pytest.approx(0.2, abs=0.1)
+
+
+def test_replay_delivers_what_was_handled_live(simulator, tmp_path):
+    path = tmp_path / "session.rec"
+    recorder = FrameRecorder(str(path))
+    live = B3DataStream(API_KEY, SECRET_KEY, raw_data=True, url_override=simulator.ws_url, recorder=recorder)
+    live_books = []
+
+    async def on_live_book(book):
+        live_books.append(book)
+
+    live.subscribe_books(on_live_book, "PETR4")
+    thread = threading.Thread(target=live.run, daemon=True)
+    thread.start()
+    wait_for(lambda: len(live_books) >= 10)
+    live.stop()
+    thread.join(timeout=10)
+    recorder.close()
+
+    replay = ReplayStream(str(path), raw_data=True)
+    replayed = []
+
+    async def on_replayed_book(book):
+        replayed.append(book)
+
+    replay.subscribe_books(on_replayed_book, "PETR4")
+    replay.run()
+
+    assert replayed == live_books
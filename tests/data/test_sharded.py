@@ -0,0 +1,91 @@
+import asyncio
+import threading
+
+import pytest
+
+from easybov.data.live.sharded import ShardedDataStream, hash_placement
+from tests.conftest import API_KEY, SECRET_KEY, wait_for
+
+SHARD_OF = {"PETR4": 0, "VALE3": 1}
+
+
+def _sharded(simulator, **kwargs) -> ShardedDataStream:
+    return ShardedDataStream(
+        API_KEY,
+        SECRET_KEY,
+        shards=2,
+        placement=lambda symbol, shards: SHARD_OF[symbol],
+        url_override=simulator.ws_url,
+        **kwargs,
+    )
+
+
+def _run_in_thread(stream: ShardedDataStream) -> threading.Thread:
+    thread = threading.Thread(target=stream.run, daemon=True)
+    thread.start()
+    wait_for(lambda: stream._loop is not None)
+    return thread
+
+
+def test_hash_placement_is_stable():
+    assert hash_placement("PETR4", 4) == hash_placement("PETR4", 4)
+    assert all(0 <= hash_placement(f"S{i}", 3) < 3 for i in range(50))
+
+
+def test_weights_balance_the_shards():
+    stream = ShardedDataStream(API_KEY, SECRET_KEY, shards=2, weights={"A": 3, "B": 1, "C": 1, "D": 1})
+    for symbol in "ABCD":
+        stream._assign(symbol)
+
+    assert stream.placement == {0: ["A"], 1: ["B", "C", "D"]}
+    assert stream.stats() == {0: {"symbols": 1, "load": 3}, 1: {"symbols": 3, "load": 3}}
+
+
+def test_shard_subscribed_while_running_is_started(simulator):
+    stream = _sharded(simulator)
+    books = {}
+
+    async def on_book(book):
+        books[book.symbol] = books.get(book.symbol, 0) + 1
+
+    stream.subscribe_books(on_book, "PETR4")
+    thread = _run_in_thread(stream)
+    wait_for(lambda: books.get("PETR4"))
+
+    # VALE3 goes to the second shard, which had no connection when run was called
+    stream.subscribe_books(on_book, "VALE3")
+    wait_for(lambda: books.get("VALE3"))
+
+    stream.stop()
+    thread.join(timeout=10)
+    assert not thread.is_alive()
+    assert not stream._shards[1]._running
+
+
+def test_processes_bound_the_books_queue(simulator):
+    stream = _sharded(simulator, processes=True, queue_size=2)
+    received = []
+
+    async def slow_book(book):
+        received.append(book.symbol)
+        await asyncio.sleep(0.05)
+
+    stream.subscribe_books(slow_book, "PETR4", "VALE3")
+    thread = _run_in_thread(stream)
+    wait_for(lambda: {"PETR4", "VALE3"} <= set(received), timeout=30)
+
+    assert stream._child_out._maxsize == 2
+    stream.stop()
+    thread.join(timeout=15)
+    assert not thread.is_alive()
+
+
+def test_processes_reject_late_subscriptions():
+    stream = ShardedDataStream(API_KEY, SECRET_KEY, processes=True)
+    stream._running = True
+
+    async def on_book(book):
+        pass
+
+    with pytest.raises(RuntimeError):
+        stream.subscribe_books(on_book, "PETR4")
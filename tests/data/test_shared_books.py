@@ -0,0 +1,76 @@
+import multiprocessing
+import uuid
+
+import numpy as np
+
+from easybov.data.live.shared_books import SharedBookPublisher, SharedBookReader
+from easybov.data.models.compact_order_book import CompactOrderbook
+
+DEPTH = 8
+
+
+def _book(version: int) -> CompactOrderbook:
+    # every value of a book is derived from its version, a torn read mixes two versions
+    levels = np.arange(DEPTH, dtype=np.float64)
+    bids = np.array([version - levels, np.full(DEPTH, version)])
+    asks = np.array([version + 1 + levels, np.full(DEPTH, version)])
+    return CompactOrderbook("PETR4", float(version), bids, asks)
+
+
+def _read_while_published(name: str, reads: int, results) -> None:
+    reader = SharedBookReader(name)
+    versions, torn = set(), 0
+    for _ in range(reads):
+        book = reader.read("PETR4")
+        version = book.ts
+        expected = _book(int(version))
+        if not (
+            np.array_equal(book.bids_prices, expected.bids_prices)
+            and np.array_equal(book.bids_sizes, expected.bids_sizes)
+            and np.array_equal(book.asks_prices, expected.asks_prices)
+            and np.array_equal(book.asks_sizes, expected.asks_sizes)
+        ):
+            torn += 1
+        versions.add(version)
+    reader.close()
+    results.put((len(versions), torn))
+
+
+def test_a_reader_in_another_process_never_sees_a_torn_book():
+    name = f"easybov-test-{uuid.uuid4().hex[:8]}"
+    publisher = SharedBookPublisher(name, depth=DEPTH, capacity=4)
+    publisher.publish(_book(1))
+
+    results = multiprocessing.Queue()
+    process = multiprocessing.Process(target=_read_while_published, args=(name, 20000, results))
+    process.start()
+    try:
+        version = 1
+        while process.is_alive() and results.empty():
+            version += 1
+            publisher.publish(_book(version))
+        distinct, torn = results.get(timeout=30)
+        process.join(timeout=30)
+    finally:
+        publisher.close()
+
+    assert process.exitcode == 0
+    assert torn == 0
+    # the reader saw the publisher move on
+    assert distinct > 1
+
+
+def test_reader_of_the_same_process():
+    name = f"easybov-test-{uuid.uuid4().hex[:8]}"
+    publisher = SharedBookPublisher(name, depth=DEPTH, capacity=4)
+    reader = SharedBookReader(name)
+    try:
+        assert reader.read("PETR4") is None and reader.version("PETR4") == 0
+        publisher.publish(_book(3))
+        book = reader.read("PETR4")
+
+        assert reader.symbols == ["PETR4"] and reader.version("PETR4") == 2
+        assert (book.ts, book.best_bid, book.best_ask) == (3.0, 3.0, 4.0)
+    finally:
+        reader.close()
+        publisher.close()
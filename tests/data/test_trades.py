@@ -0,0 +1,83 @@
+import asyncio
+import math
+from datetime import datetime, timezone
+
+import pytest
+
+from easybov.data.live.b3 import B3DataStream
+from easybov.data.models.trade import Trade
+from easybov.data.tape import TradeTape
+from tests.conftest import API_KEY, SECRET_KEY
+
+SECOND = 1_000_000_000
+
+
+def _trades(symbol: str, *trades):
+    """A raw `trades` message of (epoch seconds, price, size) trades."""
+    return {
+        "arg": {"channel": "trades", "symbol": symbol},
+        "data": [{"t": str(t), "p": str(price), "s": str(size)} for t, price, size in trades],
+    }
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        ("1700000000.123456789", 1700000000123456789),
+        ("1700000000.5", 1700000000500000000),
+        ("1700000000", 1700000000 * SECOND),
+        (1700000000, 1700000000 * SECOND),
+        (1700000000.25, 1700000000250000000),
+        ("2023-11-14T22:13:20.123456789Z", 1700000000123456789),
+        ("2023-11-14T19:13:20-03:00", 1700000000 * SECOND),
+    ],
+)
+def test_trade_times_keep_their_nanoseconds(value, expected):
+    trade = Trade.from_data("PETR4", {"t": value, "p": "30.5", "s": "100"})
+
+    assert trade.timestamp == expected
+
+
+def test_trades_accept_the_long_names():
+    trade = Trade.from_data("PETR4", {"timestamp": "1700000000", "price": "30.5", "size": "100", "exchange": "B3"})
+
+    assert (trade.price, trade.size, trade.exchange) == (30.5, 100.0, "B3")
+    assert trade.to_datetime() == datetime(2023, 11, 14, 22, 13, 20, tzinfo=timezone.utc)
+
+
+def test_handlers_get_each_trade_of_a_message():
+    stream = B3DataStream(API_KEY, SECRET_KEY)
+    received = []
+
+    async def on_trade(trade):
+        received.append(trade)
+
+    stream.subscribe_trades(on_trade, "PETR4")
+    asyncio.run(stream._dispatch(_trades("PETR4", (1, 30.0, 100), (2, 30.1, 200))))
+
+    assert [(trade.price, trade.size) for trade in received] == [(30.0, 100), (30.1, 200)]
+    assert {trade.symbol for trade in received} == {"PETR4"}
+
+
+def test_tape_queries():
+    tape = TradeTape(capacity=8)
+    tape.append(_trades("PETR4", (1, 10.0, 100), (2, 20.0, 300), (3, 30.0, 100)))
+
+    assert tape.count("PETR4") == 3
+    assert tape.vwap("PETR4") == pytest.approx((1000 + 6000 + 3000) / 500)
+    assert tape.vwap("PETR4", n=1) == 30.0
+    # the window ends at the latest trade and excludes its start
+    assert tape.volume("PETR4", window=1) == 100
+    assert tape.volume("PETR4", window=1, now=2) == 300
+    assert math.isnan(tape.vwap("VALE3"))
+
+
+def test_tape_overwrites_the_oldest_trades():
+    tape = TradeTape(capacity=3)
+    for i in range(5):
+        tape.append(Trade("PETR4", i * SECOND, float(i), 1.0))
+
+    timestamps, prices, sizes = tape.last("PETR4")
+    assert list(prices) == [2.0, 3.0, 4.0]
+    assert list(timestamps) == [2 * SECOND, 3 * SECOND, 4 * SECOND]
+    assert list(tape.last("PETR4", 2)[1]) == [3.0, 4.0]
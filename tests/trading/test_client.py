@@ -0,0 +1,54 @@
+import asyncio
+import time
+
+import pytest
+
+from easybov.common.exceptions import RequestTimeoutError
+from easybov.simulator import Simulator
+from easybov.trading.client import AsyncTradingClient, TradingClient
+from easybov.trading.enums import OrderSide
+from easybov.trading.requests import GetOrdersRequest, MarketOrderRequest
+from tests.conftest import API_KEY, SECRET_KEY
+
+
+def _order(cl_ord_id: str) -> MarketOrderRequest:
+    return MarketOrderRequest(symbol="PETR4", cl_ord_id=cl_ord_id, side=OrderSide.BUY, order_qty="100")
+
+
+def test_batch_reports_each_failure_in_place(simulator):
+    with TradingClient(API_KEY, SECRET_KEY, url_override=simulator.rest_url, batch_max_workers=4) as client:
+        client.submit_order(_order("dup"))
+        results = client.submit_orders([_order(cl_ord_id) for cl_ord_id in ("a", "dup", "b", "c")])
+        executor = client._batch_executor
+
+    assert [result.cl_ord_id for result in results] == ["a", "dup", "b", "c"]
+    assert [result.succeeded for result in results] == [True, False, True, True]
+    # rejected by the exchange as a duplicated cl_ord_id
+    assert results[1].status_code == 400 and results[1].response is None
+    assert [result.response.data[0].cl_ord_id for result in results if result.succeeded] == ["a", "b", "c"]
+    # the pool is shut down on exit
+    assert client._batch_executor is None and executor._shutdown
+
+
+def test_per_call_timeouts_of_the_async_client():
+    with Simulator(credentials={API_KEY: SECRET_KEY}, latency=1.0) as sim:
+
+        async def run():
+            async with AsyncTradingClient(API_KEY, SECRET_KEY, url_override=sim.rest_url) as client:
+                started = time.monotonic()
+                with pytest.raises(RequestTimeoutError):
+                    await client.get_order(GetOrdersRequest(cl_ord_id="a"), timeout=(0.5, 0.2), deadline=0.5)
+                with pytest.raises(RequestTimeoutError):
+                    await client.submit_order(_order("a"), deadline=0.3)
+                return time.monotonic() - started
+
+        assert asyncio.run(run()) < 1.5
+
+
+def test_read_timeout_of_the_sync_client():
+    with Simulator(credentials={API_KEY: SECRET_KEY}, latency=1.0) as sim:
+        with TradingClient(API_KEY, SECRET_KEY, url_override=sim.rest_url, timeout=(0.5, 0.2), deadline=0.5) as client:
+            started = time.monotonic()
+            with pytest.raises(RequestTimeoutError):
+                client.get_order(GetOrdersRequest(cl_ord_id="a"))
+            assert time.monotonic() - started < 0.9
@@ -0,0 +1,161 @@
+import asyncio
+
+from easybov.trading.client import AsyncTradingClient
+from easybov.trading.enums import OrderSide, OrderStatus
+from easybov.trading.order_state import OrderStateCache
+from easybov.trading.requests import CancelOrderRequest, LimitOrderRequest
+from tests.conftest import API_KEY, SECRET_KEY
+
+
+def _order(cl_ord_id: str = "a", price: str = "30.00") -> LimitOrderRequest:
+    return LimitOrderRequest(symbol="PETR4", cl_ord_id=cl_ord_id, order_qty="100", side=OrderSide.BUY, price=price)
+
+
+def _cancel(cl_ord_id: str, orig_cl_ord_id: str = "a") -> CancelOrderRequest:
+    return CancelOrderRequest(
+        symbol="PETR4", cl_ord_id=cl_ord_id, orig_cl_ord_id=orig_cl_ord_id, order_qty="100", side=OrderSide.BUY
+    )
+
+
+def _update(status: OrderStatus, cl_ord_id: str = "a", cum_qty: float = 0, last_qty: float = 0, **fields):
+    return {
+        "arg": {"channel": "orders", "symbol": "PETR4"},
+        "data": [
+            dict(
+                {
+                    "symbol": "PETR4",
+                    "cl_ord_id": cl_ord_id,
+                    "side": "1",
+                    "order_qty": "100",
+                    "price": "30.00",
+                    "ord_status": status.value,
+                    "cum_qty": str(cum_qty),
+                    "last_qty": str(last_qty),
+                    "last_px": "30.00" if last_qty else "0",
+                },
+                **fields,
+            )
+        ],
+    }
+
+
+def test_track_before_the_first_update():
+    cache = OrderStateCache()
+    cache.track(_order())
+
+    state = cache.get("a")
+    assert state.ord_status == OrderStatus.PENDING_NEW
+    assert (state.symbol, state.side, state.price, state.order_qty) == ("PETR4", OrderSide.BUY, 30.0, 100.0)
+    assert cache.live_orders("PETR4") == [state]
+
+    cache.apply(_update(OrderStatus.NEW))
+    assert cache.get("a") is state
+    assert state.ord_status == OrderStatus.NEW
+
+
+def test_fills_and_done_orders():
+    cache = OrderStateCache()
+    cache.apply(_update(OrderStatus.NEW))
+    cache.apply(_update(OrderStatus.PARTIALLY_FILLED, cum_qty=40, last_qty=40, last_px="30.00"))
+    state = cache.apply(_update(OrderStatus.FILLED, cum_qty=100, last_qty=60, last_px="30.50"))
+
+    assert state.is_done and state.leaves_qty == 0
+    assert state.avg_px == (40 * 30.0 + 60 * 30.5) / 100
+    assert cache.live_orders() == []
+    assert cache.stats()["gaps"] == 0
+
+
+def test_out_of_order_and_stale_updates_are_dropped():
+    cache = OrderStateCache()
+    cache.apply(_update(OrderStatus.PARTIALLY_FILLED, cum_qty=60, last_qty=60))
+
+    # an older fill arriving late
+    assert cache.apply(_update(OrderStatus.PARTIALLY_FILLED, cum_qty=20, last_qty=20)) is None
+    cache.apply(_update(OrderStatus.CANCELED, cum_qty=60))
+    # a live status after the order is done
+    assert cache.apply(_update(OrderStatus.NEW, cum_qty=60)) is None
+
+    state = cache.get("a")
+    assert (state.ord_status, state.cum_qty) == (OrderStatus.CANCELED, 60)
+    assert cache.stale_updates == 2
+
+
+def test_missed_fills_are_counted_as_gaps():
+    cache = OrderStateCache()
+    cache.apply(_update(OrderStatus.NEW))
+    # 30 were filled by an update the stream never delivered
+    cache.apply(_update(OrderStatus.PARTIALLY_FILLED, cum_qty=50, last_qty=20))
+
+    assert cache.gaps == 1
+    assert cache.get("a").cum_qty == 50
+
+
+def test_accepted_cancel_joins_the_chain():
+    cache = OrderStateCache()
+    cache.track(_order())
+    cache.apply(_update(OrderStatus.NEW))
+    state = cache.track(_cancel("b"))
+
+    # sent, not accepted yet
+    assert cache.get("b") is state
+    assert (state.cl_ord_id, state.pending_cl_ord_ids) == ("a", ["b"])
+    cache.apply(_update(OrderStatus.PENDING_CANCEL, cl_ord_id="b", orig_cl_ord_id="a"))
+    assert state.ord_status == OrderStatus.NEW
+
+    cache.apply(_update(OrderStatus.CANCELED, cl_ord_id="b", orig_cl_ord_id="a"))
+    assert (state.cl_ord_id, state.cl_ord_ids, state.orig_cl_ord_id) == ("b", ["a", "b"], "a")
+    assert state.pending_cl_ord_ids == []
+    assert state.ord_status == OrderStatus.CANCELED
+
+
+def test_rejected_cancel_leaves_the_order_live():
+    cache = OrderStateCache()
+    cache.track(_order())
+    cache.apply(_update(OrderStatus.NEW))
+    state = cache.track(_cancel("b"))
+
+    assert cache.apply(_update(OrderStatus.REJECTED, cl_ord_id="b", orig_cl_ord_id="a")) is state
+    assert (state.ord_status, state.cl_ord_id) == (OrderStatus.NEW, "a")
+    assert (state.pending_cl_ord_ids, state.rejected_cl_ord_ids) == ([], ["b"])
+    assert cache.live_orders() == [state]
+
+    # the order keeps trading
+    cache.apply(_update(OrderStatus.FILLED, cum_qty=100, last_qty=100))
+    assert state.ord_status == OrderStatus.FILLED
+    assert cache.stats()["stale_updates"] == 0
+    assert cache.stats()["rejected_requests"] == 1
+
+
+def test_replace_of_an_untracked_order():
+    cache = OrderStateCache()
+    cache.apply(_update(OrderStatus.NEW))
+    state = cache.apply(_update(OrderStatus.REPLACED, cl_ord_id="b", orig_cl_ord_id="a", cum_qty=10, last_qty=10))
+
+    assert state is cache.get("a")
+    assert state.cl_ord_ids == ["a", "b"]
+    assert state.ord_status == OrderStatus.PARTIALLY_FILLED
+
+
+def test_reconcile_fetches_what_the_stream_missed(simulator):
+    async def run():
+        async with AsyncTradingClient(API_KEY, SECRET_KEY, url_override=simulator.rest_url) as client:
+            cache = OrderStateCache(client)
+            # far from the book, the order rests
+            order = _order(price="1.00")
+            await client.submit_order(order)
+            state = cache.track(order)
+
+            await cache.reconcile()
+            resting = (state.ord_status, state.order_id)
+
+            cancel = _cancel("b")
+            await client.cancel_order(cancel)
+            cache.track(cancel)
+            await cache.reconcile()
+            return cache, state, resting
+
+    cache, state, resting = asyncio.run(run())
+    assert resting[0] == OrderStatus.NEW and resting[1] is not None
+    assert state.ord_status == OrderStatus.CANCELED
+    assert cache.live_orders() == []
+    assert (cache.reconciliations, cache.reconcile_errors) == (2, 0)
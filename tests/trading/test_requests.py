@@ -0,0 +1,93 @@
+import json
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+from easybov.common.requests import NonEmptyRequest
+from easybov.trading.enums import OrderSide, TimeInForce
+from easybov.trading.requests import CancelOrderRequest, GetOrdersRequest, LimitOrderRequest, MarketOrderRequest
+
+
+class _Leg(NonEmptyRequest):
+    symbol: str
+    qty: Optional[str] = None
+
+
+class _Basket(NonEmptyRequest):
+    name: str
+    legs: List[_Leg]
+
+
+def _compact(fields: dict) -> bytes:
+    return json.dumps(fields, separators=(",", ":")).encode("utf-8")
+
+
+def test_limit_order_body():
+    order = LimitOrderRequest(
+        symbol="PETR4", cl_ord_id="ação-1", order_qty="100", side=OrderSide.BUY, tif=TimeInForce.DAY, price="30.5"
+    )
+
+    fields = order.to_request_fields()
+    assert fields == {
+        "symbol": "PETR4",
+        "cl_ord_id": "ação-1",
+        "order_qty": "100",
+        "side": "1",
+        "ord_type": "limit",
+        "tif": "0",
+        "price": "30.5",
+    }
+    assert order.to_request_body() == _compact(fields)
+
+
+def test_empty_fields_are_left_out():
+    order = MarketOrderRequest(symbol="PETR4", cl_ord_id="a", order_qty="100", side=OrderSide.SELL)
+    cancel = CancelOrderRequest(symbol="PETR4", cl_ord_id="b", order_qty="100", side="1", orig_cl_ord_id="a")
+
+    assert order.to_request_fields() == {
+        "symbol": "PETR4", "cl_ord_id": "a", "order_qty": "100", "side": "2", "ord_type": "market"
+    }
+    assert order.to_request_body() == _compact(order.to_request_fields())
+    assert cancel.to_request_body() == _compact(cancel.to_request_fields())
+    assert "tif" not in cancel.to_request_fields()
+
+
+def test_datetimes_are_rfc3339():
+    brasilia = timezone(timedelta(hours=-3))
+    request = GetOrdersRequest(
+        cl_ord_id="a", after=datetime(2024, 1, 2, 10), until=datetime(2024, 1, 2, 13, tzinfo=brasilia)
+    )
+
+    assert request.to_request_fields() == {
+        "cl_ord_id": "a",
+        "after": "2024-01-02T10:00:00+00:00",
+        "until": "2024-01-02T13:00:00-03:00",
+    }
+    assert request.to_request_body() == _compact(request.to_request_fields())
+
+
+def test_copy_with_changes_a_template():
+    template = LimitOrderRequest(symbol="PETR4", cl_ord_id="t", order_qty="100", side=OrderSide.BUY, price="30.5")
+    order = template.copy_with(cl_ord_id="o-1", price="30.6", side="2")
+
+    assert isinstance(order, LimitOrderRequest)
+    assert template.cl_ord_id == "t"
+    assert order.to_request_fields()["side"] == "2"
+    assert order.to_request_body() == _compact(
+        dict(template.to_request_fields(), cl_ord_id="o-1", price="30.6", side="2")
+    )
+
+
+def test_copy_with_values_of_another_type_fall_back():
+    template = LimitOrderRequest(symbol="PETR4", cl_ord_id="t", order_qty="100", side=OrderSide.BUY, price="30.5")
+    order = template.copy_with(price=30.6)
+
+    assert json.loads(order.to_request_body())["price"] == 30.6
+
+
+def test_nested_requests_use_the_generic_path():
+    basket = _Basket(name="b", legs=[_Leg(symbol="PETR4", qty="100"), _Leg(symbol="VALE3")])
+
+    assert basket.to_request_fields() == {
+        "name": "b", "legs": [{"symbol": "PETR4", "qty": "100"}, {"symbol": "VALE3"}]
+    }
+    assert basket.to_request_body() == _compact(basket.to_request_fields())